@@ -0,0 +1,287 @@
+"""
+Agendador de coleta de odds em segundo plano.
+
+Cada casa é consultada no seu próprio ritmo, sem esperar uma requisição da
+API. O intervalo da casa depende do jogo mais próximo de começar entre as
+cotações que ela devolveu: perto do início as odds mudam mais (e as surebets
+duram menos), então a casa é consultada com mais frequência; jogos distantes
+ficam para depois. Coletas que não trazem mudança alongam o intervalo
+(calmaria) e falhas recuam exponencialmente. Cada casa tem ainda um orçamento
+de requisições por hora, que nunca é ultrapassado.
+
+Os metadados do adaptador (casas.py) entram na agenda: o custo da coleta é
+descontado do orçamento da casa, o limite de requisições e de tempo vêm do
+adaptador quando não são configurados, e as casas vencidas juntas são
+coletadas em paralelo até o limite de coletas simultâneas do seu transporte
+(as demais ficam para a rodada seguinte, as mais atrasadas primeiro).
+Com disjuntores (disjuntores.py), uma casa com o disjuntor aberto fica fora
+da agenda até a hora da coleta de teste, sem gastar orçamento.
+"""
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional
+import logging
+import threading
+import time
+
+from casas import CONCORRENCIA_TRANSPORTE, AdaptadorCasa, como_adaptador
+from coleta import TIMEOUT_COLETA, coletar_odds_sincrono
+from impressoes import impressas
+from surebet import momento_inicio
+
+if TYPE_CHECKING:
+    from disjuntores import Disjuntores
+
+logger = logging.getLogger(__name__)
+
+# (segundos até o início do jogo mais próximo, intervalo de coleta), do mais próximo ao mais distante
+DEGRAUS_INTERVALO = (
+    (15 * 60, 15.0),
+    (2 * 3600, 60.0),
+    (24 * 3600, 300.0),
+)
+
+# Intervalo quando não há jogos com horário conhecido, ou todos estão a mais de um dia
+INTERVALO_DISTANTE = 900.0
+
+# Jogos que começaram há mais que isto não aceleram a coleta (já terminaram)
+DURACAO_JOGO = 3 * 3600
+
+# A cada coleta sem mudança o intervalo é multiplicado por FATOR_CALMARIA, até MAX_CALMARIA vezes o do degrau
+FATOR_CALMARIA = 2.0
+MAX_CALMARIA = 4.0
+
+# Pausa mínima entre duas rodadas do laço
+ESPERA_MINIMA = 1.0
+
+# Requisições por hora permitidas a cada casa
+REQUISICOES_POR_HORA = 240
+
+def intervalo_por_inicio(odds: List[Dict], agora: Optional[float] = None) -> float:
+    """Intervalo de coleta (segundos) pelo jogo mais próximo de começar entre as cotações"""
+    agora = time.time() if agora is None else agora
+
+    mais_proximo = None
+    for cotacao in odds:
+        momento = momento_inicio(cotacao.get("inicio"))
+        if momento is None or momento < agora - DURACAO_JOGO:
+            continue
+        falta = max(momento - agora, 0.0)
+        if mais_proximo is None or falta < mais_proximo:
+            mais_proximo = falta
+
+    if mais_proximo is not None:
+        for limite, intervalo in DEGRAUS_INTERVALO:
+            if mais_proximo <= limite:
+                return intervalo
+    return INTERVALO_DISTANTE
+
+def assinatura_odds(odds: List[Dict]) -> int:
+    """
+    Resumo das cotações, para saber se mudaram desde a última coleta; sai das
+    impressões por evento, que o cache reaproveita ao receber as mesmas cotações
+    """
+    return impressas(odds).assinatura
+
+class OrcamentoRequisicoes:
+    """
+    Balde de fichas: por_hora requisições por hora, com rajada de até um minuto
+    de fichas; cada coleta gasta custo fichas
+    """
+
+    def __init__(self, por_hora: float, relogio: Callable[[], float] = time.monotonic, custo: float = 1.0):
+        self.taxa = por_hora / 3600.0
+        self.custo = custo
+        self.capacidade = max(custo, 1.0, por_hora / 60.0)
+        self.relogio = relogio
+        self._fichas = self.capacidade
+        self._ultimo = relogio()
+
+    def _reabastecer(self):
+        agora = self.relogio()
+        self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def consumir(self) -> bool:
+        """Gasta as fichas de uma coleta; False se o orçamento acabou por enquanto"""
+        self._reabastecer()
+        if self._fichas >= self.custo:
+            self._fichas -= self.custo
+            return True
+        return False
+
+    def espera(self) -> float:
+        """Segundos até haver fichas para uma coleta"""
+        self._reabastecer()
+        if self._fichas >= self.custo:
+            return 0.0
+        return (self.custo - self._fichas) / self.taxa if self.taxa > 0 else INTERVALO_DISTANTE
+
+class EstadoCasa:
+    """Agenda e histórico de coleta de uma casa"""
+
+    __slots__ = ("casa", "adaptador", "orcamento", "proxima", "intervalo", "calmaria",
+                 "assinatura", "coletas", "sem_mudanca", "falhas", "adiadas")
+
+    def __init__(self, casa: str, adaptador: AdaptadorCasa, orcamento: OrcamentoRequisicoes, proxima: float):
+        self.casa = casa
+        self.adaptador = adaptador
+        self.orcamento = orcamento
+        self.proxima = proxima
+        self.intervalo = 0.0
+        self.calmaria = 1.0
+        self.assinatura: Optional[int] = None
+        self.coletas = 0
+        self.sem_mudanca = 0
+        self.falhas = 0
+        self.adiadas = 0
+
+class AgendadorColeta:
+    """
+    Consulta os adaptadores em segundo plano e entrega as odds de cada casa
+    a publicar({casa: cotações}) assim que chegam, mesmo sem mudança (para
+    quem recebe saber que continuam valendo). As casas vencidas no mesmo
+    momento são coletadas juntas, em paralelo (coleta.coletar_odds_sincrono).
+
+    adaptadores pode ser o registro de casas (casas.RegistroCasas) ou um dict
+    {casa: função}; funções simples ganham os metadados padrão (http, custo 1).
+    requisicoes_por_hora, timeouts e concorrencia (por transporte) sobrescrevem os metadados.
+    """
+
+    def __init__(self, adaptadores: Mapping[str, Callable], publicar: Callable[[Dict[str, List[Dict]]], None],
+                 requisicoes_por_hora: Optional[Dict[str, float]] = None,
+                 timeouts: Optional[Dict[str, float]] = None, timeout: float = TIMEOUT_COLETA,
+                 concorrencia: Optional[Dict[str, int]] = None, disjuntores: Optional["Disjuntores"] = None,
+                 relogio: Callable[[], float] = time.monotonic, relogio_parede: Callable[[], float] = time.time):
+        self.publicar = publicar
+        self.timeout = timeout
+        self.concorrencia = {**CONCORRENCIA_TRANSPORTE, **(concorrencia or {})}
+        self.disjuntores = disjuntores
+        self.relogio = relogio
+        self.relogio_parede = relogio_parede
+
+        requisicoes_por_hora = requisicoes_por_hora or {}
+        timeouts = timeouts or {}
+        agora = relogio()
+        self.casas: Dict[str, EstadoCasa] = {}
+        self.timeouts: Dict[str, float] = {}
+        for casa, adaptador in adaptadores.items():
+            adaptador = como_adaptador(casa, adaptador)
+            por_hora = requisicoes_por_hora.get(casa, adaptador.requisicoes_por_hora or REQUISICOES_POR_HORA)
+            self.casas[casa] = EstadoCasa(casa, adaptador, OrcamentoRequisicoes(por_hora, relogio, adaptador.custo),
+                                          agora)
+            if casa in timeouts or adaptador.timeout:
+                self.timeouts[casa] = timeouts.get(casa, adaptador.timeout)
+
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+
+    def iniciar(self):
+        """Começa a coletar em uma thread à parte"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name="agendador-coleta", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        """Interrompe o laço; uma coleta em andamento termina antes"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def proxima_coleta(self) -> float:
+        """Segundos até a próxima casa vencer (0 se já há casa vencida)"""
+        return max(min((estado.proxima for estado in self.casas.values()), default=INTERVALO_DISTANTE)
+                   - self.relogio(), 0.0)
+
+    def executar_pendentes(self) -> List[str]:
+        """
+        Coleta as casas vencidas que têm orçamento, até o limite de coletas
+        simultâneas de cada transporte; retorna as casas consultadas
+        """
+        agora = self.relogio()
+        vencidas = {}
+        em_uso: Dict[str, int] = {}
+        for estado in sorted(self.casas.values(), key=lambda estado: estado.proxima):
+            if estado.proxima > agora:
+                break
+            transporte = estado.adaptador.transporte
+            if em_uso.get(transporte, 0) >= self.concorrencia.get(transporte, 1):
+                continue  # continua vencida: entra na próxima rodada
+            if self.disjuntores is not None:
+                espera = self.disjuntores[estado.casa].espera()
+                if espera > 0:
+                    estado.proxima = agora + espera
+                    continue
+            if not estado.orcamento.consumir():
+                estado.adiadas += 1
+                estado.proxima = agora + estado.orcamento.espera()
+                continue
+            em_uso[transporte] = em_uso.get(transporte, 0) + 1
+            vencidas[estado.casa] = estado.adaptador
+
+        if not vencidas:
+            return []
+
+        resultados = coletar_odds_sincrono(vencidas, self.timeouts, self.timeout, disjuntores=self.disjuntores)
+        agora, agora_parede = self.relogio(), self.relogio_parede()
+
+        coletadas = {}
+        for casa, resultado in resultados.items():
+            estado = self.casas[casa]
+            estado.coletas += 1
+
+            if resultado.erro is not None:
+                # Recua: 2x, 4x, 8x... o último intervalo, até INTERVALO_DISTANTE
+                estado.falhas += 1
+                base = estado.intervalo or DEGRAUS_INTERVALO[0][1]
+                estado.proxima = agora + min(base * 2 ** estado.falhas, INTERVALO_DISTANTE)
+                continue
+
+            estado.falhas = 0
+            odds = impressas(resultado.odds)
+            assinatura = assinatura_odds(odds)
+            if assinatura == estado.assinatura:
+                estado.sem_mudanca += 1
+                estado.calmaria = min(estado.calmaria * FATOR_CALMARIA, MAX_CALMARIA)
+            else:
+                estado.calmaria = 1.0
+                estado.assinatura = assinatura
+            coletadas[casa] = odds
+
+            estado.intervalo = intervalo_por_inicio(odds, agora_parede) * estado.calmaria
+            estado.proxima = agora + estado.intervalo
+
+        if coletadas:
+            try:
+                self.publicar(coletadas)
+            except Exception as e:
+                logger.error(f"❌ Erro ao publicar odds coletadas: {e}")
+
+        return list(resultados)
+
+    def estatisticas(self) -> Dict[str, Dict]:
+        """Situação de cada casa, para logs e diagnóstico"""
+        agora = self.relogio()
+        return {
+            casa: {
+                "transporte": estado.adaptador.transporte,
+                "custo": estado.adaptador.custo,
+                "intervalo": round(estado.intervalo, 1),
+                "proxima_em": round(max(estado.proxima - agora, 0.0), 1),
+                "coletas": estado.coletas,
+                "sem_mudanca": estado.sem_mudanca,
+                "falhas": estado.falhas,
+                "adiadas": estado.adiadas,
+            }
+            for casa, estado in self.casas.items()
+        }
+
+    def _laco(self):
+        logger.info(f"⏰ Agendador de coleta iniciado para {len(self.casas)} casas")
+        while not self._parar.is_set():
+            try:
+                self.executar_pendentes()
+            except Exception as e:
+                logger.error(f"❌ Erro no agendador de coleta: {e}")
+            self._parar.wait(max(self.proxima_coleta(), ESPERA_MINIMA))
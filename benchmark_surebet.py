@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do sistema de surebet
+Mede o tempo de detecção com volumes sintéticos de cotações
+
+Uso:
+    python3 benchmark_surebet.py                  # 10k, 100k e 1M cotações
+    python3 benchmark_surebet.py 10000 50000      # tamanhos específicos
+"""
+
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from surebet import encontrar_surebets, encontrar_surebets_multiplas_casas, VERIFICADORES_POR_MERCADO
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+
+# Acima deste tamanho a versão quadrática antiga levaria minutos ou horas
+LIMITE_LEGADO = 4_000
+
+# Acima deste tamanho o json.loads do corpo inteiro (a comparação) fica pesado demais
+LIMITE_FEED_JSON = 200_000
+
+def print_header(titulo: str):
+    """Imprime um cabeçalho formatado"""
+    print("\n" + "="*60)
+    print(f"⏱️  {titulo}")
+    print("="*60)
+
+def gerar_cotacoes_sinteticas(total_cotacoes: int, casas: List[str], semente: int = 42) -> Dict[str, List[Dict]]:
+    """Gera cotações de resultado (1X2) para eventos fictícios, divididas igualmente entre as casas"""
+    rnd = random.Random(semente)
+    por_casa = total_cotacoes // len(casas)
+
+    todas_odds = {casa.lower(): [] for casa in casas}
+    agora = datetime(2024, 7, 22, 16, 0)
+
+    for i in range(por_casa):
+        team1, team2 = f"Time {i} A", f"Time {i} B"
+        separador = " vs " if i % 2 == 0 else " x "
+        inicio = (agora + timedelta(minutes=15 * (i % 2000))).isoformat()
+
+        for casa in casas:
+            # Cada casa monta suas próprias strings, como acontece no scraping
+            todas_odds[casa.lower()].append({
+                "evento": f"{team1}{separador}{team2}",
+                "mercado": "resultado",
+                "casa": casa,
+                "odds": {resultado: odd_sintetica(rnd, resultado) for resultado in (team1, "Empate", team2)},
+                "inicio": f"{inicio}",
+                "campeonato": f"Liga {i % 50}"
+            })
+
+    return todas_odds
+
+def odd_sintetica(rnd: random.Random, resultado: str) -> float:
+    """Odd de um resultado do 1X2 sintético: vitória entre 2.40 e 3.20, empate entre 3.00 e 3.80"""
+    return round(rnd.uniform(3.00, 3.80) if resultado == "Empate" else rnd.uniform(2.40, 3.20), 2)
+
+def normalizar_nome_evento_legado(nome: str) -> str:
+    """Normalização original, só minúsculas e " x " -> " vs " """
+    return nome.lower().strip().replace(" x ", " vs ")
+
+def encontrar_surebets_legado(odds_casa1: List[Dict], odds_casa2: List[Dict]) -> List[Dict]:
+    """Versão original (todos contra todos), mantida apenas como referência de comparação"""
+    oportunidades = []
+
+    for evento1 in odds_casa1:
+        for evento2 in odds_casa2:
+            if normalizar_nome_evento_legado(evento1["evento"]) == normalizar_nome_evento_legado(evento2["evento"]):
+                verificador = VERIFICADORES_POR_MERCADO.get(evento1["mercado"])
+                if verificador and evento1["mercado"] == evento2["mercado"]:
+                    oportunidades.extend(verificador(evento1, evento2))
+
+    return oportunidades
+
+def cronometrar(funcao, *args) -> Tuple[float, object]:
+    """Executa a função e retorna (segundos, resultado)"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return time.perf_counter() - inicio, resultado
+
+def benchmark_cruzamento_eventos(tamanhos: List[int]):
+    """Compara o cruzamento indexado com a versão quadrática antiga"""
+    print_header("Cruzamento de eventos entre duas casas (encontrar_surebets)")
+    print(f"{'cotações':>12} {'indexado (s)':>14} {'legado (s)':>12} {'surebets':>10}")
+
+    for tamanho in tamanhos:
+        odds = gerar_cotacoes_sinteticas(tamanho, ["Casa1", "Casa2"])
+
+        tempo, surebets = cronometrar(encontrar_surebets, odds["casa1"], odds["casa2"])
+
+        if tamanho <= LIMITE_LEGADO:
+            tempo_legado, surebets_legado = cronometrar(
+                encontrar_surebets_legado, odds["casa1"], odds["casa2"]
+            )
+            assert surebets == surebets_legado, "Resultado diferente da versão original!"
+            legado = f"{tempo_legado:12.4f}"
+        else:
+            legado = f"{'-':>12}"
+
+        print(f"{tamanho:>12,} {tempo:14.4f} {legado} {len(surebets):>10,}")
+
+def benchmark_multiplas_casas(tamanhos: List[int], num_casas: int = 20):
+    """Mede a detecção em passada única com muitas casas ao mesmo tempo"""
+    print_header(f"Melhores odds entre {num_casas} casas (encontrar_surebets_multiplas_casas)")
+    print(f"{'cotações':>12} {'tempo (s)':>12} {'surebets':>10}")
+
+    casas = [f"Casa{i}" for i in range(1, num_casas + 1)]
+
+    for tamanho in tamanhos:
+        odds = gerar_cotacoes_sinteticas(tamanho, casas)
+        tempo, surebets = cronometrar(encontrar_surebets_multiplas_casas, odds)
+        print(f"{tamanho:>12,} {tempo:12.4f} {len(surebets):>10,}")
+
+def benchmark_scanner_vetorizado(tamanhos: List[int], num_casas: int = 20):
+    """Mede o scanner NumPy direto sobre a matriz (evento x resultado x casa)"""
+    import numpy as np
+    from surebet_vetorizado import escanear_matriz
+
+    print_header(f"Scanner vetorizado, 3 resultados x {num_casas} casas (escanear_matriz)")
+    print(f"{'eventos':>12} {'scan (ms)':>12} {'surebets':>10}")
+
+    rng = np.random.default_rng(42)
+
+    for tamanho in tamanhos:
+        # Probabilidades justas por evento, margem de 5% da casa e um ruído por casa
+        probabilidades = rng.dirichlet([4, 3, 4], size=tamanho)[:, :, None]
+        odds = 1 / (probabilidades * 1.05) * rng.normal(1.0, 0.02, size=(tamanho, 3, num_casas))
+        odds[rng.random(odds.shape) < 0.2] = np.nan  # casas que não cotam o resultado
+
+        tempo, resultado = cronometrar(escanear_matriz, odds, None, 1000.0)
+        print(f"{tamanho:>12,} {tempo * 1000:12.1f} {int(resultado.surebets.sum()):>10,}")
+
+def benchmark_memoria_cotacoes(tamanhos: List[int]):
+    """Compara a memória de listas de dicts com a TabelaCotacoes compacta"""
+    from cotacoes import TabelaCotacoes
+
+    print_header("Memória das cotações (lista de dicts x TabelaCotacoes)")
+    print(f"{'cotações':>12} {'dicts (MB)':>12} {'tabela (MB)':>12} {'dicts/1M (MB)':>14} {'tabela/1M (MB)':>15}")
+
+    for tamanho in tamanhos:
+        gc.collect()
+        tracemalloc.start()
+
+        odds = gerar_cotacoes_sinteticas(tamanho, ["Casa1", "Casa2", "Casa3", "Casa4"])
+        memoria_dicts = tracemalloc.get_traced_memory()[0]
+
+        tabela = TabelaCotacoes.de_dict(odds)
+        del odds
+        gc.collect()
+        memoria_tabela = tracemalloc.get_traced_memory()[0]
+
+        tracemalloc.stop()
+        del tabela
+
+        quantidade = tamanho // 4 * 4
+        mb = 1024 * 1024
+        print(f"{quantidade:>12,} {memoria_dicts / mb:12.1f} {memoria_tabela / mb:12.1f} "
+              f"{memoria_dicts / quantidade * 1_000_000 / mb:14.1f} "
+              f"{memoria_tabela / quantidade * 1_000_000 / mb:15.1f}")
+
+def benchmark_detector_incremental(tamanhos: List[int], num_casas: int = 10, atualizacoes: int = 100_000):
+    """Mede a latência por atualização de odd com cada vez mais eventos acompanhados"""
+    from detector_incremental import DetectorIncremental
+
+    print_header(f"Detector incremental, {num_casas} casas (DetectorIncremental.atualizar)")
+    print(f"{'eventos':>12} {'carga (s)':>12} {'µs/atualização':>16} {'abertas':>10}")
+
+    casas = [f"Casa{i}" for i in range(1, num_casas + 1)]
+    rnd = random.Random(7)
+
+    for tamanho in tamanhos:
+        num_eventos = tamanho // num_casas
+        detector = DetectorIncremental()
+        todas_odds = gerar_cotacoes_sinteticas(tamanho, casas)
+        tempo_carga, _ = cronometrar(detector.carregar, todas_odds)
+
+        # Cada atualização traz início e campeonato do evento, como no scraping
+        eventos = todas_odds[casas[0].lower()]
+        fluxo = []
+        for _ in range(atualizacoes):
+            i = rnd.randrange(num_eventos)
+            resultado = rnd.choice((f"Time {i} A", "Empate", f"Time {i} B"))
+            fluxo.append((rnd.choice(casas), eventos[i]["evento"], "resultado",
+                          resultado, odd_sintetica(rnd, resultado),
+                          eventos[i]["inicio"], eventos[i]["campeonato"]))
+
+        inicio = time.perf_counter()
+        for atualizacao in fluxo:
+            detector.atualizar(*atualizacao)
+        tempo = time.perf_counter() - inicio
+
+        print(f"{num_eventos:>12,} {tempo_carga:12.4f} {tempo / atualizacoes * 1e6:16.2f} "
+              f"{len(detector.abertas):>10,}")
+
+def benchmark_stakes_lote(tamanhos: List[int]):
+    """Compara o cálculo de stakes cenário a cenário com a versão em lote"""
+    import numpy as np
+    from surebet import calcular_stakes_multiplas, calcular_lucro_esperado_multiplas
+    from surebet_vetorizado import calcular_stakes_lote
+
+    print_header("Stakes de cenários 2-way e 1X2 (calcular_stakes_lote)")
+    print(f"{'cenários':>12} {'laço (s)':>12} {'lote (s)':>12} {'surebets':>10}")
+
+    rnd = np.random.default_rng(11)
+
+    for tamanho in tamanhos:
+        odds = np.round(rnd.uniform(1.5, 4.5, size=(tamanho, 3)), 2)
+        odds[::2, 2] = np.nan    # metade dos cenários tem só dois resultados
+        bancas = np.round(rnd.uniform(100, 5000, size=tamanho), 2)
+
+        cenarios = [[odd for odd in linha if odd == odd] for linha in odds.tolist()]
+
+        def laco():
+            for linha, banca in zip(cenarios, bancas.tolist()):
+                calcular_lucro_esperado_multiplas(calcular_stakes_multiplas(banca, linha), linha)
+
+        tempo_laco, _ = cronometrar(laco)
+        tempo_lote, lote = cronometrar(calcular_stakes_lote, odds, bancas)
+
+        print(f"{tamanho:>12,} {tempo_laco:12.4f} {tempo_lote:12.4f} {int(lote.surebets.sum()):>10,}")
+
+def gerar_feed_odds_api(total_cotacoes: int, casas: int = 10, semente: int = 7) -> bytes:
+    """Corpo JSON no formato da The Odds API com ~total_cotacoes (casa x jogo x mercado)"""
+    rnd = random.Random(semente)
+    jogos = []
+    for j in range(max(total_cotacoes // (casas * 2), 1)):
+        casa_time, fora = f"Time {2 * j}", f"Time {2 * j + 1}"
+        jogos.append({
+            "id": f"jogo{j}", "sport_key": "soccer_epl", "commence_time": "2024-10-19T20:00:00Z",
+            "home_team": casa_time, "away_team": fora,
+            "bookmakers": [
+                {"key": f"casa{c}", "title": f"Casa {c}", "markets": [
+                    {"key": "h2h", "outcomes": [
+                        {"name": casa_time, "price": round(rnd.uniform(1.8, 3.2), 2)},
+                        {"name": "Draw", "price": round(rnd.uniform(3.0, 3.8), 2)},
+                        {"name": fora, "price": round(rnd.uniform(1.8, 3.2), 2)},
+                    ]},
+                    {"key": "totals", "outcomes": [
+                        {"name": "Over", "price": round(rnd.uniform(1.7, 2.2), 2), "point": 2.5},
+                        {"name": "Under", "price": round(rnd.uniform(1.7, 2.2), 2), "point": 2.5},
+                    ]},
+                ]}
+                for c in range(casas)
+            ],
+        })
+    return json.dumps(jogos).encode()
+
+def benchmark_feed_json(tamanhos: List[int]):
+    """Compara json.loads do corpo inteiro com a leitura em fluxo do feed, até a detecção"""
+    from detector_incremental import DetectorIncremental
+    from fluxo_json import TAMANHO_PEDACO, iterar_array_json
+    from odds_api import iterar_cotacoes
+
+    print_header("Feed JSON da The Odds API: corpo inteiro x fluxo (com detecção)")
+    print(f"{'cotações':>12} {'MB':>6} {'inteiro (s)':>12} {'fluxo (s)':>10} "
+          f"{'1ª surebet (s)':>15} {'pico inteiro':>13} {'pico fluxo':>11}")
+
+    for tamanho in [t for t in tamanhos if t <= LIMITE_FEED_JSON]:
+        corpo = gerar_feed_odds_api(tamanho)
+        pedacos = [corpo[i:i + TAMANHO_PEDACO] for i in range(0, len(corpo), TAMANHO_PEDACO)]
+
+        def inteiro():
+            detector = DetectorIncremental()
+            jogos = json.loads(b"".join(pedacos))
+            return list(detector.consumir(cotacao for _, cotacao in iterar_cotacoes(jogos)))
+
+        primeira = []
+        def fluxo():
+            detector = DetectorIncremental()
+            inicio = time.perf_counter()
+            emitidos = []
+            for emitido in detector.consumir(cotacao for _, cotacao in iterar_cotacoes(iterar_array_json(pedacos))):
+                if not primeira:
+                    primeira.append(time.perf_counter() - inicio)
+                emitidos.append(emitido)
+            return emitidos
+
+        tempo_inteiro, emitidos_inteiro = cronometrar(inteiro)
+        tempo_fluxo, emitidos_fluxo = cronometrar(fluxo)
+        assert len(emitidos_inteiro) == len(emitidos_fluxo)
+
+        picos = []
+        for funcao in (inteiro, fluxo):
+            tracemalloc.start()
+            funcao()
+            picos.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        print(f"{tamanho:>12,} {len(corpo) / 1e6:6.1f} {tempo_inteiro:12.3f} {tempo_fluxo:10.3f} "
+              f"{primeira[0] if primeira else float('nan'):15.4f} "
+              f"{picos[0] / 1e6:10.1f} MB {picos[1] / 1e6:8.1f} MB")
+
+def benchmark_parser_html(repeticoes: int = 20):
+    """Tempo e pico de memória por página de cada backend HTML nas páginas gravadas em fixtures/"""
+    import glob
+    import os
+    import statistics
+    import parser_html
+    from scraping import SELETORES_SUPERBET
+
+    print_header("Parsing HTML por página (fixtures/*.html)")
+    print(f"{'página':<24} {'backend':<12} {'jogos':>6} {'ms/página':>10} {'pico (KB)':>10}")
+
+    campos = (SELETORES_SUPERBET["time"], SELETORES_SUPERBET["odd"])
+    pasta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+    for caminho in sorted(glob.glob(os.path.join(pasta, "*.html"))):
+        with open(caminho, "rb") as arquivo:
+            html = arquivo.read()
+
+        def arvore_completa():
+            # Caminho antigo: árvore inteira do html.parser, depois a busca
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(html, "html.parser")
+            return [[[no.get_text().strip() for no in jogo.select(seletor)] for seletor in campos]
+                    for jogo in soup.select(SELETORES_SUPERBET["jogo"])]
+
+        variantes = [("bs4 (antigo)", arvore_completa)] + [
+            (backend, lambda backend=backend: parser_html.extrair(html, SELETORES_SUPERBET["jogo"], campos, backend))
+            for backend in parser_html.backends_disponiveis() if backend != "bs4"
+        ]
+
+        for nome, funcao in variantes:
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                jogos = funcao()
+                tempos.append(time.perf_counter() - inicio)
+
+            tracemalloc.start()
+            funcao()
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{os.path.basename(caminho):<24} {nome:<12} {len(jogos):>6} "
+                  f"{statistics.median(tempos) * 1000:10.2f} {pico / 1024:10.0f}")
+
+def benchmark_disjuntores(atualizacoes: int = 12, orcamento: float = 0.3):
+    """Latência de cada atualização com uma casa travada: sem orçamento, com orçamento e com disjuntores"""
+    import statistics
+    from coleta import coletar_odds_sincrono
+    from disjuntores import Disjuntores
+
+    print_header(f"Atualização com uma casa travada ({atualizacoes} atualizações)")
+    print(f"{'modo':<28} {'mediana (s)':>12} {'máx (s)':>9} {'casas ok':>9}")
+
+    def casa(atraso: float):
+        def buscar():
+            time.sleep(atraso)
+            return [{"evento": "A vs B", "mercado": "resultado", "casa": "Casa", "odds": {"A": 2.0, "B": 2.0}}]
+        return buscar
+
+    adaptadores = {"rapida": casa(0.02), "media": casa(0.1), "travada": casa(1.5)}
+    modos = [
+        ("sem orçamento", lambda: coletar_odds_sincrono(adaptadores)),
+        (f"orçamento {orcamento}s", lambda: coletar_odds_sincrono(adaptadores, orcamento=orcamento)),
+    ]
+    disjuntores = Disjuntores()
+    modos.append(("orçamento + disjuntores",
+                  lambda: coletar_odds_sincrono(adaptadores, orcamento=orcamento, disjuntores=disjuntores)))
+
+    for nome, coletar in modos:
+        tempos, ok = [], 0
+        for _ in range(atualizacoes):
+            inicio = time.perf_counter()
+            resultados = coletar()
+            tempos.append(time.perf_counter() - inicio)
+            ok += sum(resultado.erro is None for resultado in resultados.values())
+        print(f"{nome:<28} {statistics.median(tempos):12.3f} {max(tempos):9.3f} {ok / atualizacoes:9.1f}")
+
+def benchmark_impressoes(tamanhos: List[int], num_casas: int = 10, fracao_alterada: float = 0.01):
+    """Coleta seguinte com poucas odds mudadas: publicar tudo e varrer de novo vs. só os eventos alterados"""
+    from cache_odds import CacheOdds
+    from cotacoes import TabelaCotacoes
+
+    print_header(f"Impressões por evento, {fracao_alterada:.0%} dos eventos alterados ({num_casas} casas)")
+    print(f"{'cotações':>12} {'tabela+varredura (s)':>22} {'impressões (s)':>16} {'taxa acerto':>12}")
+
+    casas = [f"Casa{i}" for i in range(1, num_casas + 1)]
+    rnd = random.Random(11)
+
+    for tamanho in tamanhos:
+        todas_odds = gerar_cotacoes_sinteticas(tamanho, casas)
+        cache = CacheOdds(lambda casas: todas_odds)
+        cache.obter()
+
+        # Próxima coleta: dicts novos, com uma fração dos eventos com odds diferentes
+        proxima = {casa: [dict(cotacao) for cotacao in cotacoes] for casa, cotacoes in todas_odds.items()}
+        for cotacoes in proxima.values():
+            for cotacao in rnd.sample(cotacoes, max(1, int(len(cotacoes) * fracao_alterada))):
+                cotacao["odds"] = {resultado: odd_sintetica(rnd, resultado) for resultado in cotacao["odds"]}
+
+        tempo_completo, _ = cronometrar(lambda: encontrar_surebets_multiplas_casas(TabelaCotacoes.de_dict(proxima)))
+        antes = cache.estatisticas()["mudancas"]
+        tempo_impressoes, _ = cronometrar(cache.publicar, proxima)
+        depois = cache.estatisticas()["mudancas"]
+        taxa = ((depois["eventos_inalterados"] - antes["eventos_inalterados"])
+                / (depois["eventos"] - antes["eventos"]))
+        print(f"{tamanho:>12,} {tempo_completo:22.3f} {tempo_impressoes:16.3f} {taxa:12.1%}")
+
+def benchmark_historico(tamanhos: List[int], num_casas: int = 10, coletas: int = 5):
+    """Gravação de coletas no histórico em disco e varredura delas por mmap, com o pico de memória"""
+    import tempfile
+    from historico_odds import HistoricoOdds
+
+    print_header(f"Histórico de odds em disco ({coletas} coletas, {num_casas} casas)")
+    print(f"{'cotações':>12} {'gravar (s)':>11} {'bytes/odd':>10} {'JSON/odd':>9} {'varrer (s)':>11} {'pico (MB)':>10}")
+
+    casas = [f"Casa{i}" for i in range(1, num_casas + 1)]
+
+    for tamanho in tamanhos:
+        todas_odds = gerar_cotacoes_sinteticas(tamanho, casas)
+        with tempfile.TemporaryDirectory() as diretorio:
+            historico = HistoricoOdds(diretorio)
+            inicio = time.perf_counter()
+            for coleta in range(coletas):
+                historico.gravar(todas_odds, 1_721_606_400 + 60 * coleta)
+            tempo_gravar = (time.perf_counter() - inicio) / coletas
+            linhas = historico.linhas_gravadas
+            json_por_odd = len(json.dumps(todas_odds)) * coletas / linhas
+
+            # Soma todas as odds do dia direto das colunas mapeadas
+            gc.collect()
+            tracemalloc.start()
+            tempo_varrer, _ = cronometrar(lambda: sum(sum(segmento.odd) for segmento in historico.segmentos()))
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{tamanho:>12,} {tempo_gravar:11.3f} {historico.bytes_gravados / linhas:10.1f} "
+                  f"{json_por_odd:9.1f} {tempo_varrer:11.3f} {pico / 1024 / 1024:10.1f}")
+
+def main():
+    """Executa todos os benchmarks"""
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO
+
+    benchmark_cruzamento_eventos([LIMITE_LEGADO] + tamanhos)
+    benchmark_multiplas_casas(tamanhos)
+    benchmark_scanner_vetorizado(tamanhos)
+    benchmark_memoria_cotacoes(tamanhos)
+    benchmark_detector_incremental(tamanhos)
+    benchmark_stakes_lote(tamanhos)
+    benchmark_feed_json(tamanhos)
+    benchmark_parser_html()
+    benchmark_impressoes(tamanhos)
+    benchmark_historico(tamanhos)
+    benchmark_disjuntores()
+
+if __name__ == "__main__":
+    main()
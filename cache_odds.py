@@ -0,0 +1,330 @@
+"""
+Cache em memória das odds de todas as casas.
+
+Cada atualização gera um snapshot versionado (odds por casa + TabelaCotacoes
+já montada). Os endpoints leem o snapshot atual em vez de disparar um
+scraping por requisição:
+
+- cada casa tem seu TTL; enquanto nenhuma venceu, a leitura é só do cache;
+- vencido há pouco (dentro de janela_obsoleta), o snapshot antigo é servido
+  e a atualização roda em segundo plano (stale-while-revalidate);
+- sem snapshot, ou vencido há muito, quem pede espera a atualização;
+- atualizações simultâneas são coalescidas: só uma busca roda por vez e
+  todos os que esperam recebem o mesmo resultado (single-flight);
+- uma casa pedida que não volta na busca (falha, disjuntor aberto ou fora do
+  orçamento de latência) continua servida do último snapshot bom, e só é
+  pedida de novo depois de mais um TTL, em vez de a cada leitura;
+- cada publicação compara as impressões dos eventos de cada casa com as da
+  anterior (impressoes.py): casa sem evento alterado não gera versão nova, e
+  só os eventos alterados passam pelo registro de nomes dos times (registrar)
+  e pelo detector incremental de surebets, que
+  fica guardado de uma versão para a outra. O snapshot já sai com as surebets
+  abertas; a TabelaCotacoes só é montada se alguém pedir;
+- fontes que entregam um jogo de cada vez (a The Odds API, lida em fluxo)
+  usam publicar_fluxo(): cada jogo chega ao detector enquanto o resto do
+  corpo ainda está sendo baixado.
+"""
+
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import threading
+import time
+from datetime import datetime
+
+from cotacoes import TabelaCotacoes
+from detector_incremental import DetectorIncremental
+from impressoes import ChaveEvento, DetectorMudancas, Mudancas, agrupar_por_evento
+
+logger = logging.getLogger(__name__)
+
+# Segundos que as odds de uma casa valem antes de serem buscadas de novo
+TTL_PADRAO = 30.0
+
+# Segundos depois do vencimento em que o snapshot antigo ainda é servido enquanto atualiza
+JANELA_OBSOLETA = 120.0
+
+class Snapshot:
+    """
+    Odds de todas as casas em uma versão, com o momento em que cada casa foi
+    atualizada e as surebets abertas nela (evento, mercado, melhores, margem)
+    """
+
+    __slots__ = ("versao", "odds", "surebets", "atualizado_em", "_tabela", "_relogio")
+
+    def __init__(self, versao: int, odds: Dict[str, List[Dict]], atualizado_em: Dict[str, float],
+                 relogio: Callable[[], float] = time.monotonic, surebets: Optional[List[Tuple]] = None):
+        self.versao = versao
+        self.odds = odds
+        self.surebets = surebets
+        self.atualizado_em = atualizado_em      # casa -> relógio monotônico da última busca
+        self._tabela: Optional[TabelaCotacoes] = None
+        self._relogio = relogio
+
+    @property
+    def tabela(self) -> TabelaCotacoes:
+        """Odds em colunas, montadas no primeiro uso (o scanner vetorizado e os filtros por campeonato usam)"""
+        if self._tabela is None:
+            self._tabela = TabelaCotacoes.de_dict(self.odds)
+        return self._tabela
+
+    def idade(self, casa: Optional[str] = None) -> float:
+        """Segundos desde a atualização da casa (ou da casa mais antiga)"""
+        if casa is not None:
+            return self._relogio() - self.atualizado_em[casa]
+        if not self.atualizado_em:
+            return 0.0
+        return self._relogio() - min(self.atualizado_em.values())
+
+    def metadados(self) -> Dict:
+        """Versão e idade do snapshot, para as respostas da API"""
+        idade = self.idade()
+        return {
+            "versao": self.versao,
+            "idade_segundos": round(idade, 2),
+            "atualizado_em": datetime.fromtimestamp(time.time() - idade).isoformat(timespec="seconds"),
+            "idade_por_casa": {casa: round(self.idade(casa), 2) for casa in self.atualizado_em},
+        }
+
+class CacheOdds:
+    """
+    Cache do resultado de buscar(casas), que retorna {casa: cotações}.
+    casas é a lista das casas vencidas (None = todas); a função pode
+    devolver mais casas do que as pedidas, e todas as devolvidas são renovadas.
+    registrar (ex.: nomes.registrar_times) recebe as cotações dos eventos
+    alterados antes da detecção, para o índice de nomes conhecer os times.
+    """
+
+    def __init__(self, buscar: Callable[[Optional[List[str]]], Dict[str, List[Dict]]],
+                 ttl: float = TTL_PADRAO, ttls_por_casa: Optional[Dict[str, float]] = None,
+                 janela_obsoleta: float = JANELA_OBSOLETA, relogio: Callable[[], float] = time.monotonic,
+                 registrar: Optional[Callable[[Iterable[Dict]], object]] = None):
+        self.buscar = buscar
+        self.registrar = registrar
+        self.ttl = ttl
+        self.ttls_por_casa = dict(ttls_por_casa or {})
+        self.janela_obsoleta = janela_obsoleta
+        self.relogio = relogio
+
+        self._snapshot: Optional[Snapshot] = None
+        self._tentativas: Dict[str, float] = {}    # casa -> última busca em que ela não voltou
+        self._mudancas = DetectorMudancas()
+        self._detector = DetectorIncremental()
+        self._andamento: Optional[Future] = None
+        self._trava = threading.Lock()
+
+        self.acertos = 0
+        self.obsoletos = 0
+        self.esperas = 0
+        self.buscas = 0
+        self.casas_sem_resposta = 0
+
+    def obter(self) -> Snapshot:
+        """Snapshot atual, atualizando-o conforme o TTL de cada casa"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.esperas += 1
+            return self._aguardar(None)
+
+        agora = self.relogio()
+        tentativas = self._tentativas
+        vencidas = {}
+        for casa, momento in snapshot.atualizado_em.items():
+            if casa in tentativas:
+                momento = max(momento, tentativas[casa])
+            if agora >= momento + self.ttl_casa(casa):
+                vencidas[casa] = agora - (momento + self.ttl_casa(casa))
+
+        if not vencidas:
+            self.acertos += 1
+            return snapshot
+
+        if max(vencidas.values()) <= self.janela_obsoleta:
+            self.obsoletos += 1
+            self._iniciar(list(vencidas))
+            return snapshot
+
+        self.esperas += 1
+        return self._aguardar(list(vencidas))
+
+    def ttl_casa(self, casa: str) -> float:
+        return self.ttls_por_casa.get(casa, self.ttl)
+
+    def invalidar(self):
+        """Faz a próxima leitura esperar uma busca completa"""
+        with self._trava:
+            self._snapshot = None
+            self._tentativas = {}
+            self._mudancas = DetectorMudancas()
+            self._detector = DetectorIncremental()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Contadores de uso do cache"""
+        return {
+            "versao": self._snapshot.versao if self._snapshot else 0,
+            "acertos": self.acertos,
+            "obsoletos": self.obsoletos,
+            "esperas": self.esperas,
+            "buscas": self.buscas,
+            "casas_sem_resposta": self.casas_sem_resposta,
+            "mudancas": self._mudancas.estatisticas(),
+        }
+
+    def _aguardar(self, casas: Optional[List[str]]) -> Snapshot:
+        futuro = self._iniciar(casas)
+        try:
+            return futuro.result()
+        except Exception as e:
+            # Melhor odds antigas do que nenhuma
+            if self._snapshot is not None:
+                logger.error(f"❌ Falha ao atualizar odds, servindo versão {self._snapshot.versao}: {e}")
+                return self._snapshot
+            raise
+
+    def _iniciar(self, casas: Optional[List[str]]) -> Future:
+        """Dispara a busca em uma thread, ou devolve a que já está em andamento"""
+        with self._trava:
+            if self._andamento is not None:
+                return self._andamento
+            futuro = self._andamento = Future()
+
+        threading.Thread(target=self._executar, args=(casas, futuro),
+                         name="cache-odds", daemon=True).start()
+        return futuro
+
+    def publicar(self, novas: Dict[str, List[Dict]], substituir: bool = False) -> Snapshot:
+        """
+        Gera uma nova versão com as odds das casas recebidas (ex.: vindas do
+        agendador de coleta). As demais casas mantêm os dados anteriores, a
+        menos que substituir=True. Se nenhum evento de nenhuma casa mudou, só
+        renova o horário de atualização delas e a versão continua a mesma.
+        """
+        momento = self.relogio()
+        with self._trava:
+            anterior = self._snapshot
+            mudancas = {casa: self._mudancas.comparar(casa, odds) for casa, odds in novas.items()}
+            if substituir:
+                for casa in self._mudancas.casas():
+                    if casa not in novas:
+                        mudancas[casa] = self._mudancas.esquecer(casa)
+
+            if anterior is not None and not substituir and all(
+                    not mudanca.alterados and casa in anterior.odds for casa, mudanca in mudancas.items()):
+                anterior.atualizado_em.update((casa, momento) for casa in novas)
+                return anterior
+
+            return self._nova_versao(novas, momento, self._detectar(mudancas), substituir)
+
+    def publicar_fluxo(self, jogos: Iterable[Dict[str, List[Dict]]]) -> Snapshot:
+        """
+        Gera uma nova versão a partir de um fluxo de jogos, cada um com as
+        cotações de um evento por casa ({casa: cotações}), como os da The Odds
+        API (odds_api.iterar_jogos_por_casa). Cada jogo passa pelas impressões
+        e pelo detector assim que chega, sem esperar o fim do download; no
+        fim, os eventos das casas do fluxo que não vieram saem, como em
+        publicar(). As casas que não aparecem no fluxo mantêm os dados anteriores.
+        """
+        novas: Dict[str, List[Dict]] = {}
+        vistos: Dict[str, Set[ChaveEvento]] = {}
+        alteradas: Set[str] = set()
+        for jogo in jogos:
+            with self._trava:
+                for casa, cotacoes in jogo.items():
+                    # Quem atualiza as casas do fluxo é a fonte dele; obter() não as busca
+                    self.ttls_por_casa.setdefault(casa, float("inf"))
+                    vistos_casa = vistos.setdefault(casa, set())
+                    for chave, grupo in agrupar_por_evento(cotacoes).items():
+                        novas.setdefault(casa, []).extend(grupo)
+                        vistos_casa.add(chave)
+                        mudanca = self._mudancas.comparar_evento(casa, chave, grupo)
+                        if mudanca is None:
+                            continue
+                        alteradas.add(casa)
+                        if self.registrar is not None:
+                            self.registrar(grupo)
+                        if not mudanca[0]:
+                            # Evento novo na casa: se só a chave mudou (ex.: início ajustado),
+                            # a antiga sai antes de a nova entrar, como em _detectar()
+                            for antiga in self._mudancas.retirar(
+                                    casa, lambda outra: outra[0] == chave[0] and outra not in vistos_casa):
+                                self._detector.trocar((casa, antiga), [])
+                        self._detector.trocar((casa, chave), grupo)
+
+        momento = self.relogio()
+        with self._trava:
+            for casa, vistos_casa in vistos.items():
+                sumiram = self._mudancas.retirar(casa, lambda chave: chave not in vistos_casa)
+                for chave in sumiram:
+                    self._detector.trocar((casa, chave), [])
+                if sumiram:
+                    alteradas.add(casa)
+                self._mudancas.anotar_coleta(casa in alteradas)
+
+            anterior = self._snapshot
+            if anterior is not None and not alteradas and all(casa in anterior.odds for casa in novas):
+                anterior.atualizado_em.update((casa, momento) for casa in novas)
+                return anterior
+            self._detector.expirar()
+            return self._nova_versao(novas, momento, list(self._detector.surebets()))
+
+    def _nova_versao(self, novas: Dict[str, List[Dict]], momento: float, surebets: List[Tuple],
+                     substituir: bool = False) -> Snapshot:
+        """Publica o snapshot seguinte com as odds das casas recebidas (chamado com a trava)"""
+        anterior = self._snapshot
+        if anterior is None or substituir:
+            odds, atualizado_em = {}, {}
+        else:
+            odds, atualizado_em = dict(anterior.odds), dict(anterior.atualizado_em)
+
+        odds.update(novas)
+        atualizado_em.update((casa, momento) for casa in novas)
+        versao = anterior.versao + 1 if anterior else 1
+        self._snapshot = Snapshot(versao, odds, atualizado_em, self.relogio, surebets)
+        return self._snapshot
+
+    def _detectar(self, mudancas: Dict[str, Mudancas]) -> List[Tuple]:
+        """
+        Passa só os eventos alterados pelo detector incremental; retorna as
+        surebets abertas. Os eventos que sumiram saem antes de os novos
+        entrarem: um evento cuja chave mudou (ex.: início ajustado) cai nos
+        mesmos livros, e a retirada da chave antiga apagaria a odd recém-chegada.
+        """
+        alterados = [((casa, evento), cotacoes) for casa, mudanca in mudancas.items()
+                     for evento, (_, cotacoes) in mudanca.alterados.items()]
+        if self.registrar is not None:
+            self.registrar(cotacao for _, cotacoes in alterados for cotacao in cotacoes)
+        for origem, cotacoes in alterados:
+            if not cotacoes:
+                self._detector.trocar(origem, cotacoes)
+        for origem, cotacoes in alterados:
+            if cotacoes:
+                self._detector.trocar(origem, cotacoes)
+        self._detector.expirar()
+        return list(self._detector.surebets())
+
+    def _anotar_tentativas(self, casas: Optional[List[str]], novas: Dict[str, List[Dict]]):
+        """Adia a próxima busca das casas pedidas que não voltaram"""
+        momento = self.relogio()
+        sem_resposta = [casa for casa in (casas or ()) if casa not in novas]
+        self.casas_sem_resposta += len(sem_resposta)
+
+        tentativas = {casa: quando for casa, quando in self._tentativas.items() if casa not in novas}
+        tentativas.update((casa, momento) for casa in sem_resposta)
+        self._tentativas = tentativas   # troca inteira: obter() lê sem trava
+
+    def _executar(self, casas: Optional[List[str]], futuro: Future):
+        try:
+            self.buscas += 1
+            novas = self.buscar(casas)
+            # Casas que não voltaram (falha ou timeout) mantêm os dados anteriores
+            snapshot = self.publicar(novas, substituir=casas is None)
+            self._anotar_tentativas(casas, novas)
+        except BaseException as e:
+            with self._trava:
+                self._andamento = None
+            futuro.set_exception(e)
+            return
+
+        with self._trava:
+            self._andamento = None
+        futuro.set_result(snapshot)
@@ -0,0 +1,171 @@
+"""
+Registro dos adaptadores das casas de apostas.
+
+Cada casa é registrada uma vez, junto com o que a coleta e o agendador
+precisam saber dela:
+
+- transporte: "http" (requests), "navegador" (Selenium, disputa o pool de
+  Chrome) ou "api" (API com cota);
+- mercados que o adaptador cota;
+- custo de uma coleta, em requisições do orçamento da casa (uma API que
+  cobra por mercado x região gasta mais de uma por chamada);
+- requisições por hora que a casa tolera;
+- limite de tempo de uma coleta.
+
+Casas de outros pacotes entram pelo grupo de entry points "surebet.casas"
+(um AdaptadorCasa, uma lista deles ou uma função adaptadora). A descoberta
+acontece uma vez, no primeiro acesso ao registro; depois disso consultar o
+registro é um acesso a dict.
+"""
+
+from collections.abc import Mapping
+from importlib import metadata
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+import logging
+import threading
+
+from navegadores import TAMANHO_POOL
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTES = ("http", "navegador", "api")
+
+# Coletas simultâneas por transporte: navegadores são limitados pelo pool de Chrome
+CONCORRENCIA_TRANSPORTE = {
+    "http": 8,
+    "api": 4,
+    "navegador": TAMANHO_POOL,
+}
+
+GRUPO_ENTRY_POINTS = "surebet.casas"
+
+class AdaptadorCasa:
+    """Função que coleta as cotações de uma casa, com os metadados da casa"""
+
+    __slots__ = ("nome", "buscar", "transporte", "mercados", "custo", "requisicoes_por_hora", "timeout")
+
+    def __init__(self, nome: str, buscar: Callable, transporte: str = "http",
+                 mercados: Sequence[str] = ("resultado",), custo: float = 1.0,
+                 requisicoes_por_hora: Optional[float] = None, timeout: Optional[float] = None):
+        if transporte not in TRANSPORTES:
+            raise ValueError(f"Transporte inválido para {nome}: {transporte} (use {', '.join(TRANSPORTES)})")
+        if custo <= 0:
+            raise ValueError(f"Custo da coleta de {nome} deve ser maior que zero")
+
+        self.nome = nome
+        self.buscar = buscar
+        self.transporte = transporte
+        self.mercados = tuple(mercados)
+        self.custo = float(custo)
+        self.requisicoes_por_hora = requisicoes_por_hora   # None: padrão do agendador
+        self.timeout = timeout                             # None: padrão da coleta
+
+    def __call__(self):
+        return self.buscar()
+
+    def __repr__(self):
+        return f"AdaptadorCasa({self.nome!r}, transporte={self.transporte!r})"
+
+    def metadados(self) -> Dict:
+        """Metadados da casa, para a API e diagnóstico"""
+        return {
+            "transporte": self.transporte,
+            "mercados": list(self.mercados),
+            "custo": self.custo,
+            "requisicoes_por_hora": self.requisicoes_por_hora,
+            "timeout": self.timeout,
+        }
+
+def como_adaptador(nome: str, adaptador: Callable) -> AdaptadorCasa:
+    """O próprio AdaptadorCasa, ou a função envolvida com os metadados padrão"""
+    if isinstance(adaptador, AdaptadorCasa):
+        return adaptador
+    return AdaptadorCasa(nome, adaptador)
+
+class RegistroCasas(Mapping):
+    """
+    {nome da casa: AdaptadorCasa}. Os adaptadores são chamáveis, então o
+    registro serve onde se espera o dict {casa: função} da coleta.
+    """
+
+    def __init__(self, grupo: Optional[str] = GRUPO_ENTRY_POINTS):
+        self.grupo = grupo
+        self._adaptadores: Dict[str, AdaptadorCasa] = {}
+        self._descoberto = grupo is None
+        self._descobrindo = False
+        self._trava = threading.RLock()   # o plugin carregado pode consultar o registro
+
+    def registrar(self, adaptador: AdaptadorCasa) -> AdaptadorCasa:
+        """Adiciona a casa; nomes repetidos são erro"""
+        if adaptador.nome in self._adaptadores:
+            raise ValueError(f"Casa já registrada: {adaptador.nome}")
+        self._adaptadores[adaptador.nome] = adaptador
+        return adaptador
+
+    def casa(self, nome: str, **metadados) -> Callable[[Callable], Callable]:
+        """Decorador que registra a função como adaptador da casa"""
+        def decorar(funcao: Callable) -> Callable:
+            self.registrar(AdaptadorCasa(nome, funcao, **metadados))
+            return funcao
+        return decorar
+
+    def carregar(self, pontos: Iterable) -> List[str]:
+        """Registra as casas dos entry points; os que falham são ignorados. Retorna as casas novas"""
+        novas = []
+        for ponto in pontos:
+            try:
+                objeto = ponto.load()
+                if isinstance(objeto, AdaptadorCasa):
+                    adaptadores = [objeto]
+                elif callable(objeto):
+                    adaptadores = [AdaptadorCasa(ponto.name, objeto)]
+                else:
+                    adaptadores = list(objeto)
+                for adaptador in adaptadores:
+                    novas.append(self.registrar(adaptador).nome)
+            except Exception as e:
+                logger.error(f"❌ Adaptador de casa {ponto.name} ({ponto.value}) ignorado: {e}")
+        if novas:
+            logger.info(f"🔌 Casas de plugins: {', '.join(novas)}")
+        return novas
+
+    def adaptadores(self, casas: Optional[Iterable[str]] = None) -> Dict[str, AdaptadorCasa]:
+        """Os adaptadores das casas pedidas que existem (None = todas)"""
+        self._descobrir()
+        if casas is None:
+            return dict(self._adaptadores)
+        return {casa: self._adaptadores[casa] for casa in casas if casa in self._adaptadores}
+
+    def metadados(self) -> Dict[str, Dict]:
+        """Metadados de todas as casas"""
+        return {nome: adaptador.metadados() for nome, adaptador in self.adaptadores().items()}
+
+    def __getitem__(self, nome: str) -> AdaptadorCasa:
+        self._descobrir()
+        return self._adaptadores[nome]
+
+    def __iter__(self) -> Iterator[str]:
+        self._descobrir()
+        return iter(list(self._adaptadores))
+
+    def __len__(self) -> int:
+        self._descobrir()
+        return len(self._adaptadores)
+
+    def _descobrir(self):
+        if self._descoberto:
+            return
+        with self._trava:
+            if self._descoberto or self._descobrindo:
+                return
+            self._descobrindo = True
+            try:
+                self.carregar(metadata.entry_points(group=self.grupo))
+            except Exception as e:
+                logger.error(f"❌ Erro ao procurar adaptadores de casas: {e}")
+            finally:
+                self._descobrindo = False
+                self._descoberto = True
+
+# Registro usado pela API; as casas embutidas são registradas em scraping.py
+registro_casas = RegistroCasas()
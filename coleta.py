@@ -0,0 +1,145 @@
+"""
+Coleta concorrente de odds.
+
+Cada casa é um adaptador (uma função que retorna a lista de cotações da casa).
+Os adaptadores rodam ao mesmo tempo com asyncio, cada um com o seu próprio
+limite de tempo, então a latência de uma atualização passa a ser a da casa
+mais lenta e não a soma de todas. Adaptadores bloqueantes (requests, Selenium)
+rodam em um pool de threads limitado; corrotinas são aguardadas diretamente.
+
+Com um orçamento de latência a atualização inteira tem um prazo: as casas que
+não respondem a tempo ficam de fora (e quem guarda o último resultado bom, como
+o cache_odds, continua servindo-o). Com disjuntores (disjuntores.py), casas
+que vêm falhando ou demorando nem são chamadas até o disjuntor deixar.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, NamedTuple, Optional
+import asyncio
+import inspect
+import logging
+import time
+
+if TYPE_CHECKING:
+    from disjuntores import Disjuntor, Disjuntores
+
+logger = logging.getLogger(__name__)
+
+# Limite de tempo padrão (em segundos) de cada adaptador
+TIMEOUT_COLETA = 20.0
+
+# Prazo padrão (em segundos) de uma atualização de todas as casas
+ORCAMENTO_ATUALIZACAO = 8.0
+
+# Erro de uma casa não chamada porque o disjuntor está aberto
+ERRO_CIRCUITO_ABERTO = "circuito aberto"
+
+# Threads para adaptadores bloqueantes; um Chrome por thread pesa, então o pool é pequeno
+MAX_THREADS_COLETA = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+class ResultadoColeta(NamedTuple):
+    """Resultado da coleta de uma casa"""
+    casa: str
+    odds: List[Dict]           # vazia quando houve erro ou timeout
+    erro: Optional[str]        # None quando a coleta deu certo
+    duracao: float             # segundos até a casa responder (ou desistir)
+
+def obter_executor() -> ThreadPoolExecutor:
+    """Pool de threads compartilhado pelos adaptadores bloqueantes, criado no primeiro uso"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_THREADS_COLETA, thread_name_prefix="coleta")
+    return _executor
+
+async def buscar_casa(casa: str, adaptador: Callable, timeout: float = TIMEOUT_COLETA,
+                      disjuntor: Optional["Disjuntor"] = None) -> ResultadoColeta:
+    """
+    Executa o adaptador de uma casa dentro do seu limite de tempo.
+    Erros e timeouts viram um ResultadoColeta com erro, sem propagar exceção.
+    Com disjuntor aberto a casa não é chamada; o resultado alimenta o disjuntor.
+
+    Uma thread não pode ser interrompida: no timeout o adaptador bloqueante
+    continua até terminar, ocupando uma vaga do pool, mas o resultado é descartado.
+    """
+    if disjuntor is not None and not disjuntor.permitir():
+        return ResultadoColeta(casa, [], ERRO_CIRCUITO_ABERTO, 0.0)
+
+    inicio = time.perf_counter()
+    try:
+        resultado = await _executar(casa, adaptador, timeout, inicio)
+    except asyncio.CancelledError:
+        # Quem esperava desistiu: para o disjuntor, a casa não respondeu a tempo
+        if disjuntor is not None:
+            disjuntor.registrar(False, time.perf_counter() - inicio)
+        raise
+
+    if disjuntor is not None:
+        disjuntor.registrar(resultado.erro is None, resultado.duracao)
+    return resultado
+
+async def _executar(casa: str, adaptador: Callable, timeout: float, inicio: float) -> ResultadoColeta:
+    try:
+        # AdaptadorCasa (casas.py) envolve a função: vale o tipo da função
+        if inspect.iscoroutinefunction(getattr(adaptador, "buscar", adaptador)):
+            chamada = adaptador()
+        else:
+            chamada = asyncio.get_running_loop().run_in_executor(obter_executor(), adaptador)
+
+        odds = await asyncio.wait_for(chamada, timeout)
+        return ResultadoColeta(casa, odds, None, time.perf_counter() - inicio)
+
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ {casa}: sem resposta em {timeout:.1f}s")
+        return ResultadoColeta(casa, [], f"timeout após {timeout:.1f}s", time.perf_counter() - inicio)
+    except Exception as e:
+        logger.error(f"❌ {casa}: erro na coleta: {e}")
+        return ResultadoColeta(casa, [], str(e), time.perf_counter() - inicio)
+
+async def iterar_coleta(adaptadores: Dict[str, Callable],
+                        timeouts: Optional[Dict[str, float]] = None,
+                        timeout: float = TIMEOUT_COLETA,
+                        orcamento: Optional[float] = None,
+                        disjuntores: Optional["Disjuntores"] = None) -> AsyncIterator[ResultadoColeta]:
+    """
+    Dispara todas as casas ao mesmo tempo e gera os resultados na ordem em que
+    elas terminam, para que quem consome possa usar as primeiras sem esperar
+    as mais lentas. timeouts permite um limite diferente por casa; orcamento
+    é o prazo da coleta inteira, que corta o limite de todas as casas.
+    """
+    timeouts = timeouts or {}
+    tarefas = [
+        asyncio.ensure_future(buscar_casa(
+            casa, adaptador,
+            min(timeouts.get(casa, timeout), orcamento) if orcamento is not None else timeouts.get(casa, timeout),
+            disjuntores[casa] if disjuntores is not None else None,
+        ))
+        for casa, adaptador in adaptadores.items()
+    ]
+
+    try:
+        for proxima in asyncio.as_completed(tarefas):
+            yield await proxima
+    finally:
+        # Consumidor desistiu no meio: não deixa tarefas soltas no loop
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+async def coletar_odds(adaptadores: Dict[str, Callable],
+                       timeouts: Optional[Dict[str, float]] = None,
+                       timeout: float = TIMEOUT_COLETA,
+                       orcamento: Optional[float] = None,
+                       disjuntores: Optional["Disjuntores"] = None) -> Dict[str, ResultadoColeta]:
+    """Coleta todas as casas concorrentemente; retorna {casa: ResultadoColeta} na ordem dos adaptadores"""
+    resultados = {resultado.casa: resultado async for resultado in
+                  iterar_coleta(adaptadores, timeouts, timeout, orcamento, disjuntores)}
+    return {casa: resultados[casa] for casa in adaptadores}
+
+def coletar_odds_sincrono(adaptadores: Dict[str, Callable],
+                          timeouts: Optional[Dict[str, float]] = None,
+                          timeout: float = TIMEOUT_COLETA,
+                          orcamento: Optional[float] = None,
+                          disjuntores: Optional["Disjuntores"] = None) -> Dict[str, ResultadoColeta]:
+    """coletar_odds para código síncrono (fora de um loop asyncio)"""
+    return asyncio.run(coletar_odds(adaptadores, timeouts, timeout, orcamento, disjuntores))
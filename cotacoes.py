@@ -0,0 +1,246 @@
+"""
+Armazenamento compacto de cotações.
+
+Em vez de uma lista de dicts por casa (com as chaves 'evento', 'mercado',
+'casa', 'odds', ... repetidas em cada cotação), as cotações ficam em colunas
+de array: nomes de eventos, times, casas e campeonatos são internados uma
+única vez e referenciados por índice, e as odds ficam em um array('d')
+contíguo. Visões em dict só são geradas na borda JSON com para_dict().
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+import sys
+
+from surebet import BlocosEventos, normalizar_linha, campeonato_corresponde, mercado_corresponde
+
+# Campos opcionais das cotações, guardados como índice na tabela de nomes
+CAMPOS_OPCIONAIS = ("inicio", "campeonato", "status")
+
+SEM_VALOR = -1
+
+class TabelaCotacoes:
+    """
+    Tabela de cotações em colunas.
+
+    Cada cotação i ocupa a posição i de grupo/evento/mercado/casa/opcionais,
+    e suas odds ficam em [inicio_odds[i], inicio_odds[i + 1]) das colunas
+    linha/resultado/odd. No mercado de resultado a linha é SEM_VALOR; no de
+    total de gols é o índice da linha ("2.5") e o resultado é "over"/"under".
+    """
+
+    __slots__ = (
+        "_nomes", "_ids", "_blocos", "_chaves_evento", "_mercados_linha",
+        "grupo", "evento", "mercado", "casa", "opcionais",
+        "inicio_odds", "linha", "resultado", "odd"
+    )
+
+    def __init__(self):
+        self._nomes: List = []
+        self._ids: Dict = {}
+        self._blocos = BlocosEventos()
+        self._chaves_evento: Dict[Tuple[int, int, int], Tuple] = {}
+        self._mercados_linha: Dict[int, str] = {}
+
+        # Uma posição por cotação
+        self.grupo = array("I")
+        self.evento = array("I")
+        self.mercado = array("I")
+        self.casa = array("I")
+        self.opcionais = {campo: array("i") for campo in CAMPOS_OPCIONAIS}
+        self.inicio_odds = array("I", [0])
+
+        # Uma posição por odd
+        self.linha = array("i")
+        self.resultado = array("I")
+        self.odd = array("d")
+
+    @classmethod
+    def de_dict(cls, todas_odds: Dict[str, List[Dict]]) -> "TabelaCotacoes":
+        """Cria a tabela a partir do dict por casa retornado por buscar_todas_odds"""
+        tabela = cls()
+        for grupo, cotacoes in todas_odds.items():
+            for cotacao in cotacoes:
+                tabela.adicionar(grupo, cotacao)
+        return tabela
+
+    def internar(self, nome) -> int:
+        """Retorna o índice do nome na tabela de nomes, incluindo-o se for novo"""
+        indice = self._ids.get(nome)
+        if indice is None:
+            if isinstance(nome, str):
+                nome = sys.intern(nome)
+            indice = self._ids[nome] = len(self._nomes)
+            self._nomes.append(nome)
+        return indice
+
+    def nome(self, indice: int):
+        """Retorna o nome guardado no índice"""
+        return self._nomes[indice]
+
+    def adicionar(self, grupo: str, cotacao: Dict):
+        """Adiciona uma cotação no formato de dict usado pelo scraping"""
+        self.adicionar_campos(grupo, cotacao["evento"], cotacao["mercado"], cotacao["casa"],
+                              cotacao["odds"], cotacao)
+
+    def adicionar_campos(self, grupo: str, evento: str, mercado: str, casa: str,
+                         odds: Dict, opcionais: Dict):
+        """
+        Adiciona uma cotação a partir dos campos soltos, sem montar o dict
+        (para parsers que escrevem direto na tabela). opcionais é qualquer
+        mapeamento com os CAMPOS_OPCIONAIS presentes.
+        """
+        self.grupo.append(self.internar(grupo))
+        self.evento.append(self.internar(evento))
+        self.mercado.append(self.internar(mercado))
+        self.casa.append(self.internar(casa))
+
+        for campo, coluna in self.opcionais.items():
+            valor = opcionais.get(campo)
+            coluna.append(SEM_VALOR if valor is None else self.internar(valor))
+
+        for chave, valor in odds.items():
+            if isinstance(valor, dict):
+                # Total de gols: {linha: {"over": odd, "under": odd}}
+                linha = self.internar(chave)
+                for lado, odd in valor.items():
+                    self.linha.append(linha)
+                    self.resultado.append(self.internar(lado))
+                    self.odd.append(float(odd))
+            else:
+                self.linha.append(SEM_VALOR)
+                self.resultado.append(self.internar(chave))
+                self.odd.append(float(valor))
+
+        self.inicio_odds.append(len(self.odd))
+
+    def __len__(self) -> int:
+        return len(self.evento)
+
+    def grupos(self) -> List[str]:
+        """Grupos (casas) na ordem em que aparecem"""
+        return [self._nomes[i] for i in dict.fromkeys(self.grupo)]
+
+    def total_por_grupo(self) -> Dict[str, int]:
+        """Quantidade de cotações de cada grupo"""
+        totais: Dict[str, int] = {}
+        for indice in self.grupo:
+            nome = self._nomes[indice]
+            totais[nome] = totais.get(nome, 0) + 1
+        return totais
+
+    def chave_evento(self, i: int) -> Tuple:
+        """
+        Chave do bloco do evento da cotação i (surebet.BlocosEventos, um por
+        tabela), calculada uma vez por combinação distinta de evento, início e campeonato
+        """
+        return self._chave_evento(i, self._blocos, self._chaves_evento)
+
+    def _chave_evento(self, i: int, blocos: BlocosEventos, chaves: Dict[Tuple[int, int, int], Tuple]) -> Tuple:
+        inicio, campeonato = self.opcionais["inicio"][i], self.opcionais["campeonato"][i]
+        ids = (self.evento[i], inicio, campeonato)
+
+        chave = chaves.get(ids)
+        if chave is None:
+            nomes = self._nomes
+            chave = chaves[ids] = blocos.chave(
+                nomes[ids[0]],
+                None if inicio == SEM_VALOR else nomes[inicio],
+                None if campeonato == SEM_VALOR else nomes[campeonato]
+            )
+        return chave
+
+    def iterar_odds(self, campeonato: Optional[str] = None, mercado: Optional[str] = None,
+                    blocos: Optional[BlocosEventos] = None) -> Iterator[Tuple[str, str, str, str, str, float]]:
+        """
+        Percorre as odds como (chave_evento, mercado, evento, casa, resultado, odd),
+        no mesmo formato e com os mesmos filtros de surebet.iterar_odds. Com
+        blocos (ex.: o do detector incremental), as chaves vêm dele em vez dos
+        blocos da tabela.
+        """
+        if blocos is None:
+            blocos, chaves = self._blocos, self._chaves_evento
+        else:
+            chaves = {}
+        nomes = self._nomes
+        inicio_odds, linhas, resultados, odds = self.inicio_odds, self.linha, self.resultado, self.odd
+        campeonatos, inicios = self.opcionais["campeonato"], self.opcionais["inicio"]
+
+        # Filtros avaliados uma vez por nome distinto
+        campeonatos_aceitos: Dict[int, bool] = {}
+        mercados_aceitos: Dict[str, bool] = {}
+
+        aceitas = []
+        for i in range(len(self.evento)):
+            if nomes[self.mercado[i]] not in ("resultado", "total_gols"):
+                continue
+
+            if campeonato:
+                indice = campeonatos[i]
+                aceito = campeonatos_aceitos.get(indice)
+                if aceito is None:
+                    nome = None if indice == SEM_VALOR else nomes[indice]
+                    aceito = campeonatos_aceitos[indice] = campeonato_corresponde(campeonato, nome)
+                if not aceito:
+                    continue
+            aceitas.append(i)
+
+        # As cotações com início abrem os blocos antes das sem início (BlocosEventos.abrir)
+        for i in aceitas:
+            if inicios[i] != SEM_VALOR:
+                self._chave_evento(i, blocos, chaves)
+
+        for i in aceitas:
+            mercado_cotacao = nomes[self.mercado[i]]
+            chave_evento = self._chave_evento(i, blocos, chaves)
+            nome_evento = nomes[self.evento[i]]
+            casa = nomes[self.casa[i]]
+
+            for j in range(inicio_odds[i], inicio_odds[i + 1]):
+                linha = linhas[j]
+                if linha == SEM_VALOR:
+                    mercado_odd = mercado_cotacao
+                else:
+                    mercado_odd = self._mercados_linha.get(linha)
+                    if mercado_odd is None:
+                        mercado_odd = self._mercados_linha[linha] = f"total_gols_{normalizar_linha(nomes[linha])}"
+
+                if mercado:
+                    aceito = mercados_aceitos.get(mercado_odd)
+                    if aceito is None:
+                        aceito = mercados_aceitos[mercado_odd] = mercado_corresponde(mercado, mercado_odd)
+                    if not aceito:
+                        continue
+
+                yield chave_evento, mercado_odd, nome_evento, casa, nomes[resultados[j]], odds[j]
+
+    def cotacao(self, i: int) -> Dict:
+        """Visão em dict da cotação i, no formato original do scraping"""
+        nomes = self._nomes
+
+        odds: Dict = {}
+        for j in range(self.inicio_odds[i], self.inicio_odds[i + 1]):
+            resultado = nomes[self.resultado[j]]
+            if self.linha[j] == SEM_VALOR:
+                odds[resultado] = self.odd[j]
+            else:
+                odds.setdefault(nomes[self.linha[j]], {})[resultado] = self.odd[j]
+
+        cotacao = {
+            "evento": nomes[self.evento[i]],
+            "mercado": nomes[self.mercado[i]],
+            "casa": nomes[self.casa[i]],
+            "odds": odds
+        }
+        for campo, coluna in self.opcionais.items():
+            if coluna[i] != SEM_VALOR:
+                cotacao[campo] = nomes[coluna[i]]
+
+        return cotacao
+
+    def para_dict(self) -> Dict[str, List[Dict]]:
+        """Visão completa no formato de buscar_todas_odds, para respostas JSON"""
+        todas_odds: Dict[str, List[Dict]] = {grupo: [] for grupo in self.grupos()}
+        for i in range(len(self)):
+            todas_odds[self._nomes[self.grupo[i]]].append(self.cotacao(i))
+        return todas_odds
@@ -5,10 +5,18 @@ Mostra exemplos práticos de como usar o sistema
 """
 
 import json
+import os
 import time
 from typing import Dict, List
+
+# A demonstração usa os jogos de exemplo, a menos que DADOS_EXEMPLO=0
+os.environ.setdefault("DADOS_EXEMPLO", "1")
+
 from scraping import buscar_todas_odds
-from surebet import encontrar_surebets, calcular_stakes, calcular_lucro_esperado, projetar_banca
+from surebet import (
+    encontrar_surebets_multiplas_casas, extrair_apostas, calcular_stakes_multiplas,
+    calcular_lucro_esperado_multiplas, projetar_banca
+)
 
 def print_header(titulo: str):
     """Imprime um cabeçalho formatado"""
@@ -42,34 +50,21 @@ def demonstrar_deteccao_surebets(odds: Dict):
     """Demonstra a detecção de surebets"""
     print_section("Detectando oportunidades de surebet...")
     
-    total_surebets = 0
-    melhores_oportunidades = []
-    
-    casas = list(odds.keys())
-    
-    for i in range(len(casas)):
-        for j in range(i + 1, len(casas)):
-            casa1, casa2 = casas[i], casas[j]
-            odds1, odds2 = odds[casa1], odds[casa2]
-            
-            print(f"\n🔍 Comparando {casa1.upper()} vs {casa2.upper()}...")
-            
-            surebets = encontrar_surebets(odds1, odds2)
-            
-            if surebets:
-                total_surebets += len(surebets)
-                melhores_oportunidades.extend(surebets)
-                
-                for sb in surebets:
-                    print(f"  🎯 SUREBET ENCONTRADA!")
-                    print(f"     Evento: {sb['evento']}")
-                    print(f"     {sb['casa1']}: {sb['resultado1']} @ {sb['odd1']}")
-                    print(f"     {sb['casa2']}: {sb['resultado2']} @ {sb['odd2']}")
-                    print(f"     💰 Lucro garantido: {sb['lucro_percentual']:.2f}%")
-            else:
-                print(f"  ❌ Nenhuma surebet encontrada")
-    
-    print(f"\n📊 RESUMO: {total_surebets} surebets encontradas!")
+    print(f"\n🔍 Comparando as melhores odds de {len(odds)} casas de uma só vez...")
+    
+    melhores_oportunidades = encontrar_surebets_multiplas_casas(odds)
+    
+    if melhores_oportunidades:
+        for sb in melhores_oportunidades:
+            print(f"  🎯 SUREBET ENCONTRADA!")
+            print(f"     Evento: {sb['evento']}")
+            for casa, resultado, odd in extrair_apostas(sb):
+                print(f"     {casa}: {resultado} @ {odd}")
+            print(f"     💰 Lucro garantido: {sb['lucro_percentual']:.2f}%")
+    else:
+        print(f"  ❌ Nenhuma surebet encontrada")
+    
+    print(f"\n📊 RESUMO: {len(melhores_oportunidades)} surebets encontradas!")
     
     # Ordena por lucro decrescente
     melhores_oportunidades.sort(key=lambda x: x['lucro_percentual'], reverse=True)
@@ -91,18 +86,20 @@ def demonstrar_calculo_stakes(surebets: List, banca: float = 1000):
     print(f"   Lucro esperado: {melhor_surebet['lucro_percentual']:.2f}%")
     print()
     
-    stake1, stake2 = calcular_stakes(banca, melhor_surebet['odd1'], melhor_surebet['odd2'])
-    lucros = calcular_lucro_esperado(stake1, melhor_surebet['odd1'], stake2, melhor_surebet['odd2'])
+    apostas = extrair_apostas(melhor_surebet)
+    odds_apostas = [odd for _, _, odd in apostas]
+    stakes = calcular_stakes_multiplas(banca, odds_apostas)
+    lucros = calcular_lucro_esperado_multiplas(stakes, odds_apostas)
     
     print(f"💰 DISTRIBUIÇÃO DA BANCA:")
-    print(f"   Apostar R$ {stake1:.2f} em {melhor_surebet['resultado1']} na {melhor_surebet['casa1']}")
-    print(f"   Apostar R$ {stake2:.2f} em {melhor_surebet['resultado2']} na {melhor_surebet['casa2']}")
-    print(f"   Total investido: R$ {stake1 + stake2:.2f}")
+    for (casa, resultado, _), stake in zip(apostas, stakes):
+        print(f"   Apostar R$ {stake:.2f} em {resultado} na {casa}")
+    print(f"   Total investido: R$ {sum(stakes):.2f}")
     print()
     
     print(f"🎯 LUCROS GARANTIDOS:")
-    print(f"   Se {melhor_surebet['resultado1']} ganhar: R$ {lucros['lucro_resultado1']:.2f}")
-    print(f"   Se {melhor_surebet['resultado2']} ganhar: R$ {lucros['lucro_resultado2']:.2f}")
+    for i, (_, resultado, _) in enumerate(apostas, 1):
+        print(f"   Se {resultado} ganhar: R$ {lucros[f'lucro_resultado{i}']:.2f}")
     print(f"   Lucro médio garantido: R$ {lucros['lucro_medio']:.2f}")
     print(f"   ROI: {(lucros['lucro_medio'] / banca) * 100:.2f}%")
 
@@ -138,15 +135,7 @@ def demonstrar_relatorio_completo():
     total_jogos = sum(len(jogos) for jogos in odds.values())
     
     # Busca surebets
-    all_surebets = []
-    casas = list(odds.keys())
-    
-    for i in range(len(casas)):
-        for j in range(i + 1, len(casas)):
-            casa1, casa2 = casas[i], casas[j]
-            odds1, odds2 = odds[casa1], odds[casa2]
-            surebets = encontrar_surebets(odds1, odds2)
-            all_surebets.extend(surebets)
+    all_surebets = encontrar_surebets_multiplas_casas(odds)
     
     all_surebets.sort(key=lambda x: x['lucro_percentual'], reverse=True)
     
@@ -0,0 +1,249 @@
+"""
+Detecção incremental de surebets a partir de atualizações de odds.
+
+Cada atualização (casa, evento, mercado, resultado, odd) mexe só no livro de
+melhores odds daquele evento/mercado, e o conjunto de surebets abertas é
+mantido vivo, emitindo eventos de abertura, alteração e fechamento. O custo
+por atualização é O(resultados) e não cresce com o número de eventos.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import heapq
+import itertools
+
+from nomes import chave_resultado
+from surebet import (BlocosEventos, VERIFICADORES_POR_MERCADO, iterar_odds, iterar_odds_cotacao, momento_inicio,
+                     verificar_surebet_melhores_odds)
+
+# Tipos de evento emitidos pelo detector
+ABERTA = "aberta"
+ALTERADA = "alterada"
+FECHADA = "fechada"
+
+class LivroEvento:
+    """
+    Odds de todas as casas para um evento/mercado.
+    Para cada resultado guarda o preço atual de cada casa e um heap com as
+    melhores odds, limpo de forma preguiçosa quando uma casa muda de preço.
+    """
+
+    __slots__ = ("evento", "nomes", "precos", "heaps", "melhores")
+
+    def __init__(self, evento: str):
+        self.evento = evento
+        self.nomes: Dict[str, str] = {}
+        self.precos: Dict[str, Dict[str, float]] = {}
+        self.heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        self.melhores: Dict[str, Tuple[float, str]] = {}
+
+    def atualizar(self, resultado: str, casa: str, odd: Optional[float], sequencia: int) -> bool:
+        """
+        Registra a odd da casa para o resultado (None remove a cotação).
+        Retorna True quando a melhor odd do resultado mudou.
+        """
+        atual = self.melhores.get(resultado)
+
+        if odd is None:
+            precos = self.precos.get(resultado)
+            if not precos or precos.pop(casa, None) is None:
+                return False
+            heap = self.heaps[resultado]
+        else:
+            precos = self.precos.setdefault(resultado, {})
+            heap = self.heaps.setdefault(resultado, [])
+
+            if precos.get(casa) == odd:
+                return False
+            precos[casa] = odd
+            heapq.heappush(heap, (-odd, sequencia, casa))
+
+            # Odd melhor que a atual: basta trocar, sem olhar o heap
+            if atual is None or odd > atual[0]:
+                self.melhores[resultado] = (odd, casa)
+                return True
+
+        # A casa que tinha a melhor odd piorou ou saiu: procura a próxima no heap
+        if atual is None or atual[1] != casa:
+            return False
+
+        if len(heap) > 2 * len(precos) + 8:
+            heap[:] = [item for item in heap if precos.get(item[2]) == -item[0]]
+            heapq.heapify(heap)
+
+        while heap and precos.get(heap[0][2]) != -heap[0][0]:
+            heapq.heappop(heap)
+
+        if heap:
+            self.melhores[resultado] = (-heap[0][0], heap[0][2])
+        else:
+            del self.melhores[resultado]
+            del self.precos[resultado]
+            del self.heaps[resultado]
+
+        return self.melhores.get(resultado) != atual
+
+class DetectorIncremental:
+    """
+    Mantém os livros de melhores odds e o conjunto de surebets abertas.
+
+    As oportunidades têm o mesmo formato de encontrar_surebets_multiplas_casas
+    e os mercados de total de gols chegam já por linha ("total_gols_2.5").
+
+    Os blocos de eventos vivem enquanto algum livro os usa; expirar(), chamado
+    a cada snapshot, tira os de jogos que já passaram e recoloca as cotações
+    sem início no jogo aberto em que caem agora.
+    """
+
+    def __init__(self, blocos: Optional[BlocosEventos] = None):
+        self.blocos = BlocosEventos() if blocos is None else blocos
+        self.livros: Dict[Tuple[Tuple, str], LivroEvento] = {}
+        self.abertas: Dict[Tuple[Tuple, str], Dict] = {}
+        self._origens: Dict[object, Dict[Tuple, Tuple[str, str]]] = {}
+        self._sem_inicio: Dict[object, Tuple[List[Dict], Tuple]] = {}   # origem -> (cotações, blocos em que caíram)
+        self._livros_bloco: Dict[Tuple, int] = {}
+        self._sequencia = itertools.count()
+
+    def atualizar(self, casa: str, evento: str, mercado: str, resultado: str,
+                  odd: Optional[float], inicio=None, campeonato: Optional[str] = None) -> Optional[Dict]:
+        """
+        Aplica uma atualização de odd (None retira a cotação da casa).
+        Início e campeonato, quando informados, separam o evento em blocos
+        (surebet.BlocosEventos, guardados no detector).
+        Retorna o evento emitido ({"tipo": ..., "oportunidade": ...}) ou None.
+        """
+        chave_evento = self.blocos.chave(evento, inicio, campeonato)
+        return self._aplicar(chave_evento, casa, evento, mercado, resultado, odd)
+
+    def _aplicar(self, chave_evento: Tuple, casa: str, evento: str, mercado: str, resultado: str,
+                 odd: Optional[float]) -> Optional[Dict]:
+        chave = (chave_evento, mercado)
+
+        livro = self.livros.get(chave)
+        if livro is None:
+            if odd is None:
+                return None
+            livro = self.livros[chave] = LivroEvento(evento)
+            self._livros_bloco[chave_evento] = self._livros_bloco.get(chave_evento, 0) + 1
+
+        # Grafias diferentes do mesmo resultado usam o nome da primeira casa
+        resultado = livro.nomes.setdefault(chave_resultado(resultado), resultado)
+
+        odd = None if odd is None else float(odd)
+        if not livro.atualizar(resultado, casa, odd, next(self._sequencia)):
+            return None
+
+        oportunidade = verificar_surebet_melhores_odds(livro.evento, mercado, livro.melhores)
+        anterior = self.abertas.get(chave)
+
+        if not livro.melhores:
+            del self.livros[chave]
+            restantes = self._livros_bloco.pop(chave_evento) - 1
+            if restantes:
+                self._livros_bloco[chave_evento] = restantes
+            else:
+                self.blocos.descartar(chave_evento)
+
+        if oportunidade is None:
+            if anterior is None:
+                return None
+            del self.abertas[chave]
+            return {"tipo": FECHADA, "oportunidade": anterior}
+
+        if oportunidade == anterior:
+            return None
+
+        self.abertas[chave] = oportunidade
+        return {"tipo": ABERTA if anterior is None else ALTERADA, "oportunidade": oportunidade}
+
+    def processar(self, atualizacoes: Iterable[Tuple[str, str, str, str, Optional[float]]]) -> Iterator[Dict]:
+        """Aplica uma sequência de (casa, evento, mercado, resultado, odd) e gera os eventos emitidos"""
+        for casa, evento, mercado, resultado, odd in atualizacoes:
+            emitido = self.atualizar(casa, evento, mercado, resultado, odd)
+            if emitido:
+                yield emitido
+
+    def carregar(self, todas_odds) -> List[Dict]:
+        """Aplica todas as odds de um dict por casa ou TabelaCotacoes"""
+        emitidos = []
+        for chave_evento, mercado, evento, casa, resultado, odd in iterar_odds(todas_odds, blocos=self.blocos):
+            emitido = self._aplicar(chave_evento, casa, evento, mercado, resultado, odd)
+            if emitido:
+                emitidos.append(emitido)
+        return emitidos
+
+    def consumir(self, cotacoes: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Aplica cotações (dicts do scraping) à medida que chegam, por exemplo de
+        um feed lido em fluxo, e gera os eventos emitidos por cada uma
+        """
+        for cotacao in cotacoes:
+            for chave_evento, mercado, evento, casa, resultado, odd in iterar_odds_cotacao(cotacao, blocos=self.blocos):
+                emitido = self._aplicar(chave_evento, casa, evento, mercado, resultado, odd)
+                if emitido:
+                    yield emitido
+
+    def trocar(self, origem, cotacoes: Iterable[Dict]) -> List[Dict]:
+        """
+        Troca as odds vindas de uma origem (ex.: (casa, evento)) pelas das
+        cotações atuais: aplica as novas ou mudadas e retira as que sumiram.
+        As chaves usadas ficam guardadas por origem, para que a retirada
+        acerte o mesmo livro mesmo que o índice de nomes tenha aprendido
+        grafias novas desde então.
+        """
+        cotacoes = list(cotacoes)
+        anteriores = self._origens.pop(origem, {})
+        atuais: Dict[Tuple, Tuple[str, str]] = {}
+        emitidos = []
+
+        for cotacao in cotacoes:
+            for chave_evento, mercado, evento, casa, resultado, odd in iterar_odds_cotacao(cotacao, blocos=self.blocos):
+                atuais[(chave_evento, mercado, casa, chave_resultado(resultado))] = (evento, resultado)
+                emitido = self._aplicar(chave_evento, casa, evento, mercado, resultado, odd)
+                if emitido:
+                    emitidos.append(emitido)
+
+        for chave, (evento, resultado) in anteriores.items():
+            if chave not in atuais:
+                chave_evento, mercado, casa, _ = chave
+                emitido = self._aplicar(chave_evento, casa, evento, mercado, resultado, None)
+                if emitido:
+                    emitidos.append(emitido)
+
+        if atuais:
+            self._origens[origem] = atuais
+        sem_inicio = self._blocos_sem_inicio(cotacoes)
+        if sem_inicio:
+            self._sem_inicio[origem] = (cotacoes, sem_inicio)
+        else:
+            self._sem_inicio.pop(origem, None)
+        return emitidos
+
+    def _blocos_sem_inicio(self, cotacoes: List[Dict]) -> Tuple:
+        """Blocos em que caem agora as cotações sem início reconhecido"""
+        return tuple(self.blocos.chave(cotacao["evento"], cotacao.get("inicio"), cotacao.get("campeonato"))
+                     for cotacao in cotacoes
+                     if cotacao["mercado"] in VERIFICADORES_POR_MERCADO and momento_inicio(cotacao.get("inicio")) is None)
+
+    def expirar(self) -> List[Dict]:
+        """
+        Tira os blocos de jogos que já passaram e que nenhum livro usa, e troca
+        de novo as origens com cotações sem início que passaram a cair em
+        outro bloco (ex.: o jogo delas começou e o de mesmo nome do mês
+        seguinte é o aberto). Retorna os eventos emitidos.
+        """
+        self.blocos.expirar(self._livros_bloco)
+        emitidos = []
+        for origem, (cotacoes, blocos) in list(self._sem_inicio.items()):
+            if self._blocos_sem_inicio(cotacoes) != blocos:
+                emitidos.extend(self.trocar(origem, cotacoes))
+        return emitidos
+
+    def oportunidades(self) -> List[Dict]:
+        """Surebets abertas no momento"""
+        return list(self.abertas.values())
+
+    def surebets(self) -> Iterator[Tuple[str, str, Dict[str, Tuple[float, str]], float]]:
+        """Surebets abertas como (evento, mercado, melhores, margem), o formato de surebet.iterar_surebets"""
+        for chave in self.abertas:
+            livro = self.livros[chave]
+            yield livro.evento, chave[1], dict(livro.melhores), sum(1 / odd for odd, _ in livro.melhores.values())
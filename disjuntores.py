@@ -0,0 +1,163 @@
+"""
+Disjuntores (circuit breakers) por casa de apostas.
+
+Uma casa fora do ar ou bloqueando o scraping não deve segurar a atualização
+das outras nem ocupar o pool de threads com chamadas que vão falhar. Cada
+casa tem um disjuntor com três estados:
+
+- fechado: as coletas passam; as últimas JANELA_DISJUNTOR são observadas e,
+  com erros ou coletas lentas demais em excesso, o disjuntor abre;
+- aberto: as coletas são recusadas na hora, sem chamar o adaptador, por
+  TEMPO_ABERTO segundos (dobrando a cada reabertura seguida, até MAX_TEMPO_ABERTO);
+- meio aberto: passado esse tempo, uma única coleta de teste é liberada; se
+  ela for bem e rápida o disjuntor fecha, senão abre de novo.
+"""
+
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+# Coletas observadas e mínimo delas antes de decidir abrir
+JANELA_DISJUNTOR = 20
+MIN_COLETAS = 5
+
+# Fração de erros ou de coletas lentas na janela que abre o disjuntor
+TAXA_ERROS = 0.5
+TAXA_LENTAS = 0.5
+
+# Segundos a partir dos quais uma coleta bem-sucedida conta como lenta
+LATENCIA_LENTA = 5.0
+
+# Segundos aberto antes da coleta de teste, e o máximo depois de reaberturas seguidas
+TEMPO_ABERTO = 30.0
+MAX_TEMPO_ABERTO = 600.0
+
+class Disjuntor:
+    """Disjuntor de uma casa, movido pelo resultado e pela duração das coletas"""
+
+    def __init__(self, casa: str, latencia_lenta: float = LATENCIA_LENTA, janela: int = JANELA_DISJUNTOR,
+                 min_coletas: int = MIN_COLETAS, taxa_erros: float = TAXA_ERROS,
+                 taxa_lentas: float = TAXA_LENTAS, tempo_aberto: float = TEMPO_ABERTO,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.casa = casa
+        self.latencia_lenta = latencia_lenta
+        self.min_coletas = min_coletas
+        self.taxa_erros = taxa_erros
+        self.taxa_lentas = taxa_lentas
+        self.tempo_aberto = tempo_aberto
+        self.relogio = relogio
+
+        self.estado = FECHADO
+        self.aberturas = 0
+        self.recusadas = 0
+        self._coletas: Deque[Tuple[bool, bool]] = deque(maxlen=janela)   # (erro, lenta)
+        self._aberto_ate = 0.0
+        self._reaberturas = 0       # aberturas seguidas, sem fechar no meio
+        self._testando = False
+        self._trava = threading.Lock()
+
+    def permitir(self) -> bool:
+        """Se a coleta pode ser feita agora; no meio aberto, só a primeira passa"""
+        with self._trava:
+            if self.estado == ABERTO and self.relogio() >= self._aberto_ate:
+                self.estado = MEIO_ABERTO
+                self._testando = False
+
+            if self.estado == FECHADO:
+                return True
+            if self.estado == MEIO_ABERTO and not self._testando:
+                self._testando = True
+                return True
+
+            self.recusadas += 1
+            return False
+
+    def espera(self) -> float:
+        """Segundos até a próxima coleta ser aceita (0 se já é aceita)"""
+        with self._trava:
+            if self.estado == ABERTO:
+                return max(self._aberto_ate - self.relogio(), 0.0)
+            if self.estado == MEIO_ABERTO and self._testando:
+                return self.tempo_aberto
+            return 0.0
+
+    def registrar(self, sucesso: bool, duracao: float):
+        """Resultado de uma coleta liberada por permitir()"""
+        lenta = sucesso and duracao > self.latencia_lenta
+        with self._trava:
+            if self.estado != FECHADO:
+                if sucesso and not lenta:
+                    logger.info(f"🔌 {self.casa}: disjuntor fechado, casa respondendo de novo")
+                    self.estado = FECHADO
+                    self._reaberturas = 0
+                    self._coletas.clear()
+                else:
+                    self._abrir("coleta de teste falhou" if not sucesso else f"coleta de teste lenta ({duracao:.1f}s)")
+                return
+
+            self._coletas.append((not sucesso, lenta))
+            if len(self._coletas) < self.min_coletas:
+                return
+            erros = sum(erro for erro, _ in self._coletas) / len(self._coletas)
+            lentas = sum(lenta for _, lenta in self._coletas) / len(self._coletas)
+            if erros >= self.taxa_erros:
+                self._abrir(f"{erros:.0%} de erros")
+            elif lentas >= self.taxa_lentas:
+                self._abrir(f"{lentas:.0%} das coletas acima de {self.latencia_lenta:.1f}s")
+
+    def _abrir(self, motivo: str):
+        tempo = min(self.tempo_aberto * 2 ** self._reaberturas, MAX_TEMPO_ABERTO)
+        logger.warning(f"🔌 {self.casa}: disjuntor aberto por {tempo:.0f}s ({motivo})")
+        self.estado = ABERTO
+        self.aberturas += 1
+        self._reaberturas += 1
+        self._aberto_ate = self.relogio() + tempo
+        self._testando = False
+        self._coletas.clear()
+
+    def estatisticas(self) -> Dict:
+        """Estado do disjuntor, para logs e diagnóstico"""
+        with self._trava:
+            return {
+                "estado": self.estado,
+                "aberturas": self.aberturas,
+                "recusadas": self.recusadas,
+                "coletas_observadas": len(self._coletas),
+                "erros": sum(erro for erro, _ in self._coletas),
+                "lentas": sum(lenta for _, lenta in self._coletas),
+            }
+
+class Disjuntores:
+    """Um disjuntor por casa, criado no primeiro uso; latencias_lentas muda o limite de uma casa"""
+
+    def __init__(self, latencia_lenta: float = LATENCIA_LENTA,
+                 latencias_lentas: Optional[Dict[str, float]] = None,
+                 relogio: Callable[[], float] = time.monotonic, **parametros):
+        self.latencia_lenta = latencia_lenta
+        self.latencias_lentas = latencias_lentas or {}
+        self.relogio = relogio
+        self.parametros = parametros
+        self._disjuntores: Dict[str, Disjuntor] = {}
+        self._trava = threading.Lock()
+
+    def __getitem__(self, casa: str) -> Disjuntor:
+        disjuntor = self._disjuntores.get(casa)
+        if disjuntor is None:
+            with self._trava:
+                disjuntor = self._disjuntores.get(casa)
+                if disjuntor is None:
+                    disjuntor = self._disjuntores[casa] = Disjuntor(
+                        casa, self.latencias_lentas.get(casa, self.latencia_lenta),
+                        relogio=self.relogio, **self.parametros)
+        return disjuntor
+
+    def estatisticas(self) -> Dict[str, Dict]:
+        return {casa: disjuntor.estatisticas() for casa, disjuntor in list(self._disjuntores.items())}
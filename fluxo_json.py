@@ -0,0 +1,91 @@
+"""
+Leitura incremental de arrays JSON grandes.
+
+Feeds de odds chegam como um array de jogos que pode ter dezenas de MB.
+Em vez de ler o corpo inteiro e montar a árvore toda com json.loads, os
+elementos do array são decodificados um a um à medida que os pedaços do
+corpo chegam: a memória fica limitada a um elemento mais um pedaço, e o
+primeiro jogo pode ser processado antes do fim do download.
+"""
+
+from typing import Any, Iterable, Iterator
+import codecs
+import json
+import re
+
+# Bytes lidos da resposta por vez
+TAMANHO_PEDACO = 64 * 1024
+
+# Um elemento maior que isto indica JSON malformado (ou não é um feed de jogos)
+MAX_TAMANHO_ELEMENTO = 32 * 1024 * 1024
+
+_ESPACOS = re.compile(r"[ \t\n\r]*")
+_decodificador_json = json.JSONDecoder()
+
+def iterar_array_json(pedacos: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Gera os elementos de um array JSON a partir dos pedaços (bytes) do corpo,
+    na ordem, sem esperar o array terminar. Levanta ValueError se o corpo
+    não for um array ou terminar antes de fechá-lo.
+    """
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    texto = ""
+    aberto = fechado = False
+
+    for pedaco in pedacos:
+        texto += decodificador.decode(pedaco)
+        posicao, aberto, fechado = yield from _elementos(texto, aberto, final=False)
+        if fechado:
+            return
+
+        texto = texto[posicao:]
+        if len(texto) > MAX_TAMANHO_ELEMENTO:
+            raise ValueError(f"Elemento do array JSON maior que {MAX_TAMANHO_ELEMENTO} bytes")
+
+    texto += decodificador.decode(b"", final=True)
+    _, aberto, fechado = yield from _elementos(texto, aberto, final=True)
+    if not fechado:
+        raise ValueError("Array JSON terminou antes de ser fechado")
+
+def _elementos(texto: str, aberto: bool, final: bool):
+    """
+    Gera os elementos completos de texto; retorna (posição até onde consumiu,
+    array aberto, array fechado). Sem final, um elemento incompleto fica para
+    o próximo pedaço; com final, é erro.
+    """
+    posicao = 0
+    while True:
+        posicao = _ESPACOS.match(texto, posicao).end()
+        if posicao >= len(texto):
+            return posicao, aberto, False
+
+        caractere = texto[posicao]
+        if not aberto:
+            if caractere != "[":
+                raise ValueError("Esperado um array JSON")
+            aberto = True
+            posicao += 1
+            continue
+        if caractere == ",":
+            posicao += 1
+            continue
+        if caractere == "]":
+            return posicao + 1, aberto, True
+
+        try:
+            elemento, fim = _decodificador_json.raw_decode(texto, posicao)
+        except json.JSONDecodeError as e:
+            if final:
+                raise ValueError(f"JSON inválido: {e}") from e
+            return posicao, aberto, False  # elemento ainda incompleto: espera o próximo pedaço
+
+        if not isinstance(elemento, (dict, list)):
+            # Número ou literal só está completo quando já chegou o separador seguinte ("3." pode ser "3.25")
+            seguinte = _ESPACOS.match(texto, fim).end()
+            if seguinte >= len(texto) or texto[seguinte] not in ",]":
+                if final:
+                    raise ValueError(f"JSON inválido na posição {fim}")
+                return posicao, aberto, False
+
+        yield elemento
+        posicao = fim
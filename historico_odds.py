@@ -0,0 +1,349 @@
+"""
+Histórico de odds em disco, só de acréscimo.
+
+Cada gravação (o resultado de uma coleta) vira um segmento no fim do arquivo
+do dia (UTC), com uma linha por odd: momento, casa, evento, mercado,
+resultado e odd. O segmento é colunar:
+
+- os textos (casas, eventos, mercados, resultados) ficam em um dicionário
+  do segmento, comprimido com zlib, e as colunas guardam só o índice de
+  cada um (2 bytes por valor quando o dicionário cabe, 4 senão);
+- as odds ficam em uma coluna de doubles;
+- o momento da coleta vai uma vez no cabeçalho, e vale para todas as linhas.
+
+As colunas numéricas não são comprimidas de propósito: a leitura abre o
+arquivo com mmap e as colunas viram memoryviews direto sobre as páginas do
+arquivo, sem cópia. Varrer um dia inteiro só traz para a memória as páginas
+que estão sendo lidas, e filtrar por casa ou mercado compara índices, sem
+decodificar texto linha a linha.
+
+Cada segmento leva no cabeçalho o crc32 do corpo. A leitura para no
+primeiro segmento cortado ou corrompido (processo morto durante a escrita),
+e a primeira gravação de um processo em um arquivo trunca-o no fim do último
+segmento válido, para que os segmentos novos não fiquem atrás de lixo.
+"""
+
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+import argparse
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+from surebet import normalizar_linha
+
+logger = logging.getLogger(__name__)
+
+# Identifica um segmento e a versão do formato
+ASSINATURA = b"HODD"
+VERSAO_FORMATO = 2
+
+# assinatura, versão, bytes por índice, momento, linhas, textos, bytes dos textos comprimidos,
+# tamanho do segmento, crc32 do corpo (tudo depois do cabeçalho)
+CABECALHO = struct.Struct("<4sBB2xdIIIII4x")
+
+# Nível do zlib nos textos: o ganho dos níveis altos não paga o tempo no caminho do scraping
+NIVEL_COMPRESSAO = 1
+
+# Colunas de índice, na ordem em que ficam no segmento
+COLUNAS = ("casa", "evento", "mercado", "resultado")
+
+def _alinhar(tamanho: int) -> int:
+    """Preenchimento até o próximo múltiplo de 8, para as colunas caírem alinhadas"""
+    return -tamanho % 8
+
+class RegistroOdd(NamedTuple):
+    momento: float      # epoch (segundos) da coleta
+    casa: str
+    evento: str
+    mercado: str        # "resultado" ou "total_gols_<linha>"
+    resultado: str
+    odd: float
+
+def montar_segmento(todas_odds: Dict[str, List[Dict]], momento: float) -> bytes:
+    """Codifica as odds de uma coleta (o dict por casa de buscar_todas_odds) em um segmento"""
+    ids: Dict[str, int] = {}
+    casas, eventos, mercados, resultados = array("I"), array("I"), array("I"), array("I")
+    odds = array("d")
+    resultado_mercado = ids.setdefault("resultado", 0)
+
+    for cotacoes in todas_odds.values():
+        for cotacao in cotacoes:
+            casa = ids.setdefault(cotacao["casa"], len(ids))
+            evento = ids.setdefault(cotacao["evento"], len(ids))
+            if cotacao["mercado"] == "resultado":
+                for resultado, odd in cotacao["odds"].items():
+                    casas.append(casa)
+                    eventos.append(evento)
+                    mercados.append(resultado_mercado)
+                    resultados.append(ids.setdefault(resultado, len(ids)))
+                    odds.append(odd)
+            elif cotacao["mercado"] == "total_gols":
+                for linha, lados in cotacao["odds"].items():
+                    mercado = ids.setdefault(f"total_gols_{normalizar_linha(linha)}", len(ids))
+                    for lado, odd in lados.items():
+                        casas.append(casa)
+                        eventos.append(evento)
+                        mercados.append(mercado)
+                        resultados.append(ids.setdefault(lado, len(ids)))
+                        odds.append(odd)
+
+    textos = zlib.compress("\0".join(ids).encode("utf-8"), NIVEL_COMPRESSAO)
+    largura = 2 if len(ids) <= 0xFFFF else 4
+    partes = [textos, bytes(_alinhar(CABECALHO.size + len(textos))), odds.tobytes()]
+    partes.extend((array("H", coluna) if largura == 2 else coluna).tobytes()
+                  for coluna in (casas, eventos, mercados, resultados))
+
+    corpo = b"".join(partes)
+    corpo += bytes(_alinhar(CABECALHO.size + len(corpo)))
+    cabecalho = CABECALHO.pack(ASSINATURA, VERSAO_FORMATO, largura, momento, len(odds), len(ids),
+                               len(textos), CABECALHO.size + len(corpo), zlib.crc32(corpo))
+    return cabecalho + corpo
+
+class Segmento:
+    """
+    Um segmento lido do arquivo mapeado. As colunas (odd, casa, evento,
+    mercado, resultado) são memoryviews sobre o mmap: valem só enquanto o
+    arquivo está aberto, ou seja, até o iterador que gerou o segmento avançar.
+    """
+
+    __slots__ = ("momento", "textos", "odd", "casa", "evento", "mercado", "resultado", "_ids")
+
+    def __init__(self, dados: memoryview, inicio: int, largura: int, momento: float, linhas: int,
+                 total_textos: int, bytes_textos: int):
+        self.momento = momento
+        posicao = inicio + CABECALHO.size
+        texto = zlib.decompress(dados[posicao:posicao + bytes_textos]).decode("utf-8") if total_textos else ""
+        self.textos: List[str] = texto.split("\0") if total_textos else []
+        self._ids: Optional[Dict[str, int]] = None
+
+        posicao += bytes_textos + _alinhar(CABECALHO.size + bytes_textos)
+        self.odd = dados[posicao:posicao + 8 * linhas].cast("d")
+        posicao += 8 * linhas
+        for coluna in COLUNAS:
+            setattr(self, coluna, dados[posicao:posicao + largura * linhas].cast("H" if largura == 2 else "I"))
+            posicao += largura * linhas
+
+    def __len__(self) -> int:
+        return len(self.odd)
+
+    def indice(self, texto: str) -> Optional[int]:
+        """Índice do texto no dicionário do segmento (None se o segmento não o tem)"""
+        if self._ids is None:
+            self._ids = {valor: i for i, valor in enumerate(self.textos)}
+        return self._ids.get(texto)
+
+    def linhas(self, casa: Optional[str] = None, evento: Optional[str] = None,
+               mercado: Optional[str] = None) -> Iterator[RegistroOdd]:
+        """Linhas do segmento, filtradas por casa, evento e mercado exatos (comparando índices)"""
+        posicoes: Iterable[int] = range(len(self.odd))
+        for coluna, texto in (("casa", casa), ("evento", evento), ("mercado", mercado)):
+            if texto is not None:
+                alvo = self.indice(texto)
+                if alvo is None:
+                    return
+                valores = getattr(self, coluna)
+                posicoes = [i for i in posicoes if valores[i] == alvo]
+
+        textos, momento = self.textos, self.momento
+        casas, eventos, mercados, resultados, odds = self.casa, self.evento, self.mercado, self.resultado, self.odd
+        for i in posicoes:
+            yield RegistroOdd(momento, textos[casas[i]], textos[eventos[i]],
+                              textos[mercados[i]], textos[resultados[i]], odds[i])
+
+    def liberar(self):
+        """Solta as visões sobre o mmap (o arquivo só fecha sem visões abertas)"""
+        for coluna in ("odd",) + COLUNAS:
+            getattr(self, coluna).release()
+
+def _cabecalhos_validos(dados: memoryview) -> Iterator[Tuple[int, Tuple]]:
+    """
+    (posição, campos do cabeçalho) de cada segmento íntegro, do início do
+    arquivo até o primeiro cortado ou corrompido (exclusive)
+    """
+    tamanho, posicao = len(dados), 0
+    while posicao + CABECALHO.size <= tamanho:
+        campos = CABECALHO.unpack_from(dados, posicao)
+        assinatura, versao, largura, _, linhas, _, bytes_textos, tamanho_segmento, crc = campos
+        fim = posicao + tamanho_segmento
+        if (assinatura != ASSINATURA or versao != VERSAO_FORMATO or largura not in (2, 4)
+                or fim > tamanho or tamanho_segmento < CABECALHO.size + bytes_textos + (8 + 4 * largura) * linhas
+                or zlib.crc32(dados[posicao + CABECALHO.size:fim]) != crc):
+            return
+        yield posicao, campos
+        posicao = fim
+
+def fim_valido(caminho: str) -> int:
+    """Bytes do arquivo até o fim do último segmento íntegro"""
+    with open(caminho, "rb") as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            with memoryview(mapa) as dados:
+                fim = 0
+                for posicao, campos in _cabecalhos_validos(dados):
+                    fim = posicao + campos[7]
+                return fim
+
+def ler_segmentos(caminho: str) -> Iterator[Segmento]:
+    """
+    Segmentos íntegros de um arquivo, na ordem de gravação, lidos por mmap.
+    Cada segmento deixa de valer quando o próximo é pedido.
+    """
+    with open(caminho, "rb") as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            return
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            dados = memoryview(mapa)
+            try:
+                for posicao, (_, _, largura, momento, linhas, total_textos, bytes_textos, _, _) in \
+                        _cabecalhos_validos(dados):
+                    segmento = Segmento(dados, posicao, largura, momento, linhas, total_textos, bytes_textos)
+                    try:
+                        yield segmento
+                    finally:
+                        segmento.liberar()
+            finally:
+                dados.release()
+
+def _registrar_falha(futuro: Future):
+    if futuro.exception() is not None:
+        logger.error(f"❌ Falha ao gravar o histórico de odds: {futuro.exception()}")
+
+class HistoricoOdds:
+    """Histórico de odds em um diretório, com um arquivo de segmentos por dia (UTC)"""
+
+    def __init__(self, diretorio: str, relogio=time.time):
+        self.diretorio = diretorio
+        self.relogio = relogio
+        self.segmentos_gravados = 0
+        self.linhas_gravadas = 0
+        self.bytes_gravados = 0
+        self._trava = threading.Lock()
+        self._gravador: Optional[ThreadPoolExecutor] = None
+        self._verificados: Set[str] = set()     # arquivos com o fim já conferido por este processo
+        os.makedirs(diretorio, exist_ok=True)
+
+    def caminho(self, dia) -> str:
+        """Arquivo de um dia (date ou datetime, em UTC)"""
+        return os.path.join(self.diretorio, f"odds-{dia:%Y-%m-%d}.seg")
+
+    def gravar(self, todas_odds: Dict[str, List[Dict]], momento: Optional[float] = None) -> int:
+        """Acrescenta as odds de uma coleta ao arquivo do dia; retorna quantas linhas foram gravadas"""
+        momento = self.relogio() if momento is None else momento
+        segmento = montar_segmento(todas_odds, momento)
+        linhas = CABECALHO.unpack_from(segmento)[4]
+        if not linhas:
+            return 0
+
+        caminho = self.caminho(datetime.fromtimestamp(momento, timezone.utc))
+        with self._trava:
+            if caminho not in self._verificados:
+                self._reparar(caminho)
+            # Uma escrita só por segmento: um leitor concorrente vê o segmento inteiro ou o ignora
+            try:
+                with open(caminho, "ab") as arquivo:
+                    arquivo.write(segmento)
+            except BaseException:
+                self._verificados.discard(caminho)     # pode ter ficado meio segmento no fim
+                raise
+            self.segmentos_gravados += 1
+            self.linhas_gravadas += linhas
+            self.bytes_gravados += len(segmento)
+        return linhas
+
+    def _reparar(self, caminho: str):
+        """Trunca o arquivo no fim do último segmento íntegro (sobra de uma escrita interrompida)"""
+        if os.path.exists(caminho):
+            tamanho, fim = os.path.getsize(caminho), fim_valido(caminho)
+            if fim < tamanho:
+                logger.warning(f"⚠️ Histórico {os.path.basename(caminho)}: "
+                               f"{tamanho - fim} bytes de um segmento incompleto descartados")
+                os.truncate(caminho, fim)
+        self._verificados.add(caminho)
+
+    def enfileirar(self, todas_odds: Dict[str, List[Dict]], momento: Optional[float] = None) -> Future:
+        """
+        gravar em uma thread própria, para não atrasar quem coletou; as
+        gravações saem na ordem em que foram enfileiradas
+        """
+        momento = self.relogio() if momento is None else momento
+        with self._trava:
+            if self._gravador is None:
+                self._gravador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="historico")
+            futuro = self._gravador.submit(self.gravar, todas_odds, momento)
+        futuro.add_done_callback(_registrar_falha)
+        return futuro
+
+    def encerrar(self):
+        """Espera as gravações enfileiradas terminarem"""
+        with self._trava:
+            gravador, self._gravador = self._gravador, None
+        if gravador is not None:
+            gravador.shutdown(wait=True)
+
+    def dias(self) -> List[str]:
+        """Arquivos de dias do histórico, do mais antigo ao mais recente"""
+        return sorted(nome for nome in os.listdir(self.diretorio)
+                      if nome.startswith("odds-") and nome.endswith(".seg"))
+
+    def segmentos(self, inicio: Optional[float] = None, fim: Optional[float] = None) -> Iterator[Segmento]:
+        """Segmentos com momento em [inicio, fim), lendo só os arquivos dos dias do intervalo"""
+        primeiro = f"odds-{datetime.fromtimestamp(inicio, timezone.utc):%Y-%m-%d}.seg" if inicio is not None else None
+        ultimo = f"odds-{datetime.fromtimestamp(fim, timezone.utc):%Y-%m-%d}.seg" if fim is not None else None
+        for nome in self.dias():
+            if (primeiro and nome < primeiro) or (ultimo and nome > ultimo):
+                continue
+            for segmento in ler_segmentos(os.path.join(self.diretorio, nome)):
+                if (inicio is None or segmento.momento >= inicio) and (fim is None or segmento.momento < fim):
+                    yield segmento
+
+    def iterar(self, inicio: Optional[float] = None, fim: Optional[float] = None, casa: Optional[str] = None,
+               evento: Optional[str] = None, mercado: Optional[str] = None) -> Iterator[RegistroOdd]:
+        """Linhas do histórico no intervalo, em ordem de gravação, com filtros exatos de casa, evento e mercado"""
+        for segmento in self.segmentos(inicio, fim):
+            yield from segmento.linhas(casa, evento, mercado)
+
+    def estatisticas(self) -> Dict:
+        """Contadores de gravação deste processo e o tamanho do histórico em disco"""
+        return {
+            "segmentos_gravados": self.segmentos_gravados,
+            "linhas_gravadas": self.linhas_gravadas,
+            "bytes_gravados": self.bytes_gravados,
+            "dias": len(self.dias()),
+            "bytes_em_disco": sum(os.path.getsize(os.path.join(self.diretorio, nome)) for nome in self.dias()),
+        }
+
+def resumo_dia(historico: HistoricoOdds, dia: datetime) -> Dict[str, Tuple[int, int]]:
+    """(coletas, linhas) por casa em um dia, varrendo só as colunas de casa"""
+    inicio = dia.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc)
+    por_casa: Dict[str, Tuple[int, int]] = {}
+    for segmento in historico.segmentos(inicio.timestamp(), (inicio + timedelta(days=1)).timestamp()):
+        contagem: Dict[int, int] = {}
+        for casa in segmento.casa:
+            contagem[casa] = contagem.get(casa, 0) + 1
+        for casa, linhas in contagem.items():
+            coletas, total = por_casa.get(segmento.textos[casa], (0, 0))
+            por_casa[segmento.textos[casa]] = (coletas + 1, total + linhas)
+    return por_casa
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo do histórico de odds de um dia")
+    parser.add_argument("diretorio", help="diretório do histórico (HISTORICO_ODDS)")
+    parser.add_argument("dia", nargs="?", help="AAAA-MM-DD em UTC (padrão: hoje)")
+    args = parser.parse_args()
+
+    dia = datetime.strptime(args.dia, "%Y-%m-%d") if args.dia else datetime.now(timezone.utc)
+    por_casa = resumo_dia(HistoricoOdds(args.diretorio), dia)
+    print(f"{'casa':<20} {'coletas':>8} {'linhas':>10}")
+    for casa, (coletas, linhas) in sorted(por_casa.items()):
+        print(f"{casa:<20} {coletas:>8} {linhas:>10}")
+
+if __name__ == "__main__":
+    main()
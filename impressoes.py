@@ -0,0 +1,178 @@
+"""
+Impressões digitais do conteúdo das cotações, por evento.
+
+A maior parte das coletas devolve os mesmos preços da anterior. Em vez de
+normalizar, cruzar e varrer tudo de novo, as cotações de cada casa são
+agrupadas por evento (nome, início e campeonato como vieram da casa) e cada
+grupo ganha uma impressão do seu conteúdo. Quem processa as cotações guarda
+as impressões do que já viu e só trata os eventos cuja impressão mudou.
+
+A impressão é o hash de uma tupla com o conteúdo (mercado, casa, odds,
+status): vale só dentro do processo, o que basta para comparar coletas.
+
+As impressões de uma coleta são calculadas uma vez só (CotacoesImpressas):
+a assinatura da casa no agendador e a comparação no cache saem delas, em vez
+de cada um percorrer as cotações de novo.
+"""
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import threading
+
+# Evento como veio da casa: (nome, início, campeonato)
+ChaveEvento = Tuple[str, Optional[str], Optional[str]]
+
+def chave_evento(cotacao: Dict) -> ChaveEvento:
+    return cotacao["evento"], cotacao.get("inicio"), cotacao.get("campeonato")
+
+def _congelar(valor):
+    if type(valor) is dict:
+        return tuple([(chave, _congelar(item) if type(item) is dict else item) for chave, item in valor.items()])
+    return valor
+
+def impressao_evento(cotacoes: Iterable[Dict]) -> int:
+    """Impressão do conteúdo das cotações de um evento em uma casa"""
+    return hash(tuple([
+        (cotacao["mercado"], cotacao["casa"], _congelar(cotacao["odds"]), cotacao.get("status"))
+        for cotacao in cotacoes
+    ]))
+
+def agrupar_por_evento(cotacoes: Iterable[Dict]) -> Dict[ChaveEvento, List[Dict]]:
+    """Cotações de uma casa por evento, na ordem em que aparecem"""
+    eventos: Dict[ChaveEvento, List[Dict]] = {}
+    for cotacao in cotacoes:
+        chave = chave_evento(cotacao)
+        grupo = eventos.get(chave)
+        if grupo is None:
+            eventos[chave] = [cotacao]
+        else:
+            grupo.append(cotacao)
+    return eventos
+
+class CotacoesImpressas(list):
+    """
+    Cotações de uma casa (uma lista comum) que guardam as impressões por
+    evento depois de calculá-las pela primeira vez. A lista não deve ser
+    alterada depois disso.
+    """
+
+    __slots__ = ("_eventos",)
+
+    @property
+    def eventos(self) -> Dict[ChaveEvento, Tuple[int, List[Dict]]]:
+        """Evento -> (impressão, cotações do evento), na ordem em que aparecem"""
+        try:
+            return self._eventos
+        except AttributeError:
+            self._eventos = {chave: (impressao_evento(grupo), grupo)
+                             for chave, grupo in agrupar_por_evento(self).items()}
+            return self._eventos
+
+    @property
+    def assinatura(self) -> int:
+        """Impressão da coleta inteira da casa, para saber se algo mudou desde a anterior"""
+        return hash(tuple([(chave, impressao) for chave, (impressao, _) in self.eventos.items()]))
+
+def impressas(cotacoes: Iterable[Dict]) -> CotacoesImpressas:
+    """As cotações como CotacoesImpressas (as mesmas, se já forem)"""
+    return cotacoes if isinstance(cotacoes, CotacoesImpressas) else CotacoesImpressas(cotacoes)
+
+class Mudancas(NamedTuple):
+    """Diferença entre a coleta de uma casa e a anterior"""
+    alterados: Dict[ChaveEvento, Tuple[List[Dict], List[Dict]]]  # evento -> (cotações antes, agora); [] = não havia / sumiu
+    inalterados: int
+
+class DetectorMudancas:
+    """
+    Guarda, por casa, a impressão e as cotações de cada evento da última
+    coleta vista, e diz quais eventos mudaram na coleta seguinte.
+    """
+
+    def __init__(self):
+        self._eventos: Dict[str, Dict[ChaveEvento, Tuple[int, List[Dict]]]] = {}
+        self._trava = threading.Lock()
+        self.eventos = 0
+        self.inalterados = 0
+        self.coletas = 0
+        self.coletas_inalteradas = 0
+
+    def comparar(self, casa: str, cotacoes: Iterable[Dict]) -> Mudancas:
+        """Eventos novos, alterados ou que sumiram desde a última coleta da casa; passa a lembrar esta"""
+        atuais = impressas(cotacoes).eventos
+
+        with self._trava:
+            anteriores = self._eventos.get(casa, {})
+            self._eventos[casa] = dict(atuais)     # comparar_evento() altera o guardado
+
+            alterados = {}
+            for chave, (impressao, grupo) in atuais.items():
+                anterior = anteriores.get(chave)
+                if anterior is None:
+                    alterados[chave] = ([], grupo)
+                elif anterior[0] != impressao:
+                    alterados[chave] = (anterior[1], grupo)
+            for chave, (_, grupo) in anteriores.items():
+                if chave not in atuais:
+                    alterados[chave] = (grupo, [])
+
+            inalterados = len(atuais) - sum(1 for antes, agora in alterados.values() if agora)
+            self.eventos += len(atuais)
+            self.inalterados += inalterados
+            self.coletas += 1
+            self.coletas_inalteradas += not alterados
+
+        return Mudancas(alterados, inalterados)
+
+    def comparar_evento(self, casa: str, chave: ChaveEvento,
+                        cotacoes: List[Dict]) -> Optional[Tuple[List[Dict], List[Dict]]]:
+        """
+        Para coletas que chegam em fluxo, um evento por vez: (cotações antes,
+        agora) se o evento da casa mudou desde a última vez, None se veio
+        igual; passa a lembrar este. Quem chama fecha a coleta com retirar().
+        """
+        impressao = impressao_evento(cotacoes)
+        with self._trava:
+            eventos = self._eventos.setdefault(casa, {})
+            anterior = eventos.get(chave)
+            eventos[chave] = (impressao, cotacoes)
+            self.eventos += 1
+            if anterior is not None and anterior[0] == impressao:
+                self.inalterados += 1
+                return None
+        return (anterior[1] if anterior is not None else [], cotacoes)
+
+    def retirar(self, casa: str, condicao: Callable[[ChaveEvento], bool]) -> Dict[ChaveEvento, List[Dict]]:
+        """Tira os eventos da casa que atendem à condição; retorna as cotações de cada um"""
+        with self._trava:
+            eventos = self._eventos.get(casa, {})
+            retirados = {chave: eventos.pop(chave)[1] for chave in [chave for chave in eventos if condicao(chave)]}
+        return retirados
+
+    def anotar_coleta(self, alterada: bool):
+        """Conta uma coleta feita em fluxo (comparar() já conta as suas)"""
+        with self._trava:
+            self.coletas += 1
+            self.coletas_inalteradas += not alterada
+
+    def esquecer(self, casa: str) -> Mudancas:
+        """Tira a casa (todos os eventos dela viram removidos)"""
+        with self._trava:
+            anteriores = self._eventos.pop(casa, {})
+        return Mudancas({chave: (grupo, []) for chave, (_, grupo) in anteriores.items()}, 0)
+
+    def casas(self) -> List[str]:
+        return list(self._eventos)
+
+    @property
+    def taxa_acerto(self) -> float:
+        """Fração dos eventos vistos que vieram iguais à coleta anterior"""
+        return self.inalterados / self.eventos if self.eventos else 0.0
+
+    def estatisticas(self) -> Dict:
+        """Contadores de eventos e coletas inalterados, para logs e diagnóstico"""
+        return {
+            "eventos": self.eventos,
+            "eventos_inalterados": self.inalterados,
+            "taxa_acerto": round(self.taxa_acerto, 4),
+            "coletas": self.coletas,
+            "coletas_inalteradas": self.coletas_inalteradas,
+        }
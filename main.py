@@ -1,73 +1,395 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from typing import List, Dict, Optional
+from pydantic import BaseModel
+from collections import OrderedDict
+from typing import Iterable, List, Dict, Optional, Tuple, Union
 import logging
-from scraping import buscar_odds_bet365, buscar_odds_superbet, buscar_odds_betano, buscar_todas_odds
+import os
+import threading
+from scraping import (ADAPTADORES_CASAS, ESPORTES_ODDS_API, buscar_todas_odds, cliente_odds_api, disjuntores_casas,
+                      odds_api_configurada, pool_chrome)
+from coleta import ERRO_CIRCUITO_ABERTO, ORCAMENTO_ATUALIZACAO, TIMEOUT_COLETA, buscar_casa
+from cache_odds import CacheOdds, Snapshot, TTL_PADRAO, JANELA_OBSOLETA
+from agendador import AgendadorColeta, INTERVALO_DISTANTE, MAX_CALMARIA
+from cotacoes import TabelaCotacoes
+from historico_odds import HistoricoOdds
+from nomes import indice_padrao, registrar_times
+from odds_api import TransmissorOddsApi
 from surebet import (
-    encontrar_surebets, calcular_stakes, projetar_banca, 
-    calcular_lucro_esperado, calcular_roi_mensal
+    iterar_surebets, filtrar_surebets, montar_oportunidade, calcular_stakes, projetar_banca, 
+    calcular_lucro_esperado, calcular_roi_mensal, calcular_lucro_percentual,
+    calcular_stakes_multiplas, calcular_lucro_esperado_multiplas, TopK
 )
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    """
+    Abre os navegadores do pool na subida (em segundo plano) se alguma coleta
+    vai usá-los e inicia o agendador de coleta, se ativado, e a transmissão da
+    The Odds API, se há chave; na saída para os dois e fecha os navegadores
+    """
+    if aquecer_chrome():
+        pool_chrome.aquecer()
+    if USAR_AGENDADOR:
+        agendador.iniciar()
+    if odds_api_configurada():
+        transmissor_odds_api.iniciar()
+    yield
+    agendador.parar()
+    transmissor_odds_api.parar()
+    pool_chrome.encerrar()
+    if historico_odds is not None:
+        historico_odds.encerrar()
+
+def aquecer_chrome() -> bool:
+    """
+    Se os navegadores do pool devem abrir já na subida. AQUECER_CHROME=1 força
+    e =0 impede; sem ele, só quando a coleta concorrente ou o agendador vão
+    chamar alguma casa de transporte "navegador" (a coleta padrão não usa
+    navegador, e abrir o Chrome pode até baixar o chromedriver).
+    """
+    escolha = os.getenv("AQUECER_CHROME")
+    if escolha is not None:
+        return escolha == "1"
+    return (USAR_AGENDADOR or COLETA_CONCORRENTE) and any(
+        adaptador.transporte == "navegador" for adaptador in ADAPTADORES_CASAS.values())
+
 app = FastAPI(
     title="API de Surebet",
     description="API para encontrar oportunidades de arbitragem em apostas esportivas",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=ciclo_de_vida
 )
 
+def valores_por_casa(prefixo: str) -> Dict[str, float]:
+    """Valores por casa vindos do ambiente, ex.: TTL_ODDS_BET365=60"""
+    return {
+        casa: float(os.environ[f"{prefixo}_{casa.upper()}"])
+        for casa in ADAPTADORES_CASAS if f"{prefixo}_{casa.upper()}" in os.environ
+    }
+
+# Com HISTORICO_ODDS=<diretório> toda coleta é acrescentada ao histórico em disco (historico_odds.py)
+historico_odds = HistoricoOdds(os.environ["HISTORICO_ODDS"]) if os.getenv("HISTORICO_ODDS") else None
+
+def guardar_historico(todas_odds: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Enfileira as odds coletadas para o histórico, se ativado, e as devolve sem alteração"""
+    if historico_odds is not None and todas_odds:
+        historico_odds.enfileirar(todas_odds)
+    return todas_odds
+
+# Com AGENDADOR_ODDS=1 as casas são coletadas em segundo plano, no ritmo do agendador,
+# e o TTL do cache passa a ser só uma rede de segurança para quando ele falhar
+USAR_AGENDADOR = os.getenv("AGENDADOR_ODDS", "0") == "1"
+
+# Odds servidas de um snapshot em memória; TTL_ODDS vale para todas as casas e
+# TTL_ODDS_<CASA> (ex.: TTL_ODDS_BET365=60) sobrescreve o de uma casa. Na coleta
+# concorrente, as casas que passam de ORCAMENTO_ATUALIZACAO segundos ficam com o último snapshot bom.
+# Com o agendador, a busca do cache (rede de segurança) também passa pelos
+# adaptadores, só das casas vencidas, como a coleta dele
+COLETA_CONCORRENTE = os.getenv("COLETA_CONCORRENTE", "0") == "1" or USAR_AGENDADOR
+ORCAMENTO_ATUALIZACAO_ODDS = float(os.getenv("ORCAMENTO_ATUALIZACAO", ORCAMENTO_ATUALIZACAO))
+cache_odds = CacheOdds(
+    lambda casas: guardar_historico(buscar_todas_odds(concorrente=COLETA_CONCORRENTE, casas=casas,
+                                                      orcamento=ORCAMENTO_ATUALIZACAO_ODDS)),
+    ttl=float(os.getenv("TTL_ODDS", INTERVALO_DISTANTE * MAX_CALMARIA if USAR_AGENDADOR else TTL_PADRAO)),
+    ttls_por_casa=valores_por_casa("TTL_ODDS"),
+    janela_obsoleta=float(os.getenv("JANELA_OBSOLETA_ODDS", JANELA_OBSOLETA)),
+    registrar=registrar_times,
+)
+
+# REQUISICOES_HORA_<CASA> limita as consultas por hora de uma casa
+agendador = AgendadorColeta(
+    ADAPTADORES_CASAS,
+    lambda novas: cache_odds.publicar(guardar_historico(novas)),
+    requisicoes_por_hora=valores_por_casa("REQUISICOES_HORA"),
+    concorrencia={"navegador": pool_chrome.tamanho},
+    disjuntores=disjuntores_casas,
+)
+
+def publicar_fluxo_odds_api(jogos: Iterable[Dict[str, List[Dict]]]) -> Snapshot:
+    """
+    Publica no cache os jogos da The Odds API à medida que chegam; o
+    histórico recebe as casas do fluxo no fim
+    """
+    if not USAR_AGENDADOR:
+        # As casas raspadas entram primeiro, para o snapshot não nascer só com as do fluxo
+        cache_odds.obter()
+
+    casas = set()
+
+    def anotados():
+        for jogo in jogos:
+            casas.update(jogo)
+            yield jogo
+
+    snapshot = cache_odds.publicar_fluxo(anotados())
+    guardar_historico({casa: snapshot.odds[casa] for casa in casas if casa in snapshot.odds})
+    return snapshot
+
+# Com ODDS_API_KEY, as casas da The Odds API chegam em fluxo, no intervalo que a cota permite
+transmissor_odds_api = TransmissorOddsApi(cliente_odds_api, ESPORTES_ODDS_API, publicar_fluxo_odds_api)
+
+# Surebets já calculadas por (versão do snapshot, parâmetros); a versão nova invalida as anteriores
+MAX_SUREBETS_GUARDADAS = 64
+_surebets_guardadas: "OrderedDict[Tuple, Tuple[List[Dict], Dict]]" = OrderedDict()
+_trava_surebets = threading.Lock()
+
+def montar_surebets_snapshot(snapshot: Snapshot, banca: float, vetorizado: bool = False,
+                             k: Optional[int] = None, ordenar_por: str = "lucro_percentual",
+                             roi_minimo: Optional[float] = None, **filtros) -> Tuple[List[Dict], Dict]:
+    """
+    Surebets do snapshot, reaproveitando o resultado enquanto a versão não muda.
+    Sem scanner vetorizado nem filtro de campeonato (que filtra cotações antes
+    do cruzamento), usa as surebets que o cache já detectou só nos eventos
+    alterados; senão detecta sobre a tabela inteira.
+    """
+    chave = (snapshot.versao, banca, vetorizado, k, ordenar_por, roi_minimo, tuple(sorted(filtros.items())))
+    with _trava_surebets:
+        guardado = _surebets_guardadas.get(chave)
+        if guardado is not None:
+            _surebets_guardadas.move_to_end(chave)
+            return guardado
+    
+    if vetorizado or filtros.get("campeonato") or snapshot.surebets is None:
+        guardado = montar_surebets(snapshot.tabela, banca, vetorizado, k, ordenar_por, roi_minimo, **filtros)
+    else:
+        filtros.pop("campeonato", None)
+        guardado = montar_surebets_detectadas(filtrar_surebets(snapshot.surebets, **filtros), banca, k, ordenar_por,
+                                              roi_minimo)
+    
+    with _trava_surebets:
+        _surebets_guardadas[chave] = guardado
+        for antiga in [c for c in _surebets_guardadas if c[0] < snapshot.versao]:
+            del _surebets_guardadas[antiga]
+        while len(_surebets_guardadas) > MAX_SUREBETS_GUARDADAS:
+            _surebets_guardadas.popitem(last=False)
+    return guardado
+
+def montar_surebets(tabela: TabelaCotacoes, banca: float, vetorizado: bool = False,
+                    k: Optional[int] = None, ordenar_por: str = "lucro_percentual",
+                    roi_minimo: Optional[float] = None, **filtros) -> Tuple[List[Dict], Dict]:
+    """
+    Detecta surebets entre todas as casas e calcula os stakes de cada aposta.
+    
+    Só as k melhores (por ordenar_por, decrescente) viram dicts, mantidas num
+    TopK durante a detecção; as estatísticas cobrem todas as encontradas.
+    Os filtros (lucro_minimo, casa, campeonato, mercado) são aplicados dentro
+    da detecção; roi_minimo, sobre o ROI com os stakes arredondados, logo
+    depois do cálculo dos stakes. Com vetorizado=True usa o scanner NumPy.
+    Retorna (surebets ordenadas, estatísticas).
+    """
+    if vetorizado:
+        return montar_surebets_vetorizado(tabela, banca, k, ordenar_por, roi_minimo, **filtros)
+    return montar_surebets_detectadas(iterar_surebets(tabela, **filtros), banca, k, ordenar_por, roi_minimo)
+
+def montar_surebets_detectadas(surebets, banca: float, k: Optional[int] = None,
+                               ordenar_por: str = "lucro_percentual",
+                               roi_minimo: Optional[float] = None) -> Tuple[List[Dict], Dict]:
+    """Stakes, TopK e estatísticas de montar_surebets sobre (evento, mercado, melhores, margem) já detectados"""
+    top = TopK(k)
+    lucro_total = soma_roi = 0.0
+    
+    for evento, mercado, melhores, margem in surebets:
+        odds = [odd for odd, _ in melhores.values()]
+        stakes = calcular_stakes_multiplas(banca, odds)
+        
+        if all(stake > 0 for stake in stakes):
+            lucros = calcular_lucro_esperado_multiplas(stakes, odds)
+            roi = (lucros["lucro_medio"] / banca) * 100
+            if roi_minimo is not None and round(roi, 2) < roi_minimo:
+                continue
+            
+            lucro_total += lucros["lucro_medio"]
+            soma_roi += roi
+            
+            prioridade = roi if ordenar_por == "roi_percentual" else round(calcular_lucro_percentual(margem), 2)
+            top.adicionar(prioridade, (evento, mercado, melhores, margem, stakes, lucros["lucro_medio"], roi))
+    
+    surebets = []
+    for evento, mercado, melhores, margem, stakes, lucro_medio, roi in top.ordenados():
+        op = montar_oportunidade(evento, mercado, melhores, margem)
+        
+        op["banca_total"] = banca
+        for i, stake in enumerate(stakes, 1):
+            op[f"stake{i}"] = stake
+        op.update({
+            "lucro_garantido": lucro_medio,
+            "roi_percentual": roi
+        })
+        
+        surebets.append(op)
+    
+    return surebets, {
+        "total_oportunidades": top.total,
+        "lucro_total_potencial": lucro_total,
+        "roi_medio": soma_roi / top.total if top.total else 0
+    }
+
+def montar_surebets_vetorizado(tabela: TabelaCotacoes, banca: float, k: Optional[int],
+                               ordenar_por: str, roi_minimo: Optional[float] = None,
+                               **filtros) -> Tuple[List[Dict], Dict]:
+    """Mesmo contrato de montar_surebets, com seleção e ordenação feitas em NumPy"""
+    import numpy as np
+    from surebet_vetorizado import selecionar_surebets_vetorizado, materializar_surebets
+    
+    selecao = selecionar_surebets_vetorizado(tabela, banca, **filtros)
+    
+    existentes = selecao.scanner.melhores_odds[selecao.linhas] > 0
+    aceitas = ((selecao.stakes > 0) | ~existentes).all(axis=1)
+    if roi_minimo is not None:
+        aceitas &= np.round(selecao.lucros_medios / banca * 100, 2) >= roi_minimo
+    validas = np.flatnonzero(aceitas)
+    
+    lucros_medios = selecao.lucros_medios[validas]
+    rois = lucros_medios / banca * 100
+    prioridades = rois if ordenar_por == "roi_percentual" else selecao.lucros_percentuais[validas]
+    
+    # Ordem decrescente e estável: empates ficam na ordem de detecção
+    ordem = validas[np.lexsort((validas, -prioridades))]
+    if k is not None:
+        ordem = ordem[:k]
+    
+    total = len(validas)
+    return materializar_surebets(selecao, ordem.tolist(), banca), {
+        "total_oportunidades": total,
+        "lucro_total_potencial": float(lucros_medios.sum()),
+        "roi_medio": float(rois.sum()) / total if total else 0
+    }
+
+def validar_paginacao(limit: Optional[int], offset: int):
+    """Valida os parâmetros de paginação das listas de surebets"""
+    if limit is not None and limit < 0:
+        raise HTTPException(status_code=400, detail="limit deve ser maior ou igual a zero")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset deve ser maior ou igual a zero")
+
 @app.get("/")
 def read_root():
     return {
         "mensagem": "API de Surebet v2.0 rodando!", 
         "endpoints": [
+            "/casas",
+            "/estatisticas",
+            "/historico",
             "/odds",
             "/odds/{casa}",
             "/surebets",
             "/calcular-stakes",
+            "/calcular-stakes/batch",
             "/projecao",
             "/relatorio-completo"
         ]
     }
 
+@app.get("/casas")
+def get_casas():
+    """
+    Casas registradas e seus metadados (transporte, mercados, custo, limites),
+    o estado do disjuntor e a situação no agendador
+    """
+    coleta = agendador.estatisticas() if USAR_AGENDADOR else {}
+    return {
+        "casas": {
+            casa: {**metadados, "disjuntor": disjuntores_casas[casa].estatisticas(), "agendador": coleta.get(casa)}
+            for casa, metadados in ADAPTADORES_CASAS.metadados().items()
+        }
+    }
+
+@app.get("/estatisticas")
+def get_estatisticas():
+    """
+    Contadores do cache de odds, com a taxa de eventos que vieram iguais à
+    coleta anterior (mudancas), e o tamanho do índice de nomes dos times
+    """
+    return {
+        "cache": cache_odds.estatisticas(),
+        "nomes": {"times": len(indice_padrao), "versao": indice_padrao.versao},
+    }
+
+@app.get("/historico")
+def get_historico(evento: Optional[str] = None, casa: Optional[str] = None, mercado: Optional[str] = None,
+                  horas: float = 24.0, limit: int = 1000):
+    """
+    Odds gravadas no histórico nas últimas `horas`, da mais antiga para a mais
+    recente, com filtros exatos de evento, casa (como vem nas cotações, ex.:
+    "Bet365") e mercado ("resultado", "total_gols_2.5")
+    """
+    if historico_odds is None:
+        raise HTTPException(status_code=404, detail="Histórico desativado: defina HISTORICO_ODDS com um diretório")
+    if horas <= 0 or limit <= 0:
+        raise HTTPException(status_code=400, detail="horas e limit devem ser maiores que zero")
+    
+    inicio = historico_odds.relogio() - horas * 3600
+    registros = []
+    for registro in historico_odds.iterar(inicio, casa=casa, evento=evento, mercado=mercado):
+        registros.append(registro._asdict())
+        if len(registros) >= limit:
+            break
+    
+    return {
+        "registros": registros,
+        "total": len(registros),
+        "estatisticas": historico_odds.estatisticas(),
+    }
+
 @app.get("/odds")
-def get_todas_odds():
-    """Busca odds de todas as casas disponíveis"""
+def get_todas_odds(concorrente: bool = False):
+    """
+    Odds de todas as casas disponíveis, lidas do snapshot em cache.
+    Com concorrente=true ignora o cache e consulta cada casa em paralelo,
+    com limite de tempo por casa.
+    """
     try:
-        logger.info("Buscando odds de todas as casas...")
-        todas_odds = buscar_todas_odds()
+        if concorrente:
+            logger.info("Buscando odds de todas as casas...")
+            todas_odds, snapshot = guardar_historico(buscar_todas_odds(concorrente=True)), None
+        else:
+            snapshot = cache_odds.obter()
+            todas_odds = snapshot.odds
         
         total_jogos = sum(len(odds) for odds in todas_odds.values())
         
         return {
             "casas": todas_odds,
             "total_jogos": total_jogos,
-            "casas_disponíveis": list(todas_odds.keys())
+            "casas_disponíveis": list(todas_odds.keys()),
+            "snapshot": snapshot.metadados() if snapshot else None
         }
     except Exception as e:
         logger.error(f"Erro ao buscar odds: {e}")
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.get("/odds/{casa}")
-def get_odds_casa(casa: str):
-    """Busca odds de uma casa específica"""
+async def get_odds_casa(casa: str, timeout: Optional[float] = None):
+    """Busca odds de uma casa específica, dentro do limite de tempo (segundos; padrão: o da casa)"""
     try:
         casa = casa.lower()
         
-        if casa == "bet365":
-            odds = buscar_odds_bet365()
-        elif casa == "superbet":
-            odds = buscar_odds_superbet()
-        elif casa == "betano":
-            odds = buscar_odds_betano()
-        else:
-            raise HTTPException(status_code=404, detail="Casa não encontrada. Disponíveis: bet365, superbet, betano")
+        adaptador = ADAPTADORES_CASAS.get(casa)
+        if adaptador is None:
+            raise HTTPException(status_code=404, detail=f"Casa não encontrada. Disponíveis: {', '.join(ADAPTADORES_CASAS)}")
+        if timeout is None:
+            timeout = adaptador.timeout or TIMEOUT_COLETA
+        if timeout <= 0:
+            raise HTTPException(status_code=400, detail="timeout deve ser maior que zero")
+        
+        resultado = await buscar_casa(casa, adaptador, timeout, disjuntores_casas[casa])
+        if resultado.erro is not None:
+            if resultado.erro == ERRO_CIRCUITO_ABERTO:
+                status = 503
+            else:
+                status = 504 if resultado.erro.startswith("timeout") else 500
+            raise HTTPException(status_code=status, detail=f"Erro ao buscar odds da {casa}: {resultado.erro}")
+        guardar_historico({casa: resultado.odds})
         
         return {
             "casa": casa,
-            "odds": odds,
-            "total_jogos": len(odds)
+            "odds": resultado.odds,
+            "total_jogos": len(resultado.odds)
         }
     except HTTPException:
         raise
@@ -76,52 +398,38 @@ def get_odds_casa(casa: str):
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.get("/surebets")
-def get_surebets(banca: float = 100.0):
-    """Encontra oportunidades de surebet e calcula stakes"""
+def get_surebets(banca: float = 100.0, vetorizado: bool = False, min_roi: Optional[float] = None,
+                 limit: Optional[int] = None, offset: int = 0, casa: Optional[str] = None,
+                 campeonato: Optional[str] = None, mercado: Optional[str] = None):
+    """
+    Encontra oportunidades de surebet e calcula stakes.
+    Filtros (min_roi, casa, campeonato, mercado) e paginação (limit, offset)
+    são aplicados durante a detecção, sem montar a lista inteira; min_roi
+    vale para o roi_percentual de cada surebet (com os stakes arredondados).
+    """
     try:
         if banca <= 0:
             raise HTTPException(status_code=400, detail="Banca deve ser maior que zero")
+        validar_paginacao(limit, offset)
         
         logger.info(f"Buscando surebets com banca de R$ {banca}")
         
-        # Busca odds de todas as casas
-        todas_odds = buscar_todas_odds()
-        
-        # Encontra surebets comparando casas duas a duas
-        surebets = []
-        casas = list(todas_odds.keys())
-        
-        for i in range(len(casas)):
-            for j in range(i + 1, len(casas)):
-                casa1, casa2 = casas[i], casas[j]
-                odds1, odds2 = todas_odds[casa1], todas_odds[casa2]
-                
-                oportunidades = encontrar_surebets(odds1, odds2)
-                
-                for op in oportunidades:
-                    stake1, stake2 = calcular_stakes(banca, op["odd1"], op["odd2"])
-                    
-                    if stake1 > 0 and stake2 > 0:
-                        lucros = calcular_lucro_esperado(stake1, op["odd1"], stake2, op["odd2"])
-                        
-                        op.update({
-                            "banca_total": banca,
-                            "stake1": stake1,
-                            "stake2": stake2,
-                            "lucro_garantido": lucros["lucro_medio"],
-                            "roi_percentual": (lucros["lucro_medio"] / banca) * 100
-                        })
-                        
-                        surebets.append(op)
-        
-        # Ordena por lucro percentual decrescente
-        surebets.sort(key=lambda x: x["lucro_percentual"], reverse=True)
+        # Odds de todas as casas, do snapshot em cache
+        snapshot = cache_odds.obter()
+        
+        # Encontra surebets com as melhores odds de todas as casas, já ordenadas por lucro percentual
+        k = max(offset + limit, 1) if limit is not None else None
+        surebets, estatisticas = montar_surebets_snapshot(
+            snapshot, banca, vetorizado, k,
+            roi_minimo=min_roi, casa=casa, campeonato=campeonato, mercado=mercado
+        )
         
         return {
-            "surebets": surebets,
-            "total_oportunidades": len(surebets),
+            "surebets": surebets[offset:offset + limit] if limit is not None else surebets[offset:],
+            "total_oportunidades": estatisticas["total_oportunidades"],
             "banca_utilizada": banca,
-            "melhor_oportunidade": surebets[0] if surebets else None
+            "melhor_oportunidade": surebets[0] if surebets else None,
+            "snapshot": snapshot.metadados()
         }
         
     except HTTPException:
@@ -171,6 +479,71 @@ def calcular_stakes_endpoint(odd1: float, odd2: float, banca: float):
         logger.error(f"Erro ao calcular stakes: {e}")
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+# Limite de cenários por requisição em /calcular-stakes/batch
+MAX_CENARIOS_LOTE = 100_000
+
+class LoteStakes(BaseModel):
+    """Cenários para /calcular-stakes/batch: odds de cada cenário e a banca (única ou por cenário)"""
+    odds: List[List[float]]
+    bancas: Union[float, List[float]]
+
+@app.post("/calcular-stakes/batch")
+def calcular_stakes_lote_endpoint(lote: LoteStakes):
+    """
+    Calcula stakes, lucro garantido e ROI de vários cenários de uma vez.
+    Cada cenário tem 2 ou mais odds (2-way e 1X2 podem vir misturados).
+    As respostas vêm em colunas, na ordem dos cenários enviados.
+    """
+    try:
+        import numpy as np
+        from surebet_vetorizado import calcular_stakes_lote
+        
+        total = len(lote.odds)
+        if total == 0:
+            raise HTTPException(status_code=400, detail="Informe ao menos um cenário")
+        if total > MAX_CENARIOS_LOTE:
+            raise HTTPException(status_code=400, detail=f"Máximo de {MAX_CENARIOS_LOTE} cenários por requisição")
+        
+        tamanhos = [len(odds) for odds in lote.odds]
+        if min(tamanhos) < 2:
+            raise HTTPException(status_code=400, detail="Cada cenário precisa de ao menos 2 odds")
+        
+        if min(tamanhos) == max(tamanhos):
+            odds = np.asarray(lote.odds, dtype=np.float64)
+        else:
+            odds = np.full((total, max(tamanhos)), np.nan)
+            for i, linha in enumerate(lote.odds):
+                odds[i, :len(linha)] = linha
+        
+        if not (np.isnan(odds) | (odds > 1)).all():
+            raise HTTPException(status_code=400, detail="Odds devem ser maiores que 1")
+        
+        bancas = np.asarray(lote.bancas, dtype=np.float64)
+        if bancas.ndim == 1 and len(bancas) != total:
+            raise HTTPException(status_code=400, detail="Informe uma banca ou uma banca por cenário")
+        if (bancas <= 0).any():
+            raise HTTPException(status_code=400, detail="Banca deve ser maior que zero")
+        
+        resultado = calcular_stakes_lote(odds, bancas)
+        stakes, lucros = resultado.stakes.tolist(), resultado.lucros.tolist()
+        
+        return {
+            "total_cenarios": total,
+            "total_surebets": int(resultado.surebets.sum()),
+            "surebet": resultado.surebets.tolist(),
+            "margem": np.round(resultado.margens, 4).tolist(),
+            "stakes": [linha[:tamanho] for linha, tamanho in zip(stakes, tamanhos)],
+            "lucros_cenarios": [linha[:tamanho] for linha, tamanho in zip(lucros, tamanhos)],
+            "lucro_garantido": resultado.lucros_garantidos.tolist(),
+            "roi_percentual": resultado.rois_percentuais.tolist()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao calcular stakes em lote: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
 @app.get("/projecao")
 def get_projecao(banca_inicial: float = 400, banca_final: float = 2400, dias: int = 30):
     """Calcula projeção de crescimento de banca"""
@@ -215,65 +588,50 @@ def get_projecao(banca_inicial: float = 400, banca_final: float = 2400, dias: in
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.get("/relatorio-completo")
-def get_relatorio_completo(banca: float = 1000.0):
-    """Gera relatório completo com todas as informações"""
+def get_relatorio_completo(banca: float = 1000.0, vetorizado: bool = False, min_roi: Optional[float] = None,
+                           limit: Optional[int] = None, offset: int = 0, casa: Optional[str] = None,
+                           campeonato: Optional[str] = None, mercado: Optional[str] = None):
+    """
+    Gera relatório completo com todas as informações.
+    Os filtros e a paginação valem para todas_oportunidades; o resumo cobre
+    todas as surebets que passam nos filtros.
+    """
     try:
         if banca <= 0:
             raise HTTPException(status_code=400, detail="Banca deve ser maior que zero")
+        validar_paginacao(limit, offset)
         
         logger.info("Gerando relatório completo...")
         
-        # Busca todas as odds
-        todas_odds = buscar_todas_odds()
-        
-        # Encontra surebets
-        surebets = []
-        casas = list(todas_odds.keys())
-        
-        for i in range(len(casas)):
-            for j in range(i + 1, len(casas)):
-                casa1, casa2 = casas[i], casas[j]
-                odds1, odds2 = todas_odds[casa1], todas_odds[casa2]
-                
-                oportunidades = encontrar_surebets(odds1, odds2)
-                
-                for op in oportunidades:
-                    stake1, stake2 = calcular_stakes(banca, op["odd1"], op["odd2"])
-                    
-                    if stake1 > 0 and stake2 > 0:
-                        lucros = calcular_lucro_esperado(stake1, op["odd1"], stake2, op["odd2"])
-                        
-                        op.update({
-                            "banca_total": banca,
-                            "stake1": stake1,
-                            "stake2": stake2,
-                            "lucro_garantido": lucros["lucro_medio"],
-                            "roi_percentual": (lucros["lucro_medio"] / banca) * 100
-                        })
-                        
-                        surebets.append(op)
-        
-        # Ordena por ROI decrescente
-        surebets.sort(key=lambda x: x["roi_percentual"], reverse=True)
+        # Odds de todas as casas, do snapshot em cache
+        snapshot = cache_odds.obter()
+        
+        # Encontra surebets, já ordenadas por ROI decrescente
+        k = max(offset + limit, 5) if limit is not None else None
+        surebets, estatisticas = montar_surebets_snapshot(
+            snapshot, banca, vetorizado, k, ordenar_por="roi_percentual",
+            roi_minimo=min_roi, casa=casa, campeonato=campeonato, mercado=mercado
+        )
         
         # Estatísticas
-        total_jogos = sum(len(odds) for odds in todas_odds.values())
-        lucro_total_potencial = sum(sb["lucro_garantido"] for sb in surebets)
-        roi_medio = sum(sb["roi_percentual"] for sb in surebets) / len(surebets) if surebets else 0
+        total_jogos = sum(len(odds) for odds in snapshot.odds.values())
+        lucro_total_potencial = estatisticas["lucro_total_potencial"]
+        roi_medio = estatisticas["roi_medio"]
         
         return {
             "resumo": {
-                "casas_monitoradas": len(todas_odds),
+                "casas_monitoradas": len(snapshot.odds),
                 "total_jogos": total_jogos,
-                "total_surebets": len(surebets),
+                "total_surebets": estatisticas["total_oportunidades"],
                 "banca_analisada": banca,
                 "lucro_total_potencial": round(lucro_total_potencial, 2),
                 "roi_medio": round(roi_medio, 2)
             },
             "melhores_oportunidades": surebets[:5],  # Top 5
-            "todas_oportunidades": surebets,
-            "odds_por_casa": todas_odds,
-            "timestamp": "dados atualizados em tempo real"
+            "todas_oportunidades": surebets[offset:offset + limit] if limit is not None else surebets[offset:],
+            "odds_por_casa": snapshot.odds,
+            "timestamp": "dados atualizados em tempo real",
+            "snapshot": snapshot.metadados()
         }
         
     except HTTPException:
@@ -0,0 +1,207 @@
+"""
+Pool de navegadores reutilizáveis para os scrapers com Selenium.
+
+Abrir um Chrome custa segundos; aqui os drivers ficam abertos e são
+emprestados (obter/devolver ou o contexto usar()) a cada scraping. Antes do
+empréstimo o driver passa por um teste de saúde, e é trocado por um novo
+depois de MAX_PAGINAS páginas ou quando trava. As reposições são feitas em
+segundo plano, para que a requisição não espere um navegador subir.
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Drivers abertos ao mesmo tempo
+TAMANHO_POOL = 2
+
+# Páginas carregadas por um driver antes de ser reciclado (memória do Chrome cresce com o uso)
+MAX_PAGINAS = 50
+
+# Segundos esperando um driver livre antes de desistir
+TIMEOUT_EMPRESTIMO = 30.0
+
+class DriverEmprestado:
+    """Driver do pool com a contagem de páginas carregadas desde que foi aberto"""
+
+    __slots__ = ("driver", "paginas", "criado_em")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.paginas = 0
+        self.criado_em = time.monotonic()
+
+class PoolNavegadores:
+    """
+    Pool de drivers criados por fabrica(), compartilhado entre threads.
+    Os drivers são criados sob demanda até o tamanho do pool, ou antes com aquecer().
+    """
+
+    def __init__(self, fabrica: Callable, tamanho: int = TAMANHO_POOL, max_paginas: int = MAX_PAGINAS):
+        self.fabrica = fabrica
+        self.tamanho = tamanho
+        self.max_paginas = max_paginas
+
+        # LIFO: o driver devolvido por último (mais "quente") é o próximo a sair
+        self._livres: "queue.LifoQueue[DriverEmprestado]" = queue.LifoQueue()
+        self._emprestados: Dict[int, DriverEmprestado] = {}
+        self._abertos = 0                  # livres + emprestados + sendo criados
+        self._trava = threading.Lock()
+        self._encerrado = False
+
+        self.criados = 0
+        self.reciclados = 0
+
+    def aquecer(self, quantidade: Optional[int] = None, em_segundo_plano: bool = True):
+        """Abre drivers até o tamanho do pool (ou quantidade), por padrão em uma thread à parte"""
+        quantidade = self.tamanho if quantidade is None else min(quantidade, self.tamanho)
+        faltando = max(quantidade - self._abertos, 0)
+        for _ in range(faltando):
+            self._repor(em_segundo_plano)
+
+    def obter(self, timeout: float = TIMEOUT_EMPRESTIMO):
+        """
+        Empresta um driver saudável. Usa um livre se houver, abre um novo se o
+        pool ainda não estiver cheio e, senão, espera até timeout segundos.
+        """
+        limite = time.monotonic() + timeout
+
+        while True:
+            if self._encerrado:
+                raise RuntimeError("Pool de navegadores encerrado")
+
+            try:
+                entrada = self._livres.get_nowait()
+            except queue.Empty:
+                entrada = self._abrir_se_houver_vaga()
+                if entrada is None:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise TimeoutError(f"Nenhum navegador livre em {timeout:.1f}s")
+                    try:
+                        entrada = self._livres.get(timeout=restante)
+                    except queue.Empty:
+                        continue
+
+            if self._saudavel(entrada.driver):
+                self._emprestados[id(entrada.driver)] = entrada
+                return entrada.driver
+
+            logger.warning("🩺 Navegador sem resposta no teste de saúde, trocando por outro")
+            self._descartar(entrada)
+            self._repor()
+
+    def devolver(self, driver, paginas: int = 1, falhou: bool = False):
+        """
+        Devolve o driver ao pool contando as páginas carregadas com ele.
+        Com falhou=True o driver passa pelo teste de saúde e é trocado se não responder.
+        """
+        entrada = self._emprestados.pop(id(driver), None)
+        if entrada is None:
+            return
+
+        entrada.paginas += paginas
+        gasto = entrada.paginas >= self.max_paginas
+        if self._encerrado or gasto or (falhou and not self._saudavel(driver)):
+            self._descartar(entrada)
+            if not self._encerrado:
+                self._repor()
+            return
+
+        self._livres.put(entrada)
+
+    @contextmanager
+    def usar(self, timeout: float = TIMEOUT_EMPRESTIMO):
+        """with pool.usar() as driver: ... — devolve o driver mesmo se o scraping falhar"""
+        driver = self.obter(timeout)
+        falhou = False
+        try:
+            yield driver
+        except BaseException:
+            falhou = True
+            raise
+        finally:
+            self.devolver(driver, falhou=falhou)
+
+    def encerrar(self):
+        """Fecha todos os drivers livres; os emprestados são fechados quando voltarem"""
+        self._encerrado = True
+        while True:
+            try:
+                self._descartar(self._livres.get_nowait())
+            except queue.Empty:
+                break
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Contadores do pool, para logs e diagnóstico"""
+        return {
+            "abertos": self._abertos,
+            "livres": self._livres.qsize(),
+            "emprestados": len(self._emprestados),
+            "criados": self.criados,
+            "reciclados": self.reciclados,
+        }
+
+    def _abrir_se_houver_vaga(self) -> Optional[DriverEmprestado]:
+        with self._trava:
+            if self._abertos >= self.tamanho:
+                return None
+            self._abertos += 1
+        return self._criar()
+
+    def _repor(self, em_segundo_plano: bool = True):
+        """Abre um driver para ocupar a vaga de um descartado"""
+        with self._trava:
+            if self._abertos >= self.tamanho:
+                return
+            self._abertos += 1
+
+        def abrir():
+            try:
+                entrada = self._criar()
+            except Exception as e:
+                logger.error(f"❌ Falha ao abrir navegador: {e}")
+                return
+            if self._encerrado:
+                self._descartar(entrada)
+            else:
+                self._livres.put(entrada)
+
+        if em_segundo_plano:
+            threading.Thread(target=abrir, name="pool-navegadores", daemon=True).start()
+        else:
+            abrir()
+
+    def _criar(self) -> DriverEmprestado:
+        """Chama a fábrica; a vaga já foi reservada em _abertos e é liberada se ela falhar"""
+        try:
+            driver = self.fabrica()
+        except BaseException:
+            with self._trava:
+                self._abertos -= 1
+            raise
+
+        self.criados += 1
+        return DriverEmprestado(driver)
+
+    def _descartar(self, entrada: DriverEmprestado):
+        with self._trava:
+            self._abertos -= 1
+        self.reciclados += 1
+        try:
+            entrada.driver.quit()
+        except Exception as e:
+            logger.debug(f"Erro ao fechar navegador: {e}")
+
+    @staticmethod
+    def _saudavel(driver) -> bool:
+        """Teste de saúde barato: o navegador ainda executa JavaScript?"""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
@@ -0,0 +1,340 @@
+"""
+Canonicalização de nomes de times e eventos.
+
+Cada casa escreve os times do seu jeito ("Bayern München" x "Bayern Munich",
+"Atlético-MG" x "Atletico Mineiro"). Aqui os nomes passam por remoção de
+acentos e normalização de tokens, por um dicionário de aliases e, por fim,
+por uma busca aproximada em um índice de trigramas, de modo que só os times
+que compartilham trigramas raros com o nome procurado são comparados. Os
+nomes já resolvidos ficam em um cache LRU limitado.
+
+A busca aproximada erra para o lado seguro: um nome com um token a mais que
+o outro ("Botafogo SP" x "Botafogo", "Newcastle Jets" x "Newcastle") não é o
+mesmo time, e o nome de um evento só é aproximado a times já vistos no
+mesmo campeonato. Sem campeonato, o evento só casa por nome exato ou alias.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import re
+import threading
+import unicodedata
+
+# Tokens que não ajudam a diferenciar times ("sc" fica: "Barcelona SC" não é o Barcelona)
+TOKENS_IRRELEVANTES = {
+    "fc", "cf", "afc", "ec", "club", "clube", "futebol", "football",
+    "de", "da", "do", "the"
+}
+
+# Nome canônico -> variações conhecidas (comparadas já normalizadas); siglas
+# curtas que outros times também usam (om, ol, cam, cap) ficam de fora
+ALIASES_TIMES = {
+    "bayern munich": ["bayern münchen", "bayern munchen", "bayern muenchen", "fc bayern", "bayern"],
+    "atletico mineiro": ["atlético-mg", "atletico mg", "atl mineiro"],
+    "atletico paranaense": ["athletico-pr", "athletico paranaense", "atletico pr"],
+    "atletico goianiense": ["atlético-go", "atletico go"],
+    "atletico madrid": ["atlético de madrid", "atl madrid", "atleti"],
+    "borussia dortmund": ["dortmund", "bvb", "bvb 09"],
+    "borussia monchengladbach": ["borussia mönchengladbach", "gladbach", "m gladbach"],
+    "paris saint germain": ["psg", "paris sg", "paris saint-germain"],
+    "olympique marseille": ["marseille", "olympique de marseille"],
+    "olympique lyonnais": ["lyon"],
+    "manchester united": ["man utd", "man united", "manchester utd"],
+    "manchester city": ["man city"],
+    "tottenham hotspur": ["tottenham", "spurs"],
+    "wolverhampton wanderers": ["wolves", "wolverhampton"],
+    "newcastle united": ["newcastle"],
+    "ac milan": ["milan"],
+    "inter milan": ["internazionale", "inter de milão", "fc internazionale milano"],
+    "juventus": ["juve"],
+    "barcelona": ["barça", "fc barcelona"],
+    "vasco da gama": ["vasco"],
+    "red bull bragantino": ["bragantino", "rb bragantino"],
+}
+
+# Nomes usados pelas casas para o empate no mercado 1X2
+SINONIMOS_EMPATE = {"empate", "draw", "x", "tie"}
+
+# Lados dos mercados de total de gols (e como as casas os escrevem), que não são nomes de times
+LADOS_TOTAL = {
+    "over": "over", "mais": "over", "mais de": "over", "acima": "over",
+    "under": "under", "menos": "under", "menos de": "under", "abaixo": "under",
+}
+
+# Separadores de mandante/visitante aceitos nos nomes de eventos
+SEPARADOR_EVENTO = re.compile(r"\s+(?:vs\.?|x|v)\s+", re.IGNORECASE)
+
+# Temporada no nome do campeonato ("2024", "2024/25", "2024-2025")
+TOKEN_TEMPORADA = re.compile(r"^\d{4}(?:[/-]\d{2,4})?$")
+
+# Rodada ou fase no fim do nome do campeonato, já sem acentos e em minúsculas
+# ("brasileirao - rodada 12", "copa do brasil, quartas de final", "premier league matchday 3")
+SUFIXO_FASE = re.compile(
+    r"\s*[-:,|(]?\s*\b(?:\d+\s*[ao]?\s+)?"
+    r"(?:rodada|jornada|round|matchday|semana|week|fase|etapa|stage|grupo|group|"
+    r"oitavas|quartas|semifinais|semifinal|semi|finais|final|playoffs?|play-offs?)\b.*$"
+)
+
+LIMIAR_SIMILARIDADE = 0.75
+MARGEM_AMBIGUIDADE = 0.05
+TAMANHO_CACHE = 65536
+
+# Trigramas presentes em mais times que isso não servem para gerar candidatos
+LIMITE_POSTAGEM = 256
+MAX_CANDIDATOS = 32
+
+def dobrar_acentos(texto: str) -> str:
+    """Remove acentos ("Grêmio" -> "Gremio")"""
+    if texto.isascii():
+        return texto
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+def normalizar_texto(texto: str) -> str:
+    """Sem acentos, em minúsculas, sem pontuação e sem tokens irrelevantes"""
+    tokens = re.sub(r"[^\w\s]", " ", dobrar_acentos(texto).casefold()).split()
+    relevantes = [token for token in tokens if token not in TOKENS_IRRELEVANTES]
+    return " ".join(relevantes or tokens)
+
+def trigramas(texto: str) -> Set[str]:
+    """Trigramas do texto, com espaços nas bordas para valorizar início e fim das palavras"""
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def tokens_compativeis(nome1: str, nome2: str) -> bool:
+    """
+    Números e tokens de uma letra precisam ser iguais nos dois nomes
+    ("Time 1 A" não é "Time 1 B", "Sub 20" não é "Sub 17"), e nenhum dos
+    nomes pode ser o outro com tokens a mais ("Botafogo SP" não é "Botafogo").
+    """
+    tokens1, tokens2 = set(nome1.split()), set(nome2.split())
+    if tokens1 != tokens2 and (tokens1 <= tokens2 or tokens2 <= tokens1):
+        return False
+
+    def marcantes(tokens):
+        return {token for token in tokens if token.isdigit() or len(token) == 1}
+    return marcantes(tokens1) == marcantes(tokens2)
+
+class IndiceTimes:
+    """
+    Nomes canônicos de times com aliases e um índice de trigramas para a
+    busca aproximada. resolver() é cacheado em um LRU limitado.
+
+    registrar() pode ser chamado pelas threads de coleta enquanto outras
+    resolvem nomes: a escrita é serializada por uma trava, e cada entrada só
+    aparece em _por_nome e nas postagens depois de completa, então a leitura
+    não precisa da trava.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, List[str]]] = None,
+                 limiar: float = LIMIAR_SIMILARIDADE, tamanho_cache: int = TAMANHO_CACHE):
+        self.limiar = limiar
+        self.versao = 0                        # muda sempre que o índice aprende nomes
+        self._aliases: Dict[str, str] = {}
+        self._nomes: List[str] = []            # nome indexado de cada entrada
+        self._por_nome: Dict[str, int] = {}
+        self._canonicos: List[str] = []        # nome canônico de cada entrada
+        self._trigramas: List[Set[str]] = []
+        self._postagens: Dict[str, List[int]] = {}
+        self._campeonatos: Dict[str, Set[str]] = {}   # nome canônico -> campeonatos em que foi visto
+        self._trava = threading.RLock()
+        self.resolver = lru_cache(maxsize=tamanho_cache)(self._resolver)
+
+        for canonico, variacoes in (ALIASES_TIMES if aliases is None else aliases).items():
+            self.adicionar_alias(canonico, variacoes)
+
+    def __len__(self) -> int:
+        return len(self._nomes)
+
+    def adicionar_alias(self, canonico: str, variacoes: Iterable[str]):
+        """Registra um nome canônico e suas variações"""
+        with self._trava:
+            canonico = normalizar_texto(canonico)
+            self._indexar(canonico, canonico)
+
+            for variacao in variacoes:
+                variacao = normalizar_texto(variacao)
+                self._aliases[variacao] = canonico
+                self._indexar(variacao, canonico)
+
+            self._invalidar()
+
+    def registrar(self, nome: str, campeonato: Optional[str] = None) -> str:
+        """
+        Resolve o nome no campeonato e, se ele não corresponder a nenhum time
+        conhecido, passa a conhecê-lo; o time fica marcado como visto no
+        campeonato. Retorna o nome canônico.
+        """
+        campeonato = normalizar_campeonato(campeonato)
+        with self._trava:
+            canonico = self.resolver(nome, campeonato)
+            mudou = False
+            if canonico not in self._aliases and canonico not in self._por_nome:
+                self._indexar(canonico, canonico)
+                mudou = True
+            if campeonato is not None and campeonato not in self._campeonatos.get(canonico, ()):
+                self._campeonatos.setdefault(canonico, set()).add(campeonato)
+                mudou = True
+            if mudou:
+                self._invalidar()
+        return canonico
+
+    def _invalidar(self):
+        self.versao += 1
+        self.resolver.cache_clear()
+
+    def _indexar(self, nome: str, canonico: str):
+        if nome in self._aliases and self._aliases[nome] != canonico:
+            return
+        if nome in self._por_nome:
+            return
+
+        # As listas crescem antes de a entrada ficar visível para quem lê sem a trava
+        indice = len(self._nomes)
+        self._nomes.append(nome)
+        self._canonicos.append(canonico)
+        self._trigramas.append(trigramas(nome))
+        for trigrama in self._trigramas[indice]:
+            self._postagens.setdefault(trigrama, []).append(indice)
+        self._por_nome[nome] = indice
+
+    def _resolver(self, nome: str, campeonato: Optional[str] = None) -> str:
+        """
+        Nome canônico. Com campeonato (já normalizado), a busca aproximada só
+        aceita times vistos nele; sem, aceita qualquer um (quem chama já sabe
+        que os nomes são do mesmo evento, como os resultados de um livro).
+        """
+        chave = normalizar_texto(nome)
+
+        canonico = self._aliases.get(chave)
+        if canonico is not None:
+            return canonico
+
+        if chave in self._por_nome:
+            return self._canonicos[self._por_nome[chave]]
+
+        return self.buscar_aproximado(chave, campeonato) or chave
+
+    def resolver_exato(self, nome: str) -> str:
+        """Nome canônico só por alias ou nome já conhecido, sem busca aproximada"""
+        chave = normalizar_texto(nome)
+        canonico = self._aliases.get(chave)
+        if canonico is not None:
+            return canonico
+        indice = self._por_nome.get(chave)
+        return chave if indice is None else self._canonicos[indice]
+
+    def buscar_aproximado(self, chave: str, campeonato: Optional[str] = None) -> Optional[str]:
+        """
+        Procura o time conhecido mais parecido (coeficiente de Dice sobre
+        trigramas). Os candidatos vêm só dos trigramas pouco frequentes do
+        nome, então o custo não cresce com o número de times conhecidos.
+        Com campeonato, só os times vistos nele são candidatos.
+        """
+        trigramas_chave = trigramas(chave)
+
+        contagem: Dict[int, int] = {}
+        ignorados = 0
+        for trigrama in trigramas_chave:
+            entradas = self._postagens.get(trigrama, ())
+            if len(entradas) > LIMITE_POSTAGEM:
+                ignorados += 1
+                continue
+            for indice in entradas:
+                contagem[indice] = contagem.get(indice, 0) + 1
+
+        candidatos = sorted(contagem, key=contagem.get, reverse=True)[:MAX_CANDIDATOS]
+
+        pontuacoes: Dict[str, float] = {}
+        for indice in candidatos:
+            outros = self._trigramas[indice]
+            tamanho = len(trigramas_chave) + len(outros)
+
+            # Limite superior: trigramas raros em comum mais todos os frequentes ignorados
+            if 2 * (contagem[indice] + ignorados) / tamanho < self.limiar:
+                continue
+
+            dice = 2 * len(trigramas_chave & outros) / tamanho
+            canonico = self._canonicos[indice]
+            if campeonato is not None and campeonato not in self._campeonatos.get(canonico, ()):
+                continue
+            if dice > pontuacoes.get(canonico, 0.0) and tokens_compativeis(chave, self._nomes[indice]):
+                pontuacoes[canonico] = dice
+
+        if not pontuacoes:
+            return None
+
+        ranking: List[Tuple[float, str]] = sorted(((p, c) for c, p in pontuacoes.items()), reverse=True)
+        melhor, canonico = ranking[0]
+        segundo = ranking[1][0] if len(ranking) > 1 else 0.0
+
+        if melhor >= self.limiar and melhor - segundo >= MARGEM_AMBIGUIDADE:
+            return canonico
+        return None
+
+# Índice compartilhado por toda a aplicação
+indice_padrao = IndiceTimes()
+
+def canonicalizar_time(nome: str) -> str:
+    """Nome canônico do time no índice compartilhado"""
+    return indice_padrao.resolver(nome)
+
+def chave_resultado(resultado: str) -> str:
+    """Chave de comparação de um resultado: time canônico, "empate" ou lado do total"""
+    dobrado = resultado.strip().casefold()
+    if dobrado in SINONIMOS_EMPATE:
+        return "empate"
+    lado = LADOS_TOTAL.get(dobrado)
+    if lado is not None:
+        return lado
+    return indice_padrao.resolver(resultado)
+
+def canonicalizar_evento(evento: str, campeonato: Optional[str] = None) -> str:
+    """
+    Chave canônica do evento: mandante e visitante canônicos, nessa ordem
+    ("Flamengo x Palmeiras" e "Flamengo vs Palmeiras" são a mesma chave;
+    "Palmeiras x Flamengo" é o returno). Os times só são aproximados a times
+    já vistos no campeonato; sem ele, só aliases e nomes exatos contam.
+    """
+    return _canonicalizar_evento(evento, normalizar_campeonato(campeonato), indice_padrao.versao)
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _canonicalizar_evento(evento: str, campeonato: Optional[str], versao: int) -> str:
+    # A versão do índice entra na chave do cache: quando o índice aprende
+    # nomes novos, as chaves antigas deixam de ser usadas e saem pelo LRU
+    partes = SEPARADOR_EVENTO.split(evento.strip())
+    if len(partes) != 2:
+        return normalizar_texto(evento)
+    if campeonato is None:
+        return " vs ".join(indice_padrao.resolver_exato(parte) for parte in partes)
+    return " vs ".join(indice_padrao.resolver(parte, campeonato) for parte in partes)
+
+@lru_cache(maxsize=1024)
+def normalizar_campeonato(campeonato: Optional[str]) -> Optional[str]:
+    """
+    Nome do campeonato para comparação entre casas, sem acentos, sem a
+    temporada e sem rodada ou fase ("Brasileirão Série A 2024" -> "brasileirao
+    serie a", "Brasileirão - Rodada 12" -> "brasileirao").
+    """
+    if not campeonato:
+        return None
+    texto = dobrar_acentos(campeonato).casefold()
+    sufixo = SUFIXO_FASE.search(texto)
+    if sufixo is not None and sufixo.start() > 0:
+        texto = texto[:sufixo.start()]
+    tokens = texto.split()
+    return " ".join(token for token in tokens if not TOKEN_TEMPORADA.match(token)) or None
+
+def registrar_times(cotacoes: Iterable[Dict]) -> int:
+    """
+    Ensina ao índice compartilhado os times das cotações de uma casa, com o
+    campeonato de cada uma. Retorna quantos times novos passaram a ser conhecidos.
+    """
+    antes = len(indice_padrao)
+    for cotacao in cotacoes:
+        partes = SEPARADOR_EVENTO.split(cotacao["evento"].strip())
+        if len(partes) == 2:
+            for parte in partes:
+                indice_padrao.registrar(parte, cotacao.get("campeonato"))
+
+    return len(indice_padrao) - antes
@@ -0,0 +1,319 @@
+"""
+Cliente da The Odds API que economiza a cota de requisições.
+
+- Cada esporte é uma única chamada com todos os mercados e regiões juntos
+  (a API cobra mercados x regiões por chamada, não por jogo).
+- A lista de esportes em temporada (gratuita) evita gastar cota com ligas paradas.
+- Os cabeçalhos x-requests-remaining/x-requests-used são acompanhados: o
+  intervalo entre buscas do mesmo esporte cresce para que a cota restante
+  dure até a renovação, e as chamadas param ao chegar na reserva mínima.
+- A resposta de cada esporte fica guardada até vencer e continua sendo
+  servida quando a cota não permite buscar de novo.
+- O corpo é lido aos pedaços e cada jogo é decodificado assim que chega
+  (fluxo_json), sem carregar o JSON inteiro de uma vez.
+- O resultado vem em uma TabelaCotacoes (uma linha por casa x jogo x
+  mercado), escrita direto do JSON, sem montar um dict por cotação; ou, com
+  iterar(), como um gerador de cotações para quem processa à medida que chegam.
+- TransmissorOddsApi busca em segundo plano, no intervalo que a cota permite,
+  e entrega os jogos um a um a CacheOdds.publicar_fluxo(); nesse caminho as
+  respostas não ficam guardadas no cliente (o cache já guarda as cotações).
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+import threading
+import time
+
+from cotacoes import TabelaCotacoes
+from fluxo_json import TAMANHO_PEDACO, iterar_array_json
+from sessoes_http import ClienteHttp, cliente_http
+
+logger = logging.getLogger(__name__)
+
+ODDS_API_BASE_URL = "https://api.the-odds-api.com/v4"
+
+# Mercados da API e o nome usado pelo detector de surebets
+MERCADOS_ODDS_API = {
+    "h2h": "resultado",
+    "totals": "total_gols",
+}
+
+REGIOES_PADRAO = ("eu",)
+
+# Segundos em que a resposta de um esporte vale antes de buscar de novo
+TTL_ESPORTE = 300.0
+
+# Segundos em que a lista de esportes em temporada vale
+TTL_ESPORTES_ATIVOS = 3600.0
+
+# Período da cota (a do plano gratuito renova todo mês)
+PERIODO_COTA = 30 * 24 * 3600.0
+
+# Requisições que nunca são gastas, para sobrar cota para uso manual
+RESERVA_MINIMA = 10
+
+class ClienteOddsApi:
+    """
+    Busca odds de vários esportes e mercados na The Odds API respeitando a
+    cota. O estado da cota (restantes, usadas) vem dos cabeçalhos da última resposta.
+    """
+
+    def __init__(self, chave: str, mercados: Iterable[str] = tuple(MERCADOS_ODDS_API),
+                 regioes: Iterable[str] = REGIOES_PADRAO, ttl: float = TTL_ESPORTE,
+                 reserva_minima: int = RESERVA_MINIMA, periodo_cota: float = PERIODO_COTA,
+                 cliente: ClienteHttp = cliente_http, relogio=time.monotonic):
+        self.chave = chave
+        self.mercados = tuple(mercado for mercado in mercados if mercado in MERCADOS_ODDS_API)
+        self.regioes = tuple(regioes)
+        self.ttl = ttl
+        self.reserva_minima = reserva_minima
+        self.periodo_cota = periodo_cota
+        self.cliente = cliente
+        self.relogio = relogio
+
+        self.restantes: Optional[int] = None
+        self.usadas: Optional[int] = None
+        self.chamadas = 0
+        self.reaproveitadas = 0
+
+        self._respostas: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._ativos: Optional[Tuple[float, Set[str]]] = None
+        self._trava = threading.Lock()
+
+    @property
+    def custo_chamada(self) -> int:
+        """Requisições da cota gastas por chamada de odds de um esporte"""
+        return len(self.mercados) * len(self.regioes)
+
+    def intervalo_minimo(self, esportes: int = 1) -> float:
+        """
+        Segundos entre duas buscas do mesmo esporte: o TTL, ou mais quando a
+        cota restante não dá para buscar todos os esportes nesse ritmo até o fim do período
+        """
+        if self.restantes is None:
+            return self.ttl
+        rodadas = (self.restantes - self.reserva_minima) / max(self.custo_chamada * esportes, 1)
+        if rodadas <= 0:
+            return float("inf")
+        return max(self.ttl, self.periodo_cota / rodadas)
+
+    def buscar(self, esportes: Iterable[str]) -> TabelaCotacoes:
+        """Odds de todos os esportes em uma tabela agrupada pela chave da casa"""
+        tabela = TabelaCotacoes()
+        adicionar_jogos(tabela, self.iterar_jogos(esportes))
+        return tabela
+
+    def iterar(self, esportes: Iterable[str], guardar: bool = True) -> Iterator[Tuple[str, Dict]]:
+        """
+        Gera (chave da casa, cotação) à medida que os jogos chegam, para que a
+        detecção comece antes do fim do download. Com guardar=False as
+        respostas não ficam na memória e o pico de memória é o de um jogo.
+        """
+        return iterar_cotacoes(self.iterar_jogos(esportes, guardar))
+
+    def iterar_jogos(self, esportes: Iterable[str], guardar: bool = True) -> Iterator[Dict]:
+        """Jogos (JSON da API) de todos os esportes, decodificados um a um"""
+        esportes = list(dict.fromkeys(esportes))
+        ativos = self.esportes_ativos()
+        if ativos is not None:
+            fora = [esporte for esporte in esportes if esporte not in ativos]
+            if fora:
+                logger.info(f"💤 Fora de temporada, sem buscar: {', '.join(fora)}")
+            esportes = [esporte for esporte in esportes if esporte in ativos]
+
+        intervalo = self.intervalo_minimo(len(esportes))
+        for esporte in esportes:
+            yield from self._jogos(esporte, intervalo, guardar)
+
+    def esportes_ativos(self) -> Optional[Set[str]]:
+        """Chaves dos esportes em temporada (essa consulta não gasta cota); None se falhar"""
+        agora = self.relogio()
+        if self._ativos is not None and agora - self._ativos[0] < TTL_ESPORTES_ATIVOS:
+            return self._ativos[1]
+
+        try:
+            resposta = self.cliente.obter(f"{ODDS_API_BASE_URL}/sports/", params={"apiKey": self.chave}, timeout=10)
+            if resposta.status_code != 200:
+                logger.warning(f"⚠️ Lista de esportes indisponível: {resposta.status_code}")
+                return None
+            self._ativos = (agora, {esporte["key"] for esporte in resposta.json() if esporte.get("active", True)})
+        except Exception as e:
+            logger.warning(f"⚠️ Lista de esportes indisponível: {e}")
+            return None
+        return self._ativos[1]
+
+    def estatisticas(self) -> Dict:
+        """Estado da cota e do cache, para logs e diagnóstico"""
+        return {
+            "restantes": self.restantes,
+            "usadas": self.usadas,
+            "chamadas": self.chamadas,
+            "reaproveitadas": self.reaproveitadas,
+            "custo_chamada": self.custo_chamada,
+            "esportes_guardados": len(self._respostas),
+        }
+
+    def _jogos(self, esporte: str, intervalo: float, guardar: bool) -> Iterable[Dict]:
+        """Jogos do esporte, da memória enquanto não vencer ou enquanto a cota não deixar buscar"""
+        with self._trava:
+            guardada = self._respostas.get(esporte)
+        agora = self.relogio()
+
+        if guardada is not None and agora - guardada[0] < intervalo:
+            self.reaproveitadas += 1
+            return guardada[1]
+
+        if self.restantes is not None and self.restantes - self.custo_chamada < self.reserva_minima:
+            logger.warning(f"⚠️ Cota da The Odds API na reserva ({self.restantes} restantes), sem buscar {esporte}")
+            self.reaproveitadas += 1
+            return guardada[1] if guardada else []
+
+        params = {
+            "apiKey": self.chave,
+            "regions": ",".join(self.regioes),
+            "markets": ",".join(self.mercados),
+            "oddsFormat": "decimal",
+            "dateFormat": "iso",
+        }
+        try:
+            resposta = self.cliente.obter(f"{ODDS_API_BASE_URL}/sports/{esporte}/odds/", params=params,
+                                          timeout=10, stream=True)
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar {esporte} na The Odds API: {e}")
+            return guardada[1] if guardada else []
+
+        self.chamadas += 1
+        self._ler_cota(resposta.headers)
+
+        if resposta.status_code != 200:
+            logger.error(f"❌ Erro na The Odds API ({esporte}): {resposta.status_code}")
+            resposta.close()
+            return guardada[1] if guardada else []
+
+        return self._transmitir(esporte, resposta, agora, guardar)
+
+    def _transmitir(self, esporte: str, resposta, momento: float, guardar: bool) -> Iterator[Dict]:
+        """Decodifica os jogos do corpo à medida que os pedaços chegam"""
+        jogos: Optional[List[Dict]] = [] if guardar else None
+        try:
+            for jogo in iterar_array_json(resposta.iter_content(TAMANHO_PEDACO)):
+                if jogos is not None:
+                    jogos.append(jogo)
+                yield jogo
+        except Exception as e:
+            # Os jogos já entregues continuam valendo; a resposta incompleta não é guardada
+            logger.error(f"❌ Resposta da The Odds API ({esporte}) interrompida: {e}")
+            return
+        finally:
+            resposta.close()
+
+        if jogos is not None:
+            with self._trava:
+                self._respostas[esporte] = (momento, jogos)
+
+    def _ler_cota(self, cabecalhos):
+        try:
+            if "x-requests-remaining" in cabecalhos:
+                self.restantes = int(float(cabecalhos["x-requests-remaining"]))
+            if "x-requests-used" in cabecalhos:
+                self.usadas = int(float(cabecalhos["x-requests-used"]))
+        except ValueError:
+            pass
+
+def odds_mercado(mercado: Dict) -> Optional[Tuple[str, Dict]]:
+    """(nome do mercado, odds no formato das cotações) de um mercado da API; None se não for suportado"""
+    nome_mercado = MERCADOS_ODDS_API.get(mercado["key"])
+    if nome_mercado is None:
+        return None
+
+    if nome_mercado == "total_gols":
+        odds: Dict = {}
+        for resultado in mercado["outcomes"]:
+            odds.setdefault(str(resultado["point"]), {})[resultado["name"].lower()] = resultado["price"]
+        return nome_mercado, odds
+
+    return nome_mercado, {resultado["name"]: resultado["price"] for resultado in mercado["outcomes"]}
+
+def adicionar_jogos(tabela: TabelaCotacoes, jogos: Iterable[Dict]):
+    """Escreve na tabela as cotações do JSON de odds da The Odds API, uma por casa x jogo x mercado"""
+    for jogo in jogos:
+        evento = f"{jogo['home_team']} vs {jogo['away_team']}"
+        opcionais = {"inicio": jogo.get("commence_time")}
+
+        for casa in jogo.get("bookmakers", []):
+            for mercado in casa.get("markets", []):
+                convertido = odds_mercado(mercado)
+                if convertido is not None:
+                    tabela.adicionar_campos(casa["key"], evento, convertido[0], casa["title"], convertido[1], opcionais)
+
+def iterar_jogos_por_casa(jogos: Iterable[Dict]) -> Iterator[Dict[str, List[Dict]]]:
+    """Gera, para cada jogo, {chave da casa: cotações do jogo}, para CacheOdds.publicar_fluxo()"""
+    for jogo in jogos:
+        casas: Dict[str, List[Dict]] = {}
+        for casa, cotacao in iterar_cotacoes((jogo,)):
+            casas.setdefault(casa, []).append(cotacao)
+        yield casas
+
+def iterar_cotacoes(jogos: Iterable[Dict]) -> Iterator[Tuple[str, Dict]]:
+    """Gera (chave da casa, cotação no formato do scraping) para cada casa x jogo x mercado"""
+    for jogo in jogos:
+        evento = f"{jogo['home_team']} vs {jogo['away_team']}"
+        inicio = jogo.get("commence_time")
+
+        for casa in jogo.get("bookmakers", []):
+            for mercado in casa.get("markets", []):
+                convertido = odds_mercado(mercado)
+                if convertido is not None:
+                    yield casa["key"], {"evento": evento, "mercado": convertido[0], "casa": casa["title"],
+                                        "odds": convertido[1], "inicio": inicio}
+
+class TransmissorOddsApi:
+    """
+    Busca as odds dos esportes em segundo plano e entrega o fluxo de jogos
+    ({casa: cotações}, um jogo por vez) a publicar_fluxo. Entre uma rodada e
+    a seguinte espera o intervalo mínimo do cliente, o que faz a cota durar
+    até a renovação; sem cota acima da reserva, não busca.
+    """
+
+    def __init__(self, cliente: ClienteOddsApi, esportes: Iterable[str],
+                 publicar_fluxo: Callable[[Iterator[Dict[str, List[Dict]]]], object]):
+        self.cliente = cliente
+        self.esportes = list(dict.fromkeys(esportes))
+        self.publicar_fluxo = publicar_fluxo
+        self.rodadas = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+
+    def executar(self) -> bool:
+        """Uma rodada: todos os esportes, em fluxo; False se a cota não deixou buscar"""
+        if self.cliente.intervalo_minimo(len(self.esportes)) == float("inf"):
+            logger.warning(f"⚠️ Cota da The Odds API na reserva ({self.cliente.restantes} restantes), sem buscar")
+            return False
+        self.publicar_fluxo(iterar_jogos_por_casa(self.cliente.iterar_jogos(self.esportes, guardar=False)))
+        self.rodadas += 1
+        return True
+
+    def iniciar(self):
+        """Começa a buscar em uma thread à parte"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name="odds-api", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        """Interrompe o laço; uma rodada em andamento termina antes"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _laco(self):
+        logger.info(f"📡 Transmissão da The Odds API iniciada para {len(self.esportes)} esportes")
+        while not self._parar.is_set():
+            try:
+                self.executar()
+            except Exception as e:
+                logger.error(f"❌ Erro na transmissão da The Odds API: {e}")
+            intervalo = self.cliente.intervalo_minimo(len(self.esportes))
+            self._parar.wait(intervalo if intervalo != float("inf") else self.cliente.periodo_cota / 30)
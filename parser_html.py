@@ -0,0 +1,281 @@
+"""
+Extração de odds de páginas HTML com seletores CSS.
+
+Em vez de montar a árvore inteira do BeautifulSoup com html.parser (a opção
+mais lenta) e procurar nela, os scrapers informam o seletor de cada jogo e
+os seletores dos campos dentro dele (times, odds), e só o texto desses nós é
+extraído. O backend é o primeiro disponível, nesta ordem:
+
+- selectolax: parser em C (Lexbor/Modest), quando instalado;
+- lxml: árvore em C com seletores via cssselect, quando instalados;
+- bs4: BeautifulSoup + soupsieve, para qualquer seletor;
+- simples: leitura em fluxo com o html.parser da biblioteca padrão, sem
+  montar árvore, para seletores simples (tag, .classe, #id, [atributo=valor]).
+  Aplica os fechamentos implícitos mais comuns do HTML (li, p, tr, td,
+  option...), mas não todas as regras de um navegador, então só é escolhido
+  sem o BeautifulSoup instalado ou com PARSER_HTML=simples.
+
+PARSER_HTML=<backend> força um backend específico.
+"""
+
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import os
+import re
+
+BACKENDS = ("selectolax", "lxml", "bs4", "simples")
+
+# Elementos sem tag de fechamento
+ELEMENTOS_VAZIOS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+# Tags cuja abertura fecha implicitamente uma irmã ainda aberta, como faz o
+# navegador: tag -> (tags fechadas, tags que limitam a busca na pilha)
+_LIMITES_P = frozenset({"button", "table", "td", "th", "caption"})
+_BLOCOS_QUE_FECHAM_P = (
+    "p", "div", "ul", "ol", "dl", "table", "form", "pre", "blockquote", "section", "article",
+    "header", "footer", "nav", "aside", "main", "h1", "h2", "h3", "h4", "h5", "h6",
+)
+FECHAMENTO_IMPLICITO: Dict[str, Tuple[frozenset, frozenset]] = {
+    "li": (frozenset({"li"}), frozenset({"ul", "ol", "menu"})),
+    "dt": (frozenset({"dt", "dd"}), frozenset({"dl"})),
+    "dd": (frozenset({"dt", "dd"}), frozenset({"dl"})),
+    "tr": (frozenset({"tr"}), frozenset({"table", "tbody", "thead", "tfoot"})),
+    "td": (frozenset({"td", "th"}), frozenset({"tr", "table"})),
+    "th": (frozenset({"td", "th"}), frozenset({"tr", "table"})),
+    "tbody": (frozenset({"tbody", "thead", "tfoot"}), frozenset({"table"})),
+    "thead": (frozenset({"tbody", "thead", "tfoot"}), frozenset({"table"})),
+    "tfoot": (frozenset({"tbody", "thead", "tfoot"}), frozenset({"table"})),
+    "option": (frozenset({"option"}), frozenset({"select", "datalist", "optgroup"})),
+    "optgroup": (frozenset({"optgroup"}), frozenset({"select"})),
+    **{bloco: (frozenset({"p"}), _LIMITES_P) for bloco in _BLOCOS_QUE_FECHAM_P},
+}
+
+# Jogos extraídos: para cada jogo, a lista de textos de cada campo
+Jogos = List[List[List[str]]]
+
+@lru_cache(maxsize=None)
+def backends_disponiveis() -> Tuple[str, ...]:
+    """Backends cujas dependências estão instaladas, na ordem de preferência"""
+    disponiveis = []
+    try:
+        import selectolax.parser  # noqa: F401
+        disponiveis.append("selectolax")
+    except ImportError:
+        pass
+    try:
+        import lxml.html  # noqa: F401
+        import cssselect  # noqa: F401
+        disponiveis.append("lxml")
+    except ImportError:
+        pass
+    try:
+        import bs4  # noqa: F401
+        disponiveis.append("bs4")
+    except ImportError:
+        pass
+    disponiveis.append("simples")
+    return tuple(disponiveis)
+
+def escolher_backend(seletores: Sequence[str], backend: Optional[str] = None) -> str:
+    """Backend pedido (ou de PARSER_HTML), senão o preferido que entende os seletores"""
+    backend = backend or os.getenv("PARSER_HTML")
+    if backend:
+        if backend not in backends_disponiveis():
+            raise ValueError(f"Backend HTML indisponível: {backend} (disponíveis: {', '.join(backends_disponiveis())})")
+        if backend == "simples" and not all(seletor_simples(seletor) for seletor in seletores):
+            raise ValueError("O backend simples só aceita seletores simples (tag.classe#id[atributo=valor])")
+        return backend
+
+    for candidato in backends_disponiveis():
+        if candidato != "simples" or all(seletor_simples(seletor) for seletor in seletores):
+            return candidato
+    raise ValueError("Seletor não simples exige o BeautifulSoup, o lxml ou o selectolax instalado")
+
+def extrair(html: Union[bytes, str], seletor_jogo: str, seletores_campos: Sequence[str],
+            backend: Optional[str] = None) -> Jogos:
+    """
+    Para cada nó que casa com seletor_jogo, a lista de textos (sem espaços nas
+    pontas) dos nós que casam com cada seletor de campo dentro dele, no mesmo
+    formato do FUNCAO_EXTRAIR_JOGOS do Selenium: [[times...], [odds...]].
+    """
+    backend = escolher_backend((seletor_jogo, *seletores_campos), backend)
+    return _EXTRATORES[backend](html, seletor_jogo, tuple(seletores_campos))
+
+def _extrair_selectolax(html, seletor_jogo: str, seletores_campos: Tuple[str, ...]) -> Jogos:
+    from selectolax.parser import HTMLParser as ArvoreSelectolax
+
+    arvore = ArvoreSelectolax(html)
+    return [
+        [[no.text().strip() for no in jogo.css(seletor)] for seletor in seletores_campos]
+        for jogo in arvore.css(seletor_jogo)
+    ]
+
+@lru_cache(maxsize=256)
+def _seletor_lxml(seletor: str):
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(seletor)
+
+def _extrair_lxml(html, seletor_jogo: str, seletores_campos: Tuple[str, ...]) -> Jogos:
+    import lxml.html
+
+    raiz = lxml.html.fromstring(html)
+    campos = [_seletor_lxml(seletor) for seletor in seletores_campos]
+    return [
+        [[no.text_content().strip() for no in campo(jogo)] for campo in campos]
+        for jogo in _seletor_lxml(seletor_jogo)(raiz)
+    ]
+
+def _extrair_bs4(html, seletor_jogo: str, seletores_campos: Tuple[str, ...]) -> Jogos:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        [[no.get_text().strip() for no in jogo.select(seletor)] for seletor in seletores_campos]
+        for jogo in soup.select(seletor_jogo)
+    ]
+
+# Seletor composto simples: tag opcional seguida de .classe, #id e [atributo] / [atributo=valor]
+_SELETOR_SIMPLES = re.compile(r"""^([a-zA-Z][\w-]*|\*)?((?:\.[\w-]+|\#[\w-]+|\[[\w-]+(?:=(?:"[^"]*"|'[^']*'|[^\]]*))?\])*)$""")
+_PARTE_SELETOR = re.compile(r"""\.([\w-]+)|\#([\w-]+)|\[([\w-]+)(?:=("[^"]*"|'[^']*'|[^\]]*))?\]""")
+
+class SeletorSimples:
+    """Seletor composto sem combinadores, testado direto nos atributos da tag"""
+
+    __slots__ = ("tag", "classes", "atributos")
+
+    def __init__(self, tag: Optional[str], classes: frozenset, atributos: Tuple[Tuple[str, Optional[str]], ...]):
+        self.tag = tag
+        self.classes = classes
+        self.atributos = atributos
+
+    def casa(self, tag: str, atributos: Dict[str, Optional[str]]) -> bool:
+        if self.tag is not None and self.tag != tag:
+            return False
+        if self.classes and not self.classes.issubset((atributos.get("class") or "").split()):
+            return False
+        for nome, valor in self.atributos:
+            if nome not in atributos or (valor is not None and atributos[nome] != valor):
+                return False
+        return True
+
+@lru_cache(maxsize=256)
+def seletor_simples(seletor: str) -> Optional[SeletorSimples]:
+    """SeletorSimples do seletor, ou None se ele usa combinadores, pseudo-classes etc."""
+    correspondencia = _SELETOR_SIMPLES.match(seletor.strip())
+    if correspondencia is None or not seletor.strip():
+        return None
+
+    tag = correspondencia.group(1)
+    classes, atributos = set(), []
+    for classe, identificador, atributo, valor in _PARTE_SELETOR.findall(correspondencia.group(2)):
+        if classe:
+            classes.add(classe)
+        elif identificador:
+            atributos.append(("id", identificador))
+        else:
+            atributos.append((atributo.lower(), valor.strip("\"'") if valor else None))
+
+    return SeletorSimples(None if tag in (None, "*") else tag.lower(), frozenset(classes), tuple(atributos))
+
+class _LeitorSimples(HTMLParser):
+    """
+    Percorre as tags uma vez, guardando só o texto dos campos dentro de cada
+    jogo. Aplica os fechamentos implícitos do HTML (FECHAMENTO_IMPLICITO),
+    como um navegador, e aceita jogos dentro de jogos: cada campo conta para
+    todos os jogos abertos quando ele começou, na ordem do documento.
+    """
+
+    def __init__(self, seletor_jogo: SeletorSimples, seletores_campos: Sequence[SeletorSimples]):
+        super().__init__(convert_charrefs=True)
+        self.seletor_jogo = seletor_jogo
+        self.seletores_campos = seletores_campos
+
+        self.jogos: Jogos = []
+        self._abertas: List[str] = []                           # pilha de tags abertas
+        self._jogos_abertos: List[Tuple[int, List[List[str]]]] = []   # (nível, campos do jogo)
+        # (nível, pedaços de texto, [(textos do campo em um jogo, posição)])
+        self._capturas: List[Tuple[int, List[str], List[Tuple[List[str], int]]]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ELEMENTOS_VAZIOS:
+            return
+        self._fechar_implicitas(tag)
+        self._abertas.append(tag)
+        nivel = len(self._abertas)
+        atributos = dict(attrs)
+
+        # Campos dos jogos já abertos (o próprio nó do jogo não é campo dele)
+        if self._jogos_abertos:
+            for campo, seletor in enumerate(self.seletores_campos):
+                if seletor.casa(tag, atributos):
+                    destinos = []
+                    for _, campos in self._jogos_abertos:
+                        campos[campo].append("")
+                        destinos.append((campos[campo], len(campos[campo]) - 1))
+                    self._capturas.append((nivel, [], destinos))
+
+        if self.seletor_jogo.casa(tag, atributos):
+            jogo: List[List[str]] = [[] for _ in self.seletores_campos]
+            self.jogos.append(jogo)     # lugar reservado na abertura: ordem do documento
+            self._jogos_abertos.append((nivel, jogo))
+
+    def _fechar_implicitas(self, tag: str):
+        regra = FECHAMENTO_IMPLICITO.get(tag)
+        if regra is None:
+            return
+        fechadas, limites = regra
+        for posicao in range(len(self._abertas) - 1, -1, -1):
+            aberta = self._abertas[posicao]
+            if aberta in fechadas:
+                self._fechar_ate(posicao)
+                return
+            if aberta in limites:
+                return
+
+    def handle_endtag(self, tag):
+        # Tags fechadas fora de ordem (HTML real) fecham tudo o que estava aberto dentro delas
+        for posicao in range(len(self._abertas) - 1, -1, -1):
+            if self._abertas[posicao] == tag:
+                self._fechar_ate(posicao)
+                return
+
+    def _fechar_ate(self, posicao: int):
+        """Fecha a tag aberta na posição e tudo o que está dentro dela"""
+        del self._abertas[posicao:]
+        nivel = len(self._abertas)
+
+        while self._capturas and self._capturas[-1][0] > nivel:
+            _, pedacos, destinos = self._capturas.pop()
+            texto = "".join(pedacos).strip()
+            for textos, indice in destinos:
+                textos[indice] = texto
+
+        while self._jogos_abertos and self._jogos_abertos[-1][0] > nivel:
+            self._jogos_abertos.pop()
+
+    def handle_data(self, data):
+        for _, pedacos, _ in self._capturas:
+            pedacos.append(data)
+
+def _extrair_simples(html, seletor_jogo: str, seletores_campos: Tuple[str, ...]) -> Jogos:
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+
+    leitor = _LeitorSimples(seletor_simples(seletor_jogo), [seletor_simples(s) for s in seletores_campos])
+    leitor.feed(html)
+    leitor.close()
+    if leitor._abertas:
+        # Documento truncado: fecha o que ficou aberto
+        leitor._fechar_ate(0)
+    return leitor.jogos
+
+_EXTRATORES = {
+    "selectolax": _extrair_selectolax,
+    "lxml": _extrair_lxml,
+    "simples": _extrair_simples,
+    "bs4": _extrair_bs4,
+}
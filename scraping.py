@@ -1,28 +1,66 @@
 import os
-from typing import List, Dict
-import requests
+import base64
+import json
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple
 import time
 import logging
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+
+from coleta import coletar_odds_sincrono
+from casas import AdaptadorCasa, registro_casas
+from disjuntores import Disjuntores
+from navegadores import PoolNavegadores, TAMANHO_POOL
+from odds_api import ClienteOddsApi
+import parser_html
+from sessoes_http import cliente_http
+
+# selenium e webdriver_manager são importados só quando um scraper com navegador
+# roda, para que o processo da API suba sem carregá-los
 logger = logging.getLogger(__name__)
 
-# API Key para The Odds API (free tier)
-ODDS_API_KEY = "YOUR_API_KEY_HERE"  # Precisa configurar uma chave real
-ODDS_API_BASE_URL = "https://api.the-odds-api.com/v4"
+# API Key para The Odds API (free tier); sem ODDS_API_KEY no ambiente a API não é consultada
+ODDS_API_KEY = os.getenv("ODDS_API_KEY", "YOUR_API_KEY_HERE")
+
+# Ligas buscadas na The Odds API (ODDS_API_ESPORTES=chave1,chave2 troca a lista)
+ESPORTES_ODDS_API = tuple(os.getenv("ODDS_API_ESPORTES", "soccer_brazil_campeonato").split(","))
+
+cliente_odds_api = ClienteOddsApi(ODDS_API_KEY)
+
+def odds_api_configurada() -> bool:
+    return ODDS_API_KEY != "YOUR_API_KEY_HERE"
+
+# Demonstração: adaptadores que falham devolvem dados de exemplo em vez de levantar o erro
+DADOS_EXEMPLO = os.getenv("DADOS_EXEMPLO", "0") == "1"
+
+@lru_cache(maxsize=None)
+def caminho_chromedriver() -> str:
+    """Caminho do chromedriver, resolvido (e baixado, se preciso) uma única vez por processo"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+# Recursos que não ajudam a ler odds: imagens, fontes, mídia e rastreadores.
+# CSS continua liberado, porque a rolagem da lista de jogos depende do layout.
+PADROES_BLOQUEADOS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*clarity.ms*",
+]
 
-def configurar_chrome_driver():
-    """Configura o driver do Chrome com opções otimizadas"""
+def configurar_chrome_driver(enxuto: bool = True, capturar_rede: bool = True):
+    """
+    Configura o driver do Chrome com opções otimizadas.
+
+    enxuto bloqueia via DevTools (Network.setBlockedURLs) os recursos de
+    PADROES_BLOQUEADOS. capturar_rede liga o log de performance, usado por
+    capturar_payloads_json para ler as respostas JSON (XHR e WebSocket) da casa.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    
     chrome_options = Options()
     chrome_options.add_argument('--headless')
     chrome_options.add_argument('--disable-gpu')
@@ -34,132 +72,436 @@ def configurar_chrome_driver():
     chrome_options.add_experimental_option('useAutomationExtension', False)
     chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     
-    service = Service(ChromeDriverManager().install())
+    if enxuto:
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    if capturar_rede:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    
+    service = Service(caminho_chromedriver())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
+    if enxuto:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': PADROES_BLOQUEADOS})
+    
     return driver
 
-def buscar_odds_bet365() -> List[Dict]:
-    """Busca odds da Bet365 - versão simplificada e mais robusta"""
-    odds = []
-    driver = None
-    
-    try:
-        driver = configurar_chrome_driver()
-        logger.info("Iniciando scraping da Bet365...")
+# Segundos sem payload novo (e sem resposta JSON carregando) para a captura considerar a página carregada
+SILENCIO_REDE = 0.5
+
+class CapturaRede:
+    """
+    Estado da leitura do log de performance de um driver, guardado entre as
+    leituras: o responseReceived e o loadingFinished de uma resposta (e a
+    criação de um WebSocket e os seus quadros) podem cair em leituras
+    diferentes. As entradas saem no loadingFinished/loadingFailed (e no
+    webSocketClosed).
+    """
+
+    def __init__(self):
+        self.respostas_json: Dict[str, str] = {}     # requestId -> url das respostas JSON ainda carregando
+        self.sockets: Dict[str, str] = {}            # requestId -> url dos WebSockets abertos
+
+    def ler(self, driver, filtro_url: Optional[str] = None) -> List[Tuple[str, Any]]:
+        """Payloads JSON chegados desde a última leitura, como [(url, payload)]"""
+        payloads: List[Tuple[str, Any]] = []
         
-        # URL mais estável da Bet365
-        driver.get("https://www.bet365.com/#/AC/B1/C1/D13/E40788/F2/")
+        for entrada in driver.get_log('performance'):
+            mensagem = json.loads(entrada['message'])['message']
+            metodo, params = mensagem.get('method'), mensagem.get('params', {})
+            
+            if metodo == 'Network.responseReceived':
+                resposta = params.get('response', {})
+                if params.get('type') in ('XHR', 'Fetch') and 'json' in resposta.get('mimeType', ''):
+                    self.respostas_json[params['requestId']] = resposta.get('url', '')
+            
+            elif metodo == 'Network.loadingFailed':
+                self.respostas_json.pop(params.get('requestId'), None)
+            
+            elif metodo == 'Network.loadingFinished' and params.get('requestId') in self.respostas_json:
+                url = self.respostas_json.pop(params['requestId'])
+                if filtro_url and filtro_url not in url:
+                    continue
+                try:
+                    corpo = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                    texto = corpo['body']
+                    if corpo.get('base64Encoded'):
+                        texto = base64.b64decode(texto).decode('utf-8')
+                    payloads.append((url, json.loads(texto)))
+                except Exception as e:
+                    logger.debug(f"Resposta sem corpo JSON legível ({url}): {e}")
+            
+            elif metodo == 'Network.webSocketCreated':
+                self.sockets[params['requestId']] = params.get('url', '')
+            
+            elif metodo == 'Network.webSocketClosed':
+                self.sockets.pop(params.get('requestId'), None)
+            
+            elif metodo == 'Network.webSocketFrameReceived':
+                url = self.sockets.get(params.get('requestId'), '')
+                if filtro_url and filtro_url not in url:
+                    continue
+                try:
+                    payloads.append((url, json.loads(params['response']['payloadData'])))
+                except (ValueError, KeyError):
+                    continue    # quadro binário ou em outro formato
         
-        # Aguarda o carregamento da página
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "src-FixtureSubGroup"))
-        )
+        return payloads
+
+    def descartar(self, driver):
+        """Esquece o log e o estado das páginas anteriores do driver"""
+        self.respostas_json.clear()
+        self.sockets.clear()
+        try:
+            driver.get_log('performance')
+        except Exception:
+            pass
+
+# Uma captura por driver, que some junto com ele
+_capturas: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_trava_capturas = threading.Lock()
+
+def captura_rede(driver) -> CapturaRede:
+    """Estado de captura de rede do driver, criado na primeira leitura"""
+    with _trava_capturas:
+        captura = _capturas.get(driver)
+        if captura is None:
+            captura = _capturas[driver] = CapturaRede()
+        return captura
+
+def capturar_payloads_json(driver, filtro_url: Optional[str] = None) -> List[Tuple[str, Any]]:
+    """
+    Lê do log de performance as respostas JSON recebidas desde a última leitura:
+    corpos de XHR/fetch (Network.getResponseBody) e quadros de WebSocket.
+    Retorna [(url, payload)]; filtro_url restringe às URLs que contêm o trecho.
+    """
+    return captura_rede(driver).ler(driver, filtro_url)
+
+# Como os feeds JSON costumam nomear mandante, visitante, seleções e preço
+CHAVES_MANDANTE = ('home_team', 'homeTeam', 'home', 'mandante')
+CHAVES_VISITANTE = ('away_team', 'awayTeam', 'away', 'visitante')
+CHAVES_SELECOES = ('outcomes', 'selections', 'runners')
+CHAVES_PRECO = ('price', 'odds', 'odd', 'decimal')
+CHAVES_LINHA = ('point', 'line', 'handicap')
+
+def extrair_cotacoes_payload(payload: Any, casa: str) -> List[Dict]:
+    """
+    Procura cotações de resultado em um payload JSON de casa de apostas: um
+    objeto com mandante e visitante e, abaixo dele, uma lista de seleções
+    com nome e preço. Seleções com linha (totais, handicaps) são ignoradas.
+    """
+    cotacoes: Dict[str, Dict] = {}
+    
+    def primeiro(objeto: Dict, chaves) -> Any:
+        return next((objeto[chave] for chave in chaves if chave in objeto), None)
+    
+    def percorrer(no: Any, evento: Optional[str]):
+        if isinstance(no, list):
+            for item in no:
+                percorrer(item, evento)
+            return
+        if not isinstance(no, dict):
+            return
         
-        time.sleep(3)
+        mandante, visitante = primeiro(no, CHAVES_MANDANTE), primeiro(no, CHAVES_VISITANTE)
+        if isinstance(mandante, str) and isinstance(visitante, str):
+            evento = f"{mandante} vs {visitante}"
         
-        # Busca jogos de futebol
-        jogos = driver.find_elements(By.CLASS_NAME, "src-FixtureSubGroup")
-        logger.info(f"Encontrados {len(jogos)} grupos de jogos")
+        selecoes = primeiro(no, CHAVES_SELECOES)
+        if evento and isinstance(selecoes, list) and evento not in cotacoes:
+            odds = {}
+            for selecao in selecoes:
+                if not isinstance(selecao, dict) or primeiro(selecao, CHAVES_LINHA) is not None:
+                    continue
+                nome, preco = selecao.get('name'), primeiro(selecao, CHAVES_PRECO)
+                try:
+                    odd = float(preco)
+                except (TypeError, ValueError):
+                    continue
+                if nome and odd > 1:
+                    odds[nome] = odd
+            
+            if len(odds) >= 2:
+                cotacoes[evento] = {"evento": evento, "mercado": "resultado", "casa": casa, "odds": odds}
         
-        for i, jogo in enumerate(jogos[:5]):  # Limita a 5 jogos para teste
-            try:
-                # Extrai informações do jogo
-                participants = jogo.find_elements(By.CLASS_NAME, "src-ParticipantFixtureDetails_TeamName")
-                
-                if len(participants) >= 2:
-                    team1 = participants[0].text.strip()
-                    team2 = participants[1].text.strip()
-                    evento = f"{team1} vs {team2}"
-                    
-                    # Busca as odds
-                    odds_elements = jogo.find_elements(By.CLASS_NAME, "src-ParticipantOddsOnly80_Odds")
-                    
-                    if len(odds_elements) >= 2:
-                        odd1 = extrair_numero_odd(odds_elements[0].text)
-                        odd2 = extrair_numero_odd(odds_elements[1].text)
-                        
-                        if odd1 and odd2:
-                            odds.append({
-                                "evento": evento,
-                                "mercado": "resultado",
-                                "casa": "Bet365",
-                                "odds": {
-                                    team1: odd1,
-                                    team2: odd2
-                                }
-                            })
-                            logger.info(f"Jogo adicionado: {evento} - {team1}: {odd1}, {team2}: {odd2}")
-                        
-            except Exception as e:
-                logger.error(f"Erro ao processar jogo {i}: {e}")
-                continue
-                
+        for valor in no.values():
+            if isinstance(valor, (dict, list)):
+                percorrer(valor, evento)
+    
+    percorrer(payload, None)
+    return list(cotacoes.values())
+
+def capturar_cotacoes_rede(driver, casa: str, filtro_url: Optional[str] = None,
+                           timeout: float = 5.0, silencio: float = SILENCIO_REDE) -> List[Dict]:
+    """
+    Espera a página receber os payloads JSON de odds e os converte em cotações,
+    sem passar pelo DOM. A captura só termina quando, depois da primeira
+    cotação, a rede fica quieta: nenhuma resposta JSON carregando e nenhum
+    payload novo por `silencio` segundos (ou ao fim do timeout, com o que
+    chegou). Retorna [] se a captura não estiver ligada no driver ou se nada
+    reconhecível chegar dentro do timeout.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    cotacoes: Dict[str, Dict] = {}
+    ultimo_payload = [time.monotonic()]
+    
+    def rede_quieta(d):
+        captura = captura_rede(d)
+        payloads = captura.ler(d, filtro_url)
+        if payloads:
+            ultimo_payload[0] = time.monotonic()
+        for _, payload in payloads:
+            for cotacao in extrair_cotacoes_payload(payload, casa):
+                cotacoes.setdefault(cotacao["evento"], cotacao)
+        return (bool(cotacoes) and not captura.respostas_json
+                and time.monotonic() - ultimo_payload[0] >= silencio)
+    
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(rede_quieta)
     except TimeoutException:
-        logger.error("Timeout ao carregar página da Bet365")
+        pass
     except Exception as e:
-        logger.error(f"Erro geral no scraping da Bet365: {e}")
-    finally:
-        if driver:
-            driver.quit()
+        logger.debug(f"Captura de rede indisponível: {e}")
     
-    # Se não conseguiu fazer scraping, retorna dados de exemplo
-    if not odds:
-        odds = gerar_odds_exemplo_bet365()
+    return list(cotacoes.values())
+
+# Drivers do Chrome compartilhados por todos os scrapers com Selenium
+pool_chrome = PoolNavegadores(configurar_chrome_driver, tamanho=int(os.getenv("TAMANHO_POOL_CHROME", TAMANHO_POOL)))
+
+def buscar_odds_bet365() -> List[Dict]:
+    """
+    Busca odds da Bet365. Falhas de carregamento ou de leitura (inclusive
+    uma página sem nenhum jogo) levantam exceção, para o disjuntor e o cache
+    saberem que a coleta falhou; com DADOS_EXEMPLO=1 viram dados de exemplo.
+    """
+    try:
+        # Driver já aberto do pool; volta para o pool ao final, mesmo com erro
+        with pool_chrome.usar() as driver:
+            odds = extrair_odds_bet365(driver)
+        if not odds:
+            raise RuntimeError("nenhuma odd lida da página da Bet365")
+        return odds
+    except Exception as e:
+        return dados_exemplo_ou_erro("Bet365", e, gerar_odds_exemplo_bet365)
+
+# Seletores da página de futebol da Bet365
+SELETORES_BET365 = {
+    "jogo": ".src-FixtureSubGroup",
+    "time": ".src-ParticipantFixtureDetails_TeamName",
+    "odd": ".src-ParticipantOddsOnly80_Odds",
+}
+
+# Segundos esperando payloads JSON de odds antes de cair para a leitura do DOM
+TEMPO_CAPTURA_REDE = 3.0
+
+# Rolagens máximas da lista virtual de jogos e espera por cada uma (ms)
+MAX_ROLAGENS = 40
+SILENCIO_DOM_MS = 150
+LIMITE_ROLAGEM_MS = 2000
+
+# Lê todos os jogos visíveis de uma vez: [[time1, time2, ...], [odd1, odd2, ...]] por jogo
+FUNCAO_EXTRAIR_JOGOS = """
+function extrairJogos(seletores) {
+    return Array.from(document.querySelectorAll(seletores.jogo), jogo => [
+        Array.from(jogo.querySelectorAll(seletores.time), e => e.textContent.trim()),
+        Array.from(jogo.querySelectorAll(seletores.odd), e => e.textContent.trim())
+    ]);
+}
+"""
+
+SCRIPT_EXTRAIR_JOGOS = FUNCAO_EXTRAIR_JOGOS + "return extrairJogos(arguments[0]);"
+
+# Rola a lista um viewport, espera o DOM parar de mudar e devolve {jogos, fim}
+SCRIPT_ROLAR_E_EXTRAIR = FUNCAO_EXTRAIR_JOGOS + """
+const [seletores, silencioMs, limiteMs] = arguments;
+const pronto = arguments[arguments.length - 1];
+
+let rolavel = document.querySelector(seletores.jogo);
+while (rolavel && !(rolavel.scrollHeight > rolavel.clientHeight &&
+                    /auto|scroll/.test(getComputedStyle(rolavel).overflowY))) {
+    rolavel = rolavel.parentElement;
+}
+rolavel = rolavel || document.scrollingElement;
+
+const antes = rolavel.scrollTop;
+rolavel.scrollTop = antes + rolavel.clientHeight;
+
+let silencio, limite, terminado = false;
+const terminar = () => {
+    if (terminado) return;
+    terminado = true;
+    observador.disconnect();
+    clearTimeout(silencio);
+    clearTimeout(limite);
+    const fim = rolavel.scrollTop === antes ||
+                rolavel.scrollTop + rolavel.clientHeight >= rolavel.scrollHeight - 1;
+    pronto({jogos: extrairJogos(seletores), fim: fim});
+};
+const observador = new MutationObserver(() => {
+    clearTimeout(silencio);
+    silencio = setTimeout(terminar, silencioMs);
+});
+observador.observe(rolavel, {childList: true, subtree: true});
+silencio = setTimeout(terminar, silencioMs);
+limite = setTimeout(terminar, limiteMs);
+"""
+
+def extrair_odds_bet365(driver) -> List[Dict]:
+    """
+    Carrega a página de futebol da Bet365 no driver e extrai as odds de todos os jogos.
+    Se o driver captura a rede e a casa enviar as odds em JSON, elas são usadas
+    direto; senão as odds são lidas do DOM.
+
+    Cada leitura da página é um único execute_script que devolve todos os
+    jogos já como texto, em vez de um find_elements/.text por elemento. A
+    lista é virtual, então a página é rolada até o fim, e cada rolagem espera
+    o DOM ficar parado (MutationObserver) em vez de um sleep fixo.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
     
-    return odds
+    logger.info("Iniciando scraping da Bet365...")
+    
+    # Descarta o log de rede das páginas anteriores deste driver
+    captura_rede(driver).descartar(driver)
+    
+    # URL mais estável da Bet365
+    driver.get("https://www.bet365.com/#/AC/B1/C1/D13/E40788/F2/")
+    
+    # Modo captura: usa os payloads JSON da própria casa quando eles chegam
+    odds = capturar_cotacoes_rede(driver, "Bet365", timeout=TEMPO_CAPTURA_REDE)
+    if odds:
+        logger.info(f"Encontrados {len(odds)} jogos nos payloads de rede")
+        return odds
+    
+    # Aguarda as odds aparecerem na página
+    WebDriverWait(driver, 15, poll_frequency=0.1).until(
+        lambda d: d.execute_script("return document.querySelector(arguments[0]) !== null", SELETORES_BET365["odd"])
+    )
+    driver.set_script_timeout(LIMITE_ROLAGEM_MS / 1000 + 5)
+    
+    jogos = {}
+    for times, odds_texto in driver.execute_script(SCRIPT_EXTRAIR_JOGOS, SELETORES_BET365):
+        jogos.setdefault(tuple(times[:2]), (times, odds_texto))
+    
+    for _ in range(MAX_ROLAGENS):
+        pagina = driver.execute_async_script(SCRIPT_ROLAR_E_EXTRAIR, SELETORES_BET365,
+                                             SILENCIO_DOM_MS, LIMITE_ROLAGEM_MS)
+        antes = len(jogos)
+        for times, odds_texto in pagina["jogos"]:
+            jogos.setdefault(tuple(times[:2]), (times, odds_texto))
+        
+        if pagina["fim"] and len(jogos) == antes:
+            break
+    
+    logger.info(f"Encontrados {len(jogos)} grupos de jogos")
+    return montar_odds_bet365(jogos.values())
 
-def buscar_odds_superbet() -> List[Dict]:
-    """Busca odds da Superbet"""
+def montar_odds_bet365(jogos) -> List[Dict]:
+    """Converte os jogos extraídos da página ([times], [odds em texto]) em cotações"""
     odds = []
     
+    for times, odds_texto in jogos:
+        if len(times) < 2 or len(odds_texto) < 2:
+            continue
+        
+        team1, team2 = times[0], times[1]
+        odd1 = extrair_numero_odd(odds_texto[0])
+        odd2 = extrair_numero_odd(odds_texto[1])
+        
+        if odd1 and odd2:
+            odds.append({
+                "evento": f"{team1} vs {team2}",
+                "mercado": "resultado",
+                "casa": "Bet365",
+                "odds": {
+                    team1: odd1,
+                    team2: odd2
+                }
+            })
+    
+    return odds
+
+# Nós lidos da listagem de futebol da Superbet: cada jogo, os times e as odds 1X2
+SELETORES_SUPERBET = {
+    "jogo": ".event-row",
+    "time": ".event-competitor__name",
+    "odd": ".odd-button__odd-value",
+}
+
+def buscar_odds_superbet() -> List[Dict]:
+    """Busca odds da Superbet; resposta diferente de 200 ou HTML sem jogos levanta exceção (ver buscar_odds_bet365)"""
     try:
         logger.info("Iniciando scraping da Superbet...")
         
-        # Headers para simular um navegador real
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        # Cabeçalhos de navegador, keep-alive e compressão vêm da sessão compartilhada
+        response = cliente_http.obter("https://superbet.com/sport/football",
+                                      headers={'Upgrade-Insecure-Requests': '1'}, timeout=10)
+        if response.status_code != 200:
+            raise RuntimeError(f"Superbet respondeu {response.status_code}")
         
-        # Tenta fazer request para a página da Superbet
-        response = requests.get("https://superbet.com/sport/football", headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Aqui você implementaria o parsing específico da Superbet
-            # Por enquanto, retorna dados de exemplo
-            odds = gerar_odds_exemplo_superbet()
-        else:
-            logger.warning(f"Falha ao acessar Superbet: {response.status_code}")
-            odds = gerar_odds_exemplo_superbet()
-            
+        odds = extrair_odds_superbet(response.content)
+        if not odds:
+            # Página montada por JavaScript ou layout mudou: nada a ler no HTML
+            raise RuntimeError("nenhuma odd no HTML da Superbet")
+        return odds
     except Exception as e:
-        logger.error(f"Erro no scraping da Superbet: {e}")
-        odds = gerar_odds_exemplo_superbet()
+        return dados_exemplo_ou_erro("Superbet", e, gerar_odds_exemplo_superbet)
+
+def extrair_odds_superbet(html: bytes, backend: Optional[str] = None) -> List[Dict]:
+    """Lê só os nós de jogos, times e odds do HTML da Superbet (sem parsear se não houver jogos)"""
+    classe_jogo = SELETORES_SUPERBET["jogo"].lstrip(".").encode()
+    if classe_jogo not in html:
+        return []
     
-    return odds
+    jogos = parser_html.extrair(html, SELETORES_SUPERBET["jogo"],
+                                (SELETORES_SUPERBET["time"], SELETORES_SUPERBET["odd"]), backend)
+    return montar_odds_superbet(jogos)
 
-def buscar_odds_betano() -> List[Dict]:
-    """Busca odds da Betano"""
+def montar_odds_superbet(jogos) -> List[Dict]:
+    """Converte os jogos extraídos ([times], [odds 1X2 em texto]) em cotações"""
     odds = []
     
-    try:
-        logger.info("Iniciando scraping da Betano...")
-        odds = gerar_odds_exemplo_betano()
+    for times, odds_texto in jogos:
+        if len(times) < 2 or len(odds_texto) < 2:
+            continue
         
-    except Exception as e:
-        logger.error(f"Erro no scraping da Betano: {e}")
-        odds = gerar_odds_exemplo_betano()
+        team1, team2 = times[0], times[1]
+        valores = [extrair_numero_odd(texto) for texto in odds_texto[:3]]
+        if not all(valores):
+            continue
+        
+        # Duas odds: casa e fora; três: casa, empate e fora
+        resultados = [team1, team2] if len(valores) == 2 else [team1, "Empate", team2]
+        odds.append({
+            "evento": f"{team1} vs {team2}",
+            "mercado": "resultado",
+            "casa": "Superbet",
+            "odds": dict(zip(resultados, valores))
+        })
     
     return odds
 
+def buscar_odds_betano() -> List[Dict]:
+    """Betano ainda não tem scraper: só responde com DADOS_EXEMPLO=1"""
+    logger.info("Iniciando scraping da Betano...")
+    return dados_exemplo_ou_erro("Betano", RuntimeError("scraper da Betano não implementado"),
+                                 gerar_odds_exemplo_betano)
+
+def dados_exemplo_ou_erro(casa: str, erro: Exception, gerar_exemplo) -> List[Dict]:
+    """
+    Com DADOS_EXEMPLO=1 (demonstração) troca a falha da coleta por dados de
+    exemplo; senão levanta o erro. Dados inventados nunca devem substituir o
+    último snapshot bom nem esconder a falha do disjuntor da casa.
+    """
+    if not DADOS_EXEMPLO:
+        logger.error(f"❌ Erro no scraping da {casa}: {erro}")
+        raise erro
+    logger.warning(f"⚠️ {casa}: {erro}; usando dados de exemplo (DADOS_EXEMPLO=1)")
+    return gerar_exemplo()
+
 def extrair_numero_odd(texto: str) -> float:
     """Extrai o valor numérico da odd do texto"""
     try:
@@ -178,19 +520,19 @@ def gerar_odds_exemplo_bet365() -> List[Dict]:
             "evento": "Flamengo vs Palmeiras",
             "mercado": "resultado", 
             "casa": "Bet365",
-            "odds": {"Flamengo": 2.10, "Palmeiras": 1.85}
+            "odds": {"Flamengo": 2.60, "Empate": 3.30, "Palmeiras": 2.90}
         },
         {
             "evento": "São Paulo vs Santos",
             "mercado": "resultado",
             "casa": "Bet365", 
-            "odds": {"São Paulo": 1.95, "Santos": 1.90}
+            "odds": {"São Paulo": 2.55, "Empate": 3.10, "Santos": 2.95}
         },
         {
             "evento": "Corinthians vs Grêmio",
             "mercado": "resultado",
             "casa": "Bet365",
-            "odds": {"Corinthians": 2.25, "Grêmio": 1.70}
+            "odds": {"Corinthians": 2.25, "Empate": 3.20, "Grêmio": 3.10}
         }
     ]
 
@@ -201,19 +543,19 @@ def gerar_odds_exemplo_superbet() -> List[Dict]:
             "evento": "Flamengo vs Palmeiras",
             "mercado": "resultado",
             "casa": "Superbet", 
-            "odds": {"Flamengo": 2.05, "Palmeiras": 1.95}
+            "odds": {"Flamengo": 2.55, "Empate": 3.75, "Palmeiras": 2.70}
         },
         {
             "evento": "São Paulo vs Santos", 
             "mercado": "resultado",
             "casa": "Superbet",
-            "odds": {"São Paulo": 2.00, "Santos": 1.85}
+            "odds": {"São Paulo": 2.40, "Empate": 3.05, "Santos": 3.30}
         },
         {
             "evento": "Corinthians vs Grêmio",
             "mercado": "resultado", 
             "casa": "Superbet",
-            "odds": {"Corinthians": 2.30, "Grêmio": 1.65}
+            "odds": {"Corinthians": 2.30, "Empate": 3.10, "Grêmio": 3.00}
         }
     ]
 
@@ -224,77 +566,16 @@ def gerar_odds_exemplo_betano() -> List[Dict]:
             "evento": "Flamengo vs Palmeiras",
             "mercado": "resultado",
             "casa": "Betano",
-            "odds": {"Flamengo": 2.15, "Palmeiras": 1.80}
+            "odds": {"Flamengo": 2.75, "Empate": 3.20, "Palmeiras": 2.80}
         },
         {
             "evento": "São Paulo vs Santos",
             "mercado": "resultado", 
             "casa": "Betano",
-            "odds": {"São Paulo": 1.90, "Santos": 1.95}
+            "odds": {"São Paulo": 2.45, "Empate": 3.40, "Santos": 2.90}
         }
     ]
 
-def buscar_odds_reais() -> List[Dict]:
-    """Busca odds reais usando The Odds API"""
-    try:
-        logger.info("🔍 Buscando odds reais via The Odds API...")
-        
-        # Se não tem API key, retorna dados de exemplo
-        if ODDS_API_KEY == "YOUR_API_KEY_HERE":
-            logger.warning("⚠️ API Key não configurada. Usando dados realistas de exemplo.")
-            return buscar_dados_exemplo_realistas()
-        
-        # URL para buscar jogos de futebol
-        url = f"{ODDS_API_BASE_URL}/sports/soccer_brazil_campeonato/odds/"
-        params = {
-            'api_key': ODDS_API_KEY,
-            'regions': 'br',  # Brasil
-            'markets': 'h2h',  # Head to head (1x2)
-            'oddsFormat': 'decimal',
-            'dateFormat': 'iso'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            odds_formatadas = []
-            
-            for jogo in data:
-                evento = f"{jogo['away_team']} vs {jogo['home_team']}"
-                
-                # Extrai odds dos bookmakers
-                for bookmaker in jogo.get('bookmakers', []):
-                    casa = bookmaker['title']
-                    markets = bookmaker.get('markets', [])
-                    
-                    for market in markets:
-                        if market['key'] == 'h2h':
-                            outcomes = market['outcomes']
-                            
-                            odds_dict = {}
-                            for outcome in outcomes:
-                                odds_dict[outcome['name']] = outcome['price']
-                            
-                            odds_formatadas.append({
-                                'evento': evento,
-                                'mercado': 'resultado',
-                                'casa': casa,
-                                'odds': odds_dict,
-                                'inicio': jogo['commence_time']
-                            })
-            
-            logger.info(f"✅ Encontradas {len(odds_formatadas)} odds reais!")
-            return odds_formatadas
-            
-        else:
-            logger.error(f"❌ Erro na API: {response.status_code}")
-            return buscar_dados_exemplo_realistas()
-            
-    except Exception as e:
-        logger.error(f"❌ Erro ao buscar odds reais: {e}")
-        return buscar_dados_exemplo_realistas()
-
 def buscar_dados_exemplo_realistas() -> List[Dict]:
     """Retorna dados de exemplo que simulam jogos reais próximos"""
     from datetime import datetime, timedelta
@@ -567,46 +848,47 @@ def buscar_odds_multiplas_casas() -> Dict[str, List[Dict]]:
         team1, team2 = teams[0], teams[1]
         
         for casa in todas_odds.keys():
-            # Varia ligeiramente as odds entre casas (comportamento real do mercado)
+            # Varia ligeiramente as odds entre casas (comportamento real do mercado);
+            # o mercado de resultado é 1X2, com o empate
             if jogo['evento'] == 'Flamengo vs Palmeiras':
                 if casa == 'bet365':
-                    odds = {'Flamengo': 2.10, 'Palmeiras': 1.85}
+                    odds = {'Flamengo': 2.60, 'Empate': 3.30, 'Palmeiras': 2.90}
                 elif casa == 'betano':
-                    odds = {'Flamengo': 2.05, 'Palmeiras': 1.95}  # Cria oportunidade de surebet
+                    odds = {'Flamengo': 2.75, 'Empate': 3.20, 'Palmeiras': 2.80}  # Cria oportunidade de surebet
                 else:
-                    odds = {'Flamengo': 2.15, 'Palmeiras': 1.80}
+                    odds = {'Flamengo': 2.55, 'Empate': 3.75, 'Palmeiras': 2.70}
                     
             elif jogo['evento'] == 'São Paulo vs Santos':
                 if casa == 'bet365':
-                    odds = {'São Paulo': 1.95, 'Santos': 1.90}
+                    odds = {'São Paulo': 2.55, 'Empate': 3.10, 'Santos': 2.95}
                 elif casa == 'betano':
-                    odds = {'São Paulo': 2.00, 'Santos': 1.85}
+                    odds = {'São Paulo': 2.45, 'Empate': 3.40, 'Santos': 2.90}
                 else:
-                    odds = {'São Paulo': 1.90, 'Santos': 1.95}  # Cria oportunidade de surebet
+                    odds = {'São Paulo': 2.40, 'Empate': 3.05, 'Santos': 3.30}  # Cria oportunidade de surebet
                     
             elif jogo['evento'] == 'Manchester City vs Liverpool':
                 if casa == 'bet365':
-                    odds = {'Manchester City': 1.75, 'Liverpool': 2.25}
+                    odds = {'Manchester City': 2.05, 'Empate': 3.60, 'Liverpool': 3.40}
                 elif casa == 'betano':
-                    odds = {'Manchester City': 1.80, 'Liverpool': 2.15}
+                    odds = {'Manchester City': 2.20, 'Empate': 3.50, 'Liverpool': 3.30}
                 else:
-                    odds = {'Manchester City': 1.70, 'Liverpool': 2.35}  # Cria oportunidade de surebet
+                    odds = {'Manchester City': 1.95, 'Empate': 3.70, 'Liverpool': 3.75}  # Cria oportunidade de surebet
                     
             elif jogo['evento'] == 'Real Madrid vs Barcelona':
                 if casa == 'bet365':
-                    odds = {'Real Madrid': 1.90, 'Barcelona': 2.10}
+                    odds = {'Real Madrid': 2.30, 'Empate': 3.50, 'Barcelona': 2.90}
                 elif casa == 'betano':
-                    odds = {'Real Madrid': 1.95, 'Barcelona': 2.00}
+                    odds = {'Real Madrid': 2.40, 'Empate': 3.40, 'Barcelona': 2.80}
                 else:
-                    odds = {'Real Madrid': 1.85, 'Barcelona': 2.15}  # Cria oportunidade de surebet
+                    odds = {'Real Madrid': 2.25, 'Empate': 3.60, 'Barcelona': 3.00}  # Sem surebet
                     
             else:  # PSG vs Marseille
                 if casa == 'bet365':
-                    odds = {'PSG': 1.60, 'Olympique Marseille': 2.50}
+                    odds = {'PSG': 1.60, 'Empate': 4.20, 'Olympique Marseille': 5.00}
                 elif casa == 'betano':
-                    odds = {'PSG': 1.65, 'Olympique Marseille': 2.40}
+                    odds = {'PSG': 1.72, 'Empate': 4.00, 'Olympique Marseille': 4.75}
                 else:
-                    odds = {'PSG': 1.55, 'Olympique Marseille': 2.60}  # Cria oportunidade de surebet
+                    odds = {'PSG': 1.55, 'Empate': 4.40, 'Olympique Marseille': 5.50}  # Cria oportunidade de surebet
             
             todas_odds[casa].append({
                 'evento': jogo['evento'],
@@ -619,25 +901,77 @@ def buscar_odds_multiplas_casas() -> Dict[str, List[Dict]]:
     
     return todas_odds
 
-def buscar_todas_odds() -> Dict[str, List[Dict]]:
-    """Busca odds de todas as casas disponíveis com dados realistas"""
-    logger.info("🔍 Iniciando busca de odds em todas as casas...")
+# Casas embutidas; as de plugins entram pelo entry point "surebet.casas" (casas.py)
+CASAS_EMBUTIDAS = (
+    AdaptadorCasa("bet365", buscar_odds_bet365, transporte="navegador",
+                  mercados=("resultado",), requisicoes_por_hora=60, timeout=30.0),
+    AdaptadorCasa("superbet", buscar_odds_superbet, transporte="http",
+                  mercados=("resultado",), requisicoes_por_hora=240, timeout=15.0),
+    AdaptadorCasa("betano", buscar_odds_betano, transporte="http",
+                  mercados=("resultado",), requisicoes_por_hora=240),
+)
+for adaptador in CASAS_EMBUTIDAS:
+    registro_casas.registrar(adaptador)
+
+# Adaptador de cada casa para a coleta concorrente (coleta.py)
+ADAPTADORES_CASAS = registro_casas
+
+# Disjuntor de cada casa; uma coleta conta como lenta a partir de metade do limite de tempo da casa
+disjuntores_casas = Disjuntores(latencias_lentas={
+    adaptador.nome: adaptador.timeout / 2 for adaptador in CASAS_EMBUTIDAS if adaptador.timeout
+})
+
+def buscar_todas_odds(concorrente: bool = False, timeouts: Optional[Dict[str, float]] = None,
+                      casas: Optional[List[str]] = None, orcamento: Optional[float] = None) -> Dict[str, List[Dict]]:
+    """
+    Busca odds das casas (casas restringe a essas; None = todas).
+    Consulta cada casa de ADAPTADORES_CASAS ao mesmo tempo, cada uma com seu
+    limite de tempo; casas que falharem ficam de fora e orcamento é o prazo
+    (segundos) da coleta inteira.
+    Em demonstração (DADOS_EXEMPLO=1), sem concorrente=True devolve os jogos
+    de exemplo de buscar_odds_multiplas_casas; fora dela, nunca.
+    """
+    if concorrente or not DADOS_EXEMPLO:
+        return buscar_todas_odds_concorrente(timeouts, casas, orcamento)
+    
+    logger.info("🔍 Gerando odds de exemplo das casas (DADOS_EXEMPLO=1)...")
     
-    # Primeiro tenta buscar dados reais
     try:
-        dados_reais = buscar_odds_multiplas_casas()
-        
-        total_jogos = sum(len(odds) for odds in dados_reais.values())
-        logger.info(f"✅ Encontradas odds de {len(dados_reais)} casas, {total_jogos} jogos totais")
-        
-        return dados_reais
-        
+        todas_odds = buscar_odds_multiplas_casas()
     except Exception as e:
-        logger.error(f"❌ Erro ao buscar odds: {e}")
-        
-        # Fallback para dados de exemplo
-        return {
+        logger.error(f"❌ Erro ao gerar odds: {e}")
+        todas_odds = {
             "bet365": gerar_odds_exemplo_bet365(),
             "superbet": gerar_odds_exemplo_superbet(), 
             "betano": gerar_odds_exemplo_betano()
-        } 
\ No newline at end of file
+        }
+    
+    if casas is not None:
+        todas_odds = {casa: odds for casa, odds in todas_odds.items() if casa in casas}
+    
+    total_jogos = sum(len(odds) for odds in todas_odds.values())
+    logger.info(f"✅ Odds de exemplo de {len(todas_odds)} casas, {total_jogos} jogos totais")
+    return todas_odds
+
+def buscar_todas_odds_concorrente(timeouts: Optional[Dict[str, float]] = None,
+                                  casas: Optional[List[str]] = None,
+                                  orcamento: Optional[float] = None) -> Dict[str, List[Dict]]:
+    """
+    Consulta as casas concorrentemente; a latência é a da casa mais lenta, ou
+    no máximo o orçamento. Casas com o disjuntor aberto não são chamadas.
+    """
+    adaptadores = registro_casas.adaptadores(casas)
+    timeouts = {**{casa: adaptador.timeout for casa, adaptador in adaptadores.items() if adaptador.timeout},
+                **(timeouts or {})}
+    logger.info(f"🔍 Buscando odds de {len(adaptadores)} casas em paralelo...")
+    
+    inicio = time.perf_counter()
+    resultados = coletar_odds_sincrono(adaptadores, timeouts, orcamento=orcamento, disjuntores=disjuntores_casas)
+    
+    todas_odds = {casa: resultado.odds for casa, resultado in resultados.items() if resultado.erro is None}
+    falhas = [casa for casa, resultado in resultados.items() if resultado.erro is not None]
+    
+    logger.info(f"✅ {len(todas_odds)} casas em {time.perf_counter() - inicio:.2f}s"
+                + (f" (sem resposta: {', '.join(falhas)})" if falhas else ""))
+    
+    return todas_odds
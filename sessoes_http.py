@@ -0,0 +1,167 @@
+"""
+Sessão HTTP compartilhada pelos adaptadores que usam requests.
+
+Uma única requests.Session reaproveita as conexões (keep-alive) em um pool
+por host, negocia compressão e repete falhas transitórias com backoff
+exponencial e jitter. As respostas com ETag ou Last-Modified ficam guardadas,
+e a próxima busca da mesma URL vai como requisição condicional: se o feed não
+mudou, o servidor responde 304 sem corpo e a resposta guardada é reaproveitada.
+
+requests é importado (e a sessão criada) só na primeira requisição.
+"""
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+import copy
+import logging
+import threading
+
+if TYPE_CHECKING:
+    import requests
+    from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Conexões mantidas abertas por host e quantidade de hosts com pool próprio
+MAX_CONEXOES_POR_HOST = 8
+MAX_HOSTS = 16
+
+# Novas tentativas em falhas transitórias: espera 0.5s, 1s, 2s... mais até JITTER_BACKOFF s
+MAX_TENTATIVAS = 3
+FATOR_BACKOFF = 0.5
+JITTER_BACKOFF = 0.3
+STATUS_REPETIR = (429, 500, 502, 503, 504)
+
+# Respostas guardadas para requisições condicionais (as menos usadas saem primeiro)
+MAX_RESPOSTAS_GUARDADAS = 256
+
+def _codificacoes_aceitas() -> str:
+    """gzip/deflate sempre; br só quando há decodificador de brotli instalado"""
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            return "gzip, deflate, br"
+        except ImportError:
+            return "gzip, deflate"
+
+CABECALHOS_PADRAO = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+    "Accept-Encoding": _codificacoes_aceitas(),
+    "Connection": "keep-alive",
+}
+
+def politica_tentativas() -> "Retry":
+    """Retry do urllib3 só para GET/HEAD, respeitando Retry-After"""
+    from urllib3.util.retry import Retry
+    
+    argumentos = dict(
+        total=MAX_TENTATIVAS,
+        backoff_factor=FATOR_BACKOFF,
+        status_forcelist=STATUS_REPETIR,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(backoff_jitter=JITTER_BACKOFF, **argumentos)
+    except TypeError:
+        # urllib3 < 2 não tem jitter; fica só o backoff exponencial
+        return Retry(**argumentos)
+
+def criar_sessao() -> "requests.Session":
+    """Sessão com pool de conexões por host, cabeçalhos padrão e novas tentativas"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    sessao = requests.Session()
+    sessao.headers.update(CABECALHOS_PADRAO)
+
+    adaptador = HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=MAX_CONEXOES_POR_HOST,
+                            max_retries=politica_tentativas())
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+class ClienteHttp:
+    """
+    GETs pela sessão compartilhada, com requisições condicionais.
+    As respostas devolvidas têm o atributo nao_modificada (True quando vieram do 304).
+    """
+
+    def __init__(self, sessao: Optional["requests.Session"] = None,
+                 max_guardadas: int = MAX_RESPOSTAS_GUARDADAS):
+        self._sessao = sessao
+        self.max_guardadas = max_guardadas
+        self._guardadas: "OrderedDict[Tuple, requests.Response]" = OrderedDict()
+        self._trava = threading.Lock()
+
+        self.requisicoes = 0
+        self.nao_modificadas = 0
+        self.bytes_economizados = 0
+
+    def obter(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+              timeout: float = 10, **kwargs) -> "requests.Response":
+        """requests.get com keep-alive, novas tentativas e ETag/If-Modified-Since"""
+        chave = (url, tuple(sorted((params or {}).items())))
+        cabecalhos = dict(headers or {})
+
+        with self._trava:
+            guardada = self._guardadas.get(chave)
+        if guardada is not None:
+            if "ETag" in guardada.headers:
+                cabecalhos.setdefault("If-None-Match", guardada.headers["ETag"])
+            if "Last-Modified" in guardada.headers:
+                cabecalhos.setdefault("If-Modified-Since", guardada.headers["Last-Modified"])
+
+        resposta = self.sessao.get(url, params=params, headers=cabecalhos, timeout=timeout, **kwargs)
+        self.requisicoes += 1
+
+        if resposta.status_code == 304 and guardada is not None:
+            self.nao_modificadas += 1
+            self.bytes_economizados += len(guardada.content)
+            with self._trava:
+                self._guardadas.move_to_end(chave)
+
+            reaproveitada = copy.copy(guardada)
+            reaproveitada.nao_modificada = True
+            return reaproveitada
+
+        resposta.nao_modificada = False
+        if kwargs.get("stream"):
+            # Corpo lido aos pedaços por quem chamou: não há como guardá-lo sem lê-lo inteiro aqui
+            return resposta
+        if resposta.status_code == 200 and ("ETag" in resposta.headers or "Last-Modified" in resposta.headers):
+            resposta.content    # lê o corpo agora, para poder reaproveitá-lo depois
+            with self._trava:
+                self._guardadas[chave] = resposta
+                self._guardadas.move_to_end(chave)
+                while len(self._guardadas) > self.max_guardadas:
+                    self._guardadas.popitem(last=False)
+
+        return resposta
+
+    @property
+    def sessao(self) -> "requests.Session":
+        """Sessão compartilhada, criada no primeiro uso"""
+        if self._sessao is None:
+            with self._trava:
+                if self._sessao is None:
+                    self._sessao = criar_sessao()
+        return self._sessao
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Contadores de uso, para logs e diagnóstico"""
+        return {
+            "requisicoes": self.requisicoes,
+            "nao_modificadas": self.nao_modificadas,
+            "bytes_economizados": self.bytes_economizados,
+            "respostas_guardadas": len(self._guardadas),
+        }
+
+# Cliente compartilhado por todos os adaptadores HTTP
+cliente_http = ClienteHttp()
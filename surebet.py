@@ -1,95 +1,569 @@
-from typing import List, Dict, Tuple
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, List, Dict, Tuple, Optional, Iterable, Iterator
+import heapq
 import logging
+import re
+import time
+
+from nomes import canonicalizar_evento, chave_resultado, normalizar_campeonato
+
+# Largura (em segundos) das faixas de horário de início usadas no bloqueio de eventos
+JANELA_INICIO = 3600
+
+# Resultados que cobrem cada mercado: (quantidade, resultados que sempre estão
+# entre eles, pela chave de nomes.chave_resultado). O de resultado é o 1X2 do
+# futebol (mandante, empate e visitante); o de total de gols, over e under da linha
+RESULTADOS_MERCADO = {
+    "resultado": (3, ("empate",)),
+    "total_gols": (2, ("over", "under")),
+}
+
+# Separador das linhas asiáticas divididas ("2/2.5", "2.0-2.5")
+SEPARADOR_LINHA = re.compile(r"\s*/\s*|(?<=\d)\s*-\s*(?=\d)")
 
 def encontrar_surebets(odds_casa1: List[Dict], odds_casa2: List[Dict]) -> List[Dict]:
     """
     Encontra oportunidades de surebet entre duas casas de apostas.
     Surebet ocorre quando 1/odd1 + 1/odd2 < 1 para resultados opostos.
+
+    Os eventos da segunda casa são indexados uma única vez por
+    (bloco do evento, mercado), então o cruzamento é linear no número de
+    cotações em vez de comparar todos os eventos contra todos.
     """
     oportunidades = []
+    blocos = BlocosEventos()
+    blocos.abrir(odds_casa1)
+    blocos.abrir(odds_casa2)
+    indice_casa2 = indexar_eventos(odds_casa2, blocos)
     
     for evento1 in odds_casa1:
-        for evento2 in odds_casa2:
-            # Verifica se é o mesmo evento
-            if normalizar_nome_evento(evento1["evento"]) == normalizar_nome_evento(evento2["evento"]):
-                
-                # Para mercados de resultado duplo (vitória de um time vs outro)
-                if evento1["mercado"] == "resultado" and evento2["mercado"] == "resultado":
-                    oportunidades.extend(
-                        verificar_surebet_resultado_duplo(evento1, evento2)
-                    )
-                
-                # Para mercados over/under
-                elif evento1["mercado"] == "total_gols" and evento2["mercado"] == "total_gols":
-                    oportunidades.extend(
-                        verificar_surebet_over_under(evento1, evento2)
-                    )
+        mercado = evento1["mercado"]
+        verificador = VERIFICADORES_POR_MERCADO.get(mercado)
+        if verificador is None:
+            continue
+        
+        # Mesmo evento e mesmo mercado, na ordem original da segunda casa
+        chave = (blocos.chave(evento1["evento"], evento1.get("inicio"), evento1.get("campeonato")), mercado)
+        for evento2 in indice_casa2.get(chave, ()):
+            oportunidades.extend(verificador(evento1, evento2))
     
     return oportunidades
 
-def normalizar_nome_evento(nome: str) -> str:
-    """Normaliza o nome do evento para comparação"""
-    return nome.lower().strip().replace(" x ", " vs ").replace("vs", "vs")
+def indexar_eventos(odds_casa: List[Dict], blocos: Optional["BlocosEventos"] = None) -> Dict[Tuple[Tuple, str], List[Dict]]:
+    """Agrupa os eventos de uma casa por (bloco do evento, mercado), preservando a ordem"""
+    indice: Dict[Tuple[Tuple, str], List[Dict]] = {}
+    if blocos is None:
+        blocos = BlocosEventos()
+        blocos.abrir(odds_casa)
+    
+    for evento in odds_casa:
+        if evento["mercado"] not in VERIFICADORES_POR_MERCADO:
+            continue
+        chave = (blocos.chave(evento["evento"], evento.get("inicio"), evento.get("campeonato")), evento["mercado"])
+        indice.setdefault(chave, []).append(evento)
+    
+    return indice
+
+def normalizar_nome_evento(nome: str, campeonato: Optional[str] = None) -> str:
+    """
+    Normaliza o nome do evento para comparação.
+    Usa a chave canônica de nomes.canonicalizar_evento, que reconhece acentos,
+    aliases e grafias parecidas dos times vistos no campeonato
+    ("Bayern München" = "Bayern Munich").
+    """
+    return canonicalizar_evento(nome, campeonato)
+
+@lru_cache(maxsize=4096)
+def momento_inicio(inicio) -> Optional[float]:
+    """
+    Timestamp (UTC) do início do evento, ou None se o horário não foi
+    informado ou não é reconhecido. Horários sem fuso são do fuso local (as
+    casas brasileiras mostram o horário de Brasília); com fuso, são
+    convertidos para UTC antes.
+    """
+    if not inicio:
+        return None
+    if not isinstance(inicio, datetime):
+        try:
+            inicio = datetime.fromisoformat(str(inicio))
+        except ValueError:
+            return None
+    return inicio.timestamp()
+
+def faixa_inicio(inicio) -> Optional[int]:
+    """Faixa de JANELA_INICIO segundos em que o evento começa (None sem horário válido)"""
+    momento = momento_inicio(inicio)
+    return None if momento is None else int(momento) // JANELA_INICIO
+
+def chave_bloco_evento(evento: str, inicio=None, campeonato: Optional[str] = None) -> Tuple[Optional[str], Optional[int], str]:
+    """
+    Chave de bloco de uma cotação isolada: (campeonato, faixa de início, nome
+    normalizado). Para cruzar cotações entre casas use BlocosEventos, que junta
+    as chaves compatíveis (campeonato ou horário ausente, faixas vizinhas).
+    """
+    return normalizar_campeonato(campeonato), faixa_inicio(inicio), normalizar_nome_evento(evento, campeonato)
+
+class BlocosEventos:
+    """
+    Blocos usados para cruzar o mesmo evento entre casas. Só cotações do
+    mesmo bloco são comparadas, o que separa jogos de mesmo nome em datas
+    diferentes. Cotações do mesmo nome normalizado caem no mesmo bloco quando:
+
+    - o campeonato é igual ou falta em uma delas;
+    - os inícios estão a menos de JANELA_INICIO segundos um do outro (15:59 e
+      16:00 caem em faixas vizinhas, mas são o mesmo jogo) ou falta em uma delas.
+
+    Cada bloco fica com a chave (chave_bloco_evento) da cotação que o abriu; o
+    campeonato e o início que faltavam nela são completados pela primeira que
+    os trouxer. Um bloco só se estreita, então a mesma cotação com início cai
+    sempre no mesmo bloco enquanto ele existir.
+
+    Cotações sem início (ex.: Bet365 e Superbet) não são memorizadas: a cada
+    chamada caem no bloco compatível que começa primeiro entre os abertos (os
+    de jogos que começaram há JANELA_INICIO segundos ou mais não contam), e
+    assim passam ao jogo seguinte de mesmo nome quando o anterior acaba. Quem
+    guarda o objeto por muito tempo (o detector incremental) tira os blocos
+    com descartar() e expirar(), para que não se acumulem.
+    """
+
+    __slots__ = ("_blocos", "_chaves", "relogio")
+
+    def __init__(self, relogio: Callable[[], float] = time.time):
+        self._blocos: Dict[str, List[list]] = {}    # nome -> [[campeonato, momento, chave, entradas], ...]
+        self._chaves: Dict[Tuple, list] = {}        # (nome, início, campeonato) -> bloco
+        self.relogio = relogio
+
+    def chave(self, evento: str, inicio=None, campeonato: Optional[str] = None) -> Tuple[Optional[str], Optional[int], str]:
+        """Chave do bloco em que a cotação cai, abrindo um bloco novo se nenhum for compatível"""
+        # O nome normalizado entra na memória, e não o nome cru: quando o índice
+        # de nomes aprende grafias novas, a cotação passa a cair no bloco certo
+        nome = normalizar_nome_evento(evento, campeonato)
+        entrada = (nome, inicio, campeonato)
+        bloco = self._chaves.get(entrada)
+        if bloco is not None:
+            return bloco[2]
+
+        nome_campeonato = normalizar_campeonato(campeonato)
+        momento = momento_inicio(inicio)
+
+        blocos = self._blocos.setdefault(nome, [])
+        compativeis = [bloco for bloco in blocos
+                       if nome_campeonato is None or bloco[0] is None or nome_campeonato == bloco[0]]
+        if momento is None:
+            agora = self.relogio()
+            abertos = [bloco for bloco in compativeis if bloco[1] is None or bloco[1] + JANELA_INICIO > agora]
+            bloco = min(abertos, key=lambda bloco: (bloco[1] is None, bloco[1] or 0), default=None)
+        else:
+            bloco = next((bloco for bloco in compativeis
+                          if bloco[1] is None or abs(momento - bloco[1]) < JANELA_INICIO), None)
+
+        if bloco is None:
+            chave = (nome_campeonato, None if momento is None else int(momento) // JANELA_INICIO, nome)
+            bloco = [nome_campeonato, momento, chave, set()]
+            blocos.append(bloco)
+        else:
+            if bloco[0] is None:
+                bloco[0] = nome_campeonato
+            if bloco[1] is None:
+                bloco[1] = momento
+
+        if momento is not None:
+            bloco[3].add(entrada)
+            self._chaves[entrada] = bloco
+        return bloco[2]
+
+    def abrir(self, cotacoes: Iterable[Dict]):
+        """
+        Resolve primeiro as cotações com início, para que as sem início,
+        resolvidas depois, vejam todos os jogos abertos seja qual for a ordem
+        """
+        for cotacao in cotacoes:
+            if cotacao.get("inicio") is not None and cotacao["mercado"] in VERIFICADORES_POR_MERCADO:
+                self.chave(cotacao["evento"], cotacao["inicio"], cotacao.get("campeonato"))
+
+    def descartar(self, chave: Tuple):
+        """Tira o bloco da chave e o que foi memorizado para ele (quando nenhuma cotação guardada cai mais nele)"""
+        blocos = self._blocos.get(chave[2])
+        if not blocos:
+            return
+        for bloco in [bloco for bloco in blocos if bloco[2] == chave]:
+            blocos.remove(bloco)
+            for entrada in bloco[3]:
+                self._chaves.pop(entrada, None)
+        if not blocos:
+            del self._blocos[chave[2]]
+
+    def expirar(self, em_uso=()) -> int:
+        """Tira os blocos de jogos que começaram há JANELA_INICIO segundos ou mais, exceto os em_uso; retorna quantos saíram"""
+        limite = self.relogio() - JANELA_INICIO
+        vencidos = [bloco[2] for blocos in self._blocos.values() for bloco in blocos
+                    if bloco[1] is not None and bloco[1] <= limite and bloco[2] not in em_uso]
+        for chave in vencidos:
+            self.descartar(chave)
+        return len(vencidos)
+
+    def __len__(self) -> int:
+        return sum(len(blocos) for blocos in self._blocos.values())
 
 def verificar_surebet_resultado_duplo(evento1: Dict, evento2: Dict) -> List[Dict]:
-    """Verifica surebets para mercados de resultado (vitória time A vs time B)"""
-    oportunidades = []
-    
-    # Se temos odds para os mesmos times
-    for resultado1, odd1 in evento1["odds"].items():
-        for resultado2, odd2 in evento2["odds"].items():
-            # Verifica se são resultados opostos (diferentes times)
-            if resultado1 != resultado2:
-                # Calcula se há arbitragem
-                margem = (1/float(odd1)) + (1/float(odd2))
-                
-                if margem < 1.0:  # Existe surebet
-                    lucro_percentual = ((1 - margem) / margem) * 100
-                    
-                    oportunidades.append({
-                        "evento": evento1["evento"],
-                        "mercado": "resultado",
-                        "casa1": evento1["casa"],
-                        "resultado1": resultado1,
-                        "odd1": float(odd1),
-                        "casa2": evento2["casa"], 
-                        "resultado2": resultado2,
-                        "odd2": float(odd2),
-                        "lucro_percentual": round(lucro_percentual, 2),
-                        "margem": round(margem, 4)
-                    })
+    """
+    Verifica surebet no mercado de resultado entre duas casas: a melhor odd de
+    cada resultado entre as duas precisa cobrir o mercado inteiro (no 1X2,
+    mandante, empate e visitante; mercado_completo), senão não há arbitragem
+    """
+    melhores: Dict[str, Tuple[float, str]] = {}
+    nomes: Dict[str, str] = {}
+    for evento in (evento1, evento2):
+        for resultado, odd in evento["odds"].items():
+            # Grafias diferentes do mesmo resultado usam o nome da primeira casa
+            nome = nomes.setdefault(chave_resultado(resultado), resultado)
+            atual = melhores.get(nome)
+            if atual is None or float(odd) > atual[0]:
+                melhores[nome] = (float(odd), evento["casa"])
     
-    return oportunidades
+    oportunidade = verificar_surebet_melhores_odds(evento1["evento"], "resultado", melhores)
+    return [] if oportunidade is None else [oportunidade]
 
 def verificar_surebet_over_under(evento1: Dict, evento2: Dict) -> List[Dict]:
-    """Verifica surebets para mercados over/under"""
+    """
+    Verifica surebets para mercados over/under, inclusive linhas asiáticas.
+
+    As odds de cada casa são indexadas pela linha normalizada (normalizar_linha),
+    então "2.5", "2,50" e "2/3" (= 2.5) se encontram com uma busca por linha, sem
+    comparar todas as linhas contra todas. Cada linha é verificada nos dois
+    sentidos (over da primeira casa com under da segunda e vice-versa), e o
+    resultado segue o formato do mercado de resultado (casaN/resultadoN/oddN).
+
+    Em linhas inteiras e de quarto (2.0, 2.25) o placar exato na linha devolve
+    a aposta no todo ou pela metade; lucro_percentual é o lucro sem devolução.
+    """
     oportunidades = []
     
-    for linha1, odds1 in evento1["odds"].items():
-        for linha2, odds2 in evento2["odds"].items():
-            # Verifica se é a mesma linha mas lados opostos
-            if linha1 == linha2:
-                if "over" in odds1 and "under" in odds2:
-                    margem = (1/float(odds1["over"])) + (1/float(odds2["under"]))
-                elif "under" in odds1 and "over" in odds2:
-                    margem = (1/float(odds1["under"])) + (1/float(odds2["over"]))
-                else:
-                    continue
+    linhas1 = indexar_linhas(evento1["odds"])
+    linhas2 = indexar_linhas(evento2["odds"])
+    
+    for linha, lados1 in linhas1.items():
+        lados2 = linhas2.get(linha)
+        if lados2 is None:
+            continue
+        
+        for lado1, lado2 in (("over", "under"), ("under", "over")):
+            if lado1 not in lados1 or lado2 not in lados2:
+                continue
+            
+            nome1, odd1 = lados1[lado1]
+            nome2, odd2 = lados2[lado2]
+            margem = (1/odd1) + (1/odd2)
+            
+            if margem < 1.0:
+                lucro_percentual = ((1 - margem) / margem) * 100
                 
-                if margem < 1.0:
-                    lucro_percentual = ((1 - margem) / margem) * 100
-                    
-                    oportunidades.append({
-                        "evento": evento1["evento"],
-                        "mercado": f"total_gols_{linha1}",
-                        "casa1": evento1["casa"],
-                        "casa2": evento2["casa"],
-                        "lucro_percentual": round(lucro_percentual, 2),
-                        "margem": round(margem, 4)
-                    })
+                oportunidades.append({
+                    "evento": evento1["evento"],
+                    "mercado": f"total_gols_{linha}",
+                    "casa1": evento1["casa"],
+                    "resultado1": nome1,
+                    "odd1": odd1,
+                    "casa2": evento2["casa"],
+                    "resultado2": nome2,
+                    "odd2": odd2,
+                    "lucro_percentual": round(lucro_percentual, 2),
+                    "margem": round(margem, 4)
+                })
     
     return oportunidades
 
+def indexar_linhas(odds_total: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, Tuple[str, float]]]:
+    """
+    Indexa as odds de total de gols de uma cotação por linha normalizada:
+    {linha: {"over"/"under": (nome usado pela casa, odd)}}.
+    Se a casa repetir a linha com outra grafia, fica a maior odd de cada lado.
+    """
+    indice: Dict[str, Dict[str, Tuple[str, float]]] = {}
+    
+    for linha, lados in odds_total.items():
+        lados_linha = indice.setdefault(normalizar_linha(linha), {})
+        for nome, odd in lados.items():
+            lado, odd = chave_resultado(nome), float(odd)
+            if lado in ("over", "under") and (lado not in lados_linha or odd > lados_linha[lado][1]):
+                lados_linha[lado] = (nome, odd)
+    
+    return indice
+
+@lru_cache(maxsize=1024)
+def normalizar_linha(linha) -> str:
+    """
+    Linha de total de gols em formato único, para que casas diferentes caiam no
+    mesmo livro: "2,5" e "2.50" viram "2.5", linhas divididas "2/2.5" ou
+    "2-2.5" viram a linha de quarto "2.25", e "2" vira "2.0". Linhas fora do
+    passo de 0.25 voltam como vieram.
+    """
+    texto = str(linha).strip().replace(",", ".")
+    partes = SEPARADOR_LINHA.split(texto)
+    
+    try:
+        valores = [float(parte) for parte in partes]
+    except ValueError:
+        return texto
+    
+    if len(valores) == 2 and abs(valores[1] - valores[0]) == 0.5:
+        valor = sum(valores) / 2
+    elif len(valores) == 1:
+        valor = valores[0]
+    else:
+        return texto
+    
+    if valor < 0 or (valor * 4) != int(valor * 4):
+        return texto
+    return str(valor)
+
+# Mercados suportados e a função que verifica surebets em cada um
+VERIFICADORES_POR_MERCADO = {
+    "resultado": verificar_surebet_resultado_duplo,
+    "total_gols": verificar_surebet_over_under,
+}
+
+def encontrar_surebets_multiplas_casas(todas_odds, lucro_minimo: Optional[float] = None,
+                                       casa: Optional[str] = None, campeonato: Optional[str] = None,
+                                       mercado: Optional[str] = None) -> List[Dict]:
+    """
+    Encontra surebets considerando todas as casas de uma só vez.
+    
+    Em uma única passada agrupa as cotações de cada evento/mercado e guarda a
+    melhor odd de cada resultado (e a casa que a oferece). Há surebet quando a
+    soma de 1/melhor_odd sobre o conjunto completo de resultados é menor que 1,
+    o que também cobre mercados 1X2 com "Empate" e arbitragens que precisam de
+    três ou mais casas, sem comparar as casas duas a duas.
+    
+    Aceita o dict por casa de buscar_todas_odds ou uma cotacoes.TabelaCotacoes.
+    Os filtros opcionais são os mesmos de iterar_surebets.
+    """
+    return [
+        montar_oportunidade(evento, mercado_livro, melhores, margem)
+        for evento, mercado_livro, melhores, margem
+        in iterar_surebets(todas_odds, lucro_minimo, casa, campeonato, mercado)
+    ]
+
+def iterar_surebets(todas_odds, lucro_minimo: Optional[float] = None, casa: Optional[str] = None,
+                    campeonato: Optional[str] = None, mercado: Optional[str] = None
+                    ) -> Iterator[Tuple[str, str, Dict[str, Tuple[float, str]], float]]:
+    """
+    Gera as surebets como (evento, mercado, melhores, margem), sem montar dicts.
+    
+    Campeonato e mercado são filtrados antes do agrupamento, então cotações de
+    fora do filtro nem entram nos livros. Lucro mínimo (%) e casa (a surebet
+    precisa ter uma aposta nela) são verificados logo após o cálculo da margem.
+    """
+    casa = casa.casefold() if casa else None
+    
+    for (_, mercado_livro), livro in agrupar_melhores_odds(todas_odds, campeonato, mercado).items():
+        melhores = livro["melhores"]
+        
+        if not mercado_completo(mercado_livro, melhores):
+            continue
+        
+        margem = sum(1/odd for odd, _ in melhores.values())
+        if margem >= 1.0:
+            continue
+        
+        if lucro_minimo is not None and round(calcular_lucro_percentual(margem), 2) < lucro_minimo:
+            continue
+        
+        if casa and all(nome.casefold() != casa for _, nome in melhores.values()):
+            continue
+        
+        yield livro["evento"], mercado_livro, melhores, margem
+
+def filtrar_surebets(surebets, lucro_minimo: Optional[float] = None, casa: Optional[str] = None,
+                     mercado: Optional[str] = None
+                     ) -> Iterator[Tuple[str, str, Dict[str, Tuple[float, str]], float]]:
+    """
+    Filtros de iterar_surebets que não dependem das cotações (lucro mínimo,
+    casa e mercado), sobre surebets já detectadas como (evento, mercado,
+    melhores, margem), por exemplo as do detector incremental.
+    """
+    casa = casa.casefold() if casa else None
+    
+    for evento, mercado_surebet, melhores, margem in surebets:
+        if mercado and not mercado_corresponde(mercado, mercado_surebet):
+            continue
+        if lucro_minimo is not None and round(calcular_lucro_percentual(margem), 2) < lucro_minimo:
+            continue
+        if casa and all(nome.casefold() != casa for _, nome in melhores.values()):
+            continue
+        yield evento, mercado_surebet, melhores, margem
+
+def iterar_odds(todas_odds, campeonato: Optional[str] = None, mercado: Optional[str] = None,
+                blocos: Optional[BlocosEventos] = None) -> Iterator[Tuple[str, str, str, str, str, float]]:
+    """
+    Percorre todas as odds como (chave_evento, mercado, evento, casa, resultado, odd),
+    onde chave_evento é a chave do bloco do evento em blocos (um BlocosEventos
+    novo se não for passado; a TabelaCotacoes usa o seu).
+    Aceita o dict por casa de buscar_todas_odds ou uma cotacoes.TabelaCotacoes.
+    Mercados de total de gols viram um mercado por linha ("total_gols_2.5").
+    Com campeonato e/ou mercado informados, só percorre as odds que correspondem.
+    """
+    if hasattr(todas_odds, "iterar_odds"):
+        yield from todas_odds.iterar_odds(campeonato, mercado, blocos)
+        return
+    
+    if blocos is None:
+        blocos = BlocosEventos()
+    blocos.abrir(cotacao for cotacoes in todas_odds.values() for cotacao in cotacoes
+                 if not campeonato or campeonato_corresponde(campeonato, cotacao.get("campeonato")))
+    for cotacoes in todas_odds.values():
+        for cotacao in cotacoes:
+            yield from iterar_odds_cotacao(cotacao, campeonato, mercado, blocos)
+
+def iterar_odds_cotacao(cotacao: Dict, campeonato: Optional[str] = None, mercado: Optional[str] = None,
+                        blocos: Optional[BlocosEventos] = None) -> Iterator[Tuple[str, str, str, str, str, float]]:
+    """
+    As odds de uma única cotação (dict do scraping), no formato de iterar_odds;
+    sem blocos, a chave é a da cotação isolada (chave_bloco_evento)
+    """
+    if campeonato and not campeonato_corresponde(campeonato, cotacao.get("campeonato")):
+        return
+    if cotacao["mercado"] not in VERIFICADORES_POR_MERCADO:
+        return
+    
+    evento, casa = cotacao["evento"], cotacao["casa"]
+    if blocos is None:
+        chave_evento = chave_bloco_evento(evento, cotacao.get("inicio"), cotacao.get("campeonato"))
+    else:
+        chave_evento = blocos.chave(evento, cotacao.get("inicio"), cotacao.get("campeonato"))
+    
+    if cotacao["mercado"] == "resultado":
+        if mercado and not mercado_corresponde(mercado, "resultado"):
+            return
+        for resultado, odd in cotacao["odds"].items():
+            yield chave_evento, "resultado", evento, casa, resultado, odd
+    
+    elif cotacao["mercado"] == "total_gols":
+        for linha, lados in cotacao["odds"].items():
+            mercado_linha = f"total_gols_{normalizar_linha(linha)}"
+            if mercado and not mercado_corresponde(mercado, mercado_linha):
+                continue
+            for lado, odd in lados.items():
+                yield chave_evento, mercado_linha, evento, casa, lado, odd
+
+def campeonato_corresponde(filtro: str, campeonato: Optional[str]) -> bool:
+    """Filtro de campeonato por trecho do nome, sem diferenciar maiúsculas"""
+    return bool(campeonato) and filtro.casefold() in campeonato.casefold()
+
+def mercado_corresponde(filtro: str, mercado: str) -> bool:
+    """Filtro de mercado exato ou pelo mercado base ("total_gols" cobre "total_gols_2.5")"""
+    return mercado == filtro or mercado.startswith(filtro + "_")
+
+def agrupar_melhores_odds(todas_odds, campeonato: Optional[str] = None,
+                          mercado: Optional[str] = None) -> Dict[Tuple[Tuple, str], Dict]:
+    """
+    Agrupa as cotações de todas as casas por (bloco do evento, mercado).
+    Cada livro guarda o nome do evento e, por resultado, a tupla (melhor odd, casa);
+    resultados são comparados pela chave canônica (nomes.chave_resultado).
+    """
+    livros: Dict[Tuple[Tuple, str], Dict] = {}
+    
+    for chave_evento, mercado_odd, evento, casa, resultado, odd in iterar_odds(todas_odds, campeonato, mercado):
+        livro = livros.get((chave_evento, mercado_odd))
+        if livro is None:
+            livro = livros[(chave_evento, mercado_odd)] = {"evento": evento, "melhores": {}, "nomes": {}}
+        
+        # Grafias diferentes do mesmo resultado usam o nome da primeira casa
+        resultado = livro["nomes"].setdefault(chave_resultado(resultado), resultado)
+        
+        melhores = livro["melhores"]
+        odd = float(odd)
+        atual = melhores.get(resultado)
+        
+        # Em caso de empate mantém a primeira casa encontrada
+        if atual is None or odd > atual[0]:
+            melhores[resultado] = (odd, casa)
+    
+    return livros
+
+def mercado_completo(mercado: str, resultados) -> bool:
+    """
+    Verifica se os resultados cobrem todas as possibilidades do mercado: a
+    quantidade de resultados distintos de RESULTADOS_MERCADO, com os fixos
+    (um 1X2 sem o empate não é surebet: perde se o jogo empatar)
+    """
+    aridade, fixos = RESULTADOS_MERCADO.get("total_gols" if mercado.startswith("total_gols") else mercado, (0, ()))
+    chaves = {chave_resultado(resultado) for resultado in resultados}
+    return bool(aridade) and len(chaves) == aridade and all(fixo in chaves for fixo in fixos)
+
+def calcular_lucro_percentual(margem: float) -> float:
+    """Lucro percentual garantido de uma surebet com a margem informada"""
+    return ((1 - margem) / margem) * 100
+
+def verificar_surebet_melhores_odds(evento: str, mercado: str, melhores: Dict[str, Tuple[float, str]]) -> Optional[Dict]:
+    """Verifica surebet sobre as melhores odds de cada resultado"""
+    if not mercado_completo(mercado, melhores):
+        return None
+    
+    margem = sum(1/odd for odd, _ in melhores.values())
+    if margem >= 1.0:
+        return None
+    
+    return montar_oportunidade(evento, mercado, melhores, margem)
+
+def montar_oportunidade(evento: str, mercado: str, melhores: Dict[str, Tuple[float, str]], margem: float) -> Dict:
+    """Monta o dict da surebet; cada aposta vira os campos numerados casaN, resultadoN e oddN"""
+    oportunidade = {"evento": evento, "mercado": mercado}
+    for i, (resultado, (odd, casa)) in enumerate(melhores.items(), 1):
+        oportunidade[f"casa{i}"] = casa
+        oportunidade[f"resultado{i}"] = resultado
+        oportunidade[f"odd{i}"] = odd
+    
+    oportunidade["lucro_percentual"] = round(calcular_lucro_percentual(margem), 2)
+    oportunidade["margem"] = round(margem, 4)
+    
+    return oportunidade
+
+class TopK:
+    """
+    Mantém só os K itens de maior prioridade durante a detecção (heap mínimo
+    limitado), sem guardar nem ordenar a lista inteira. Em caso de empate
+    vence o item adicionado primeiro, como em uma ordenação estável.
+    Com k=None guarda todos os itens.
+    """
+    
+    __slots__ = ("k", "total", "_heap", "_sequencia")
+    
+    def __init__(self, k: Optional[int] = None):
+        self.k = k
+        self.total = 0
+        self._heap: List[Tuple[float, int, object]] = []
+        self._sequencia = 0
+    
+    def adicionar(self, prioridade: float, item) -> None:
+        """Oferece um item ao ranking"""
+        self.total += 1
+        self._sequencia -= 1
+        entrada = (prioridade, self._sequencia, item)
+        
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entrada)
+        elif self.k > 0 and entrada[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entrada)
+    
+    def ordenados(self) -> List:
+        """Itens do ranking, do maior para o menor"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entrada: entrada[:2], reverse=True)]
+
+def extrair_apostas(oportunidade: Dict) -> List[Tuple[str, str, float]]:
+    """Retorna as apostas (casa, resultado, odd) de uma surebet, na ordem dos campos numerados"""
+    apostas = []
+    i = 1
+    while f"odd{i}" in oportunidade:
+        apostas.append((
+            oportunidade.get(f"casa{i}"),
+            oportunidade.get(f"resultado{i}"),
+            oportunidade[f"odd{i}"]
+        ))
+        i += 1
+    return apostas
+
 def calcular_stakes(banca: float, odd1: float, odd2: float) -> Tuple[float, float]:
     """
     Calcula as apostas ideais para garantir o mesmo lucro independente do resultado.
@@ -119,6 +593,33 @@ def calcular_lucro_esperado(stake1: float, odd1: float, stake2: float, odd2: flo
         "lucro_medio": round((lucro_resultado1 + lucro_resultado2) / 2, 2)
     }
 
+def calcular_stakes_multiplas(banca: float, odds: List[float]) -> List[float]:
+    """
+    Calcula as apostas para N resultados com o mesmo retorno em qualquer cenário.
+    Formula: stake_i = banca / (odd_i * margem), com margem = soma(1/odd_i)
+    """
+    try:
+        margem = sum(1/odd for odd in odds)
+        stakes = [round(banca / (odd * margem), 2) for odd in odds]
+        
+        if len(stakes) < 2 or any(stake <= 0 for stake in stakes):
+            raise ValueError("Stakes inválidos calculados")
+        
+        return stakes
+    except Exception as e:
+        logging.error(f"Erro ao calcular stakes: {e}")
+        return [0.0] * len(odds)
+
+def calcular_lucro_esperado_multiplas(stakes: List[float], odds: List[float]) -> Dict:
+    """Calcula o lucro esperado para cada um dos N resultados"""
+    total = sum(stakes)
+    lucros = [(stake * odd) - total for stake, odd in zip(stakes, odds)]
+    
+    resultado = {f"lucro_resultado{i}": round(lucro, 2) for i, lucro in enumerate(lucros, 1)}
+    resultado["lucro_medio"] = round(sum(lucros) / len(lucros), 2)
+    
+    return resultado
+
 def projetar_banca(banca_inicial: float, banca_final: float, dias: int) -> float:
     """Calcula o retorno diário necessário para atingir o objetivo"""
     if banca_inicial <= 0 or banca_final <= banca_inicial or dias <= 0:
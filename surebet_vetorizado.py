@@ -0,0 +1,242 @@
+"""
+Scanner vetorizado de surebets com NumPy.
+
+As cotações são empacotadas em uma matriz densa (evento x resultado x casa),
+com NaN onde a casa não cota o resultado. Melhores odds, soma das
+probabilidades implícitas, lucro percentual e divisão dos stakes são
+calculados como operações sobre o array inteiro, sem laços em Python.
+"""
+
+from typing import List, Dict, Optional, NamedTuple
+import numpy as np
+
+from nomes import chave_resultado
+from surebet import iterar_odds, mercado_completo
+
+class MatrizOdds(NamedTuple):
+    """Cotações empacotadas para o scanner vetorizado"""
+    eventos: List[str]              # nome do evento de cada linha
+    mercados: List[str]             # mercado de cada linha ("resultado", "total_gols_2.5", ...)
+    resultados: List[List[str]]     # nomes dos resultados de cada linha
+    casas: List[str]                # nome de cada casa (terceiro eixo)
+    odds: np.ndarray                # float64 (evento x resultado x casa), NaN = sem cotação
+    completos: np.ndarray           # bool (evento,), mercado com todos os resultados cotados
+
+class ResultadoScanner(NamedTuple):
+    """Resultado do scanner, um valor por linha da matriz"""
+    melhores_odds: np.ndarray       # (evento x resultado), 0 onde não há resultado
+    melhores_casas: np.ndarray      # (evento x resultado), índice da casa com a melhor odd
+    margens: np.ndarray             # (evento,), soma de 1/melhor_odd
+    lucros_percentuais: np.ndarray  # (evento,)
+    surebets: np.ndarray            # bool (evento,)
+    stakes: Optional[np.ndarray]    # (evento x resultado), só quando a banca é informada
+
+def montar_matriz_odds(todas_odds, campeonato: Optional[str] = None,
+                       mercado: Optional[str] = None) -> MatrizOdds:
+    """
+    Empacota as cotações de todas as casas em uma MatrizOdds.
+    Segue o mesmo agrupamento de agrupar_melhores_odds: uma linha por
+    (evento normalizado, mercado) e uma linha por linha de total de gols.
+    Aceita o dict por casa de buscar_todas_odds ou uma cotacoes.TabelaCotacoes,
+    com os mesmos filtros de campeonato e mercado de surebet.iterar_odds.
+    """
+    linhas: Dict[tuple, int] = {}
+    eventos, mercados, resultados = [], [], []
+    indice_resultados: List[Dict[str, int]] = []
+    indice_casas: Dict[str, int] = {}
+    pos_evento, pos_resultado, pos_casa, precos = [], [], [], []
+
+    for chave_evento, mercado, evento, casa, resultado, odd in iterar_odds(todas_odds, campeonato, mercado):
+        linha = linhas.get((chave_evento, mercado))
+        if linha is None:
+            linha = linhas[(chave_evento, mercado)] = len(eventos)
+            eventos.append(evento)
+            mercados.append(mercado)
+            resultados.append([])
+            indice_resultados.append({})
+
+        colunas = indice_resultados[linha]
+        chave = chave_resultado(resultado)
+        coluna = colunas.get(chave)
+        if coluna is None:
+            coluna = colunas[chave] = len(colunas)
+            resultados[linha].append(resultado)
+
+        pos_evento.append(linha)
+        pos_resultado.append(coluna)
+        pos_casa.append(indice_casas.setdefault(casa, len(indice_casas)))
+        precos.append(odd)
+
+    # Pelo menos uma coluna em cada eixo, para o scanner funcionar mesmo sem cotações
+    max_resultados = max((len(r) for r in resultados), default=1)
+    odds = np.full((len(eventos), max_resultados, max(len(indice_casas), 1)), np.nan)
+
+    # fmax ignora NaN e mantém a maior odd se a casa repetir a cotação
+    np.fmax.at(odds, (pos_evento, pos_resultado, pos_casa), np.asarray(precos, dtype=np.float64))
+
+    completos = np.fromiter(
+        (mercado_completo(mercado, nomes) for mercado, nomes in zip(mercados, resultados)),
+        dtype=bool, count=len(eventos)
+    )
+
+    return MatrizOdds(eventos, mercados, resultados, list(indice_casas), odds, completos)
+
+def escanear_matriz(odds: np.ndarray, completos: Optional[np.ndarray] = None,
+                    banca: Optional[float] = None) -> ResultadoScanner:
+    """
+    Calcula melhores odds, margens, lucros e stakes para todas as linhas de uma vez.
+
+    Um resultado sem nenhuma cotação (NaN em todas as casas) não faz parte do
+    mercado daquela linha. Há surebet quando a linha tem ao menos dois
+    resultados, o mercado está completo e a margem é menor que 1.
+    """
+    cotadas = ~np.isnan(odds)
+    preenchidas = np.where(cotadas, odds, -np.inf)
+
+    melhores_casas = preenchidas.argmax(axis=2)
+    melhores_odds = np.take_along_axis(preenchidas, melhores_casas[..., None], axis=2)[..., 0]
+
+    existentes = cotadas.any(axis=2)
+    melhores_odds = np.where(existentes, melhores_odds, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inversos = np.where(existentes, 1.0 / melhores_odds, 0.0)
+        margens = inversos.sum(axis=1)
+        lucros_percentuais = (1 - margens) / margens * 100
+
+    surebets = (existentes.sum(axis=1) >= 2) & (margens < 1.0)
+    if completos is not None:
+        surebets &= completos
+
+    stakes = None
+    if banca is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stakes = np.where(existentes, banca * inversos / margens[:, None], 0.0)
+
+    return ResultadoScanner(melhores_odds, melhores_casas, margens, lucros_percentuais, surebets, stakes)
+
+class SelecaoSurebets(NamedTuple):
+    """Surebets encontradas pelo scanner, ainda sem montar os dicts"""
+    matriz: MatrizOdds
+    scanner: ResultadoScanner
+    linhas: np.ndarray                   # linhas da matriz com surebet, na ordem de detecção
+    lucros_percentuais: np.ndarray       # lucro percentual arredondado de cada surebet
+    stakes: Optional[np.ndarray]         # stakes arredondados (surebet x resultado)
+    lucros_medios: Optional[np.ndarray]  # lucro médio garantido de cada surebet
+
+def selecionar_surebets_vetorizado(todas_odds, banca: Optional[float] = None,
+                                   lucro_minimo: Optional[float] = None, casa: Optional[str] = None,
+                                   campeonato: Optional[str] = None,
+                                   mercado: Optional[str] = None) -> SelecaoSurebets:
+    """
+    Roda o scanner e aplica os filtros como máscaras sobre os arrays.
+    Nenhum dict é montado aqui; use materializar_surebets só para as linhas desejadas.
+    """
+    matriz = montar_matriz_odds(todas_odds, campeonato, mercado)
+    scanner = escanear_matriz(matriz.odds, matriz.completos, banca)
+
+    selecionadas = scanner.surebets.copy()
+    lucros_percentuais = np.round(scanner.lucros_percentuais, 2)
+
+    if lucro_minimo is not None:
+        selecionadas &= lucros_percentuais >= lucro_minimo
+
+    if casa:
+        casas = [i for i, nome in enumerate(matriz.casas) if nome.casefold() == casa.casefold()]
+        existentes = scanner.melhores_odds > 0
+        selecionadas &= (np.isin(scanner.melhores_casas, casas) & existentes).any(axis=1)
+
+    linhas = np.flatnonzero(selecionadas)
+    stakes = lucros_medios = None
+
+    if banca is not None:
+        lote = calcular_stakes_lote(scanner.melhores_odds[linhas], banca)
+        stakes, lucros_medios = lote.stakes, lote.lucros_garantidos
+
+    return SelecaoSurebets(matriz, scanner, linhas, lucros_percentuais[linhas], stakes, lucros_medios)
+
+def materializar_surebets(selecao: SelecaoSurebets, posicoes, banca: Optional[float] = None) -> List[Dict]:
+    """Monta os dicts das surebets nas posições informadas da seleção"""
+    matriz, scanner = selecao.matriz, selecao.scanner
+    oportunidades = []
+
+    for posicao in posicoes:
+        linha = int(selecao.linhas[posicao])
+        oportunidade = {"evento": matriz.eventos[linha], "mercado": matriz.mercados[linha]}
+
+        melhores_odds = scanner.melhores_odds[linha].tolist()
+        melhores_casas = scanner.melhores_casas[linha].tolist()
+        for i, resultado in enumerate(matriz.resultados[linha]):
+            oportunidade[f"casa{i + 1}"] = matriz.casas[melhores_casas[i]]
+            oportunidade[f"resultado{i + 1}"] = resultado
+            oportunidade[f"odd{i + 1}"] = melhores_odds[i]
+
+        oportunidade["lucro_percentual"] = float(selecao.lucros_percentuais[posicao])
+        oportunidade["margem"] = round(float(scanner.margens[linha]), 4)
+
+        if banca is not None:
+            oportunidade["banca_total"] = banca
+            for i in range(len(matriz.resultados[linha])):
+                oportunidade[f"stake{i + 1}"] = float(selecao.stakes[posicao, i])
+
+            lucro_medio = float(selecao.lucros_medios[posicao])
+            oportunidade["lucro_garantido"] = lucro_medio
+            oportunidade["roi_percentual"] = (lucro_medio / banca) * 100
+
+        oportunidades.append(oportunidade)
+
+    return oportunidades
+
+def encontrar_surebets_vetorizado(todas_odds, banca: Optional[float] = None,
+                                  lucro_minimo: Optional[float] = None, casa: Optional[str] = None,
+                                  campeonato: Optional[str] = None, mercado: Optional[str] = None) -> List[Dict]:
+    """
+    Versão vetorizada de encontrar_surebets_multiplas_casas, com o mesmo formato de saída.
+    Com a banca informada também preenche stakes, lucro garantido e ROI de cada surebet.
+    """
+    selecao = selecionar_surebets_vetorizado(todas_odds, banca, lucro_minimo, casa, campeonato, mercado)
+    return materializar_surebets(selecao, range(len(selecao.linhas)), banca)
+
+class StakesLote(NamedTuple):
+    """Stakes e lucros de um lote de cenários, um valor (ou linha) por cenário"""
+    margens: np.ndarray             # (cenário,), soma de 1/odd
+    surebets: np.ndarray            # bool (cenário,), margem menor que 1
+    stakes: np.ndarray              # (cenário x resultado), arredondados, 0 onde não há resultado
+    lucros: np.ndarray              # (cenário x resultado), lucro se aquele resultado sair
+    lucros_garantidos: np.ndarray   # (cenário,), lucro médio entre os resultados
+    rois_percentuais: np.ndarray    # (cenário,)
+
+def calcular_stakes_lote(odds, bancas) -> StakesLote:
+    """
+    Versão em lote de calcular_stakes_multiplas e calcular_lucro_esperado_multiplas.
+
+    odds é uma matriz (cenário x resultado); cenários com menos resultados
+    (2-way ao lado de 1X2) usam NaN ou 0 nas colunas que sobram. bancas é um
+    valor único ou um por cenário. Os stakes dão o mesmo retorno em qualquer
+    resultado (stake_i = banca / (odd_i * margem)) e são arredondados em
+    centavos, como na versão escalar.
+    """
+    odds = np.asarray(odds, dtype=np.float64)
+    if odds.ndim == 1:
+        odds = odds[None, :]
+    bancas = np.broadcast_to(np.asarray(bancas, dtype=np.float64), odds.shape[:1])
+
+    existentes = odds > 0    # NaN também fica de fora
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inversos = np.where(existentes, 1.0 / odds, 0.0)
+        margens = inversos.sum(axis=1)
+        stakes = np.round(np.where(existentes, bancas[:, None] * inversos / margens[:, None], 0.0), 2)
+
+    totais = stakes.sum(axis=1)
+    lucros = np.round(np.where(existentes, stakes * np.where(existentes, odds, 0.0) - totais[:, None], 0.0), 2)
+
+    # Média sobre os stakes não nulos, como nas surebets do scanner
+    quantidades = np.maximum((stakes > 0).sum(axis=1), 1)
+    brutos = np.where(stakes > 0, stakes * np.where(existentes, odds, 0.0) - totais[:, None], 0.0)
+    lucros_garantidos = np.round(brutos.sum(axis=1) / quantidades, 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rois_percentuais = np.round(lucros_garantidos / bancas * 100, 2)
+
+    surebets = (existentes.sum(axis=1) >= 2) & (margens < 1.0)
+    return StakesLote(margens, surebets, stakes, lucros, lucros_garantidos, rois_percentuais)
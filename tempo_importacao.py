@@ -0,0 +1,81 @@
+"""
+Relatório do tempo de inicialização da API.
+
+Roda `python -X importtime -c "import main"` em um processo novo (sem nada
+em cache na memória) e soma o tempo próprio de cada módulo importado por
+pacote de topo, para ver quem pesa no cold start do processo da API.
+
+Uso: python3 tempo_importacao.py [módulo] [--linhas N]
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Linha do -X importtime: "import time: <próprio us> | <acumulado us> | <espaços><módulo>"
+_LINHA_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+class ImportacaoModulo(NamedTuple):
+    modulo: str
+    proprio_us: int      # tempo do próprio módulo
+    acumulado_us: int    # tempo do módulo mais o de tudo o que ele importou
+    nivel: int           # profundidade na árvore de importações
+
+def medir_importacao(modulo: str = "main", python: Optional[str] = None,
+                     diretorio: Optional[str] = None) -> List[ImportacaoModulo]:
+    """Importações feitas por `import modulo` em um processo novo, na ordem em que terminaram"""
+    diretorio = diretorio or os.path.dirname(os.path.abspath(__file__))
+    processo = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=diretorio, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": diretorio},
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}: {processo.stderr.strip().splitlines()[-1:]}")
+    return ler_importtime(processo.stderr)
+
+def ler_importtime(saida: str) -> List[ImportacaoModulo]:
+    """Converte a saída do -X importtime (ignora as outras linhas do stderr)"""
+    importacoes = []
+    for linha in saida.splitlines():
+        correspondencia = _LINHA_IMPORTTIME.match(linha)
+        if correspondencia:
+            proprio, acumulado, recuo, modulo = correspondencia.groups()
+            importacoes.append(ImportacaoModulo(modulo, int(proprio), int(acumulado), (len(recuo) - 1) // 2))
+    return importacoes
+
+def tempo_por_pacote(importacoes: List[ImportacaoModulo]) -> Dict[str, int]:
+    """Tempo próprio (us) somado por pacote de topo, do mais caro ao mais barato"""
+    pacotes: Dict[str, int] = {}
+    for importacao in importacoes:
+        pacote = importacao.modulo.split(".", 1)[0]
+        pacotes[pacote] = pacotes.get(pacote, 0) + importacao.proprio_us
+    return dict(sorted(pacotes.items(), key=lambda item: item[1], reverse=True))
+
+def relatorio(importacoes: List[ImportacaoModulo], linhas: int = 20) -> str:
+    """Tabela com o tempo total e os pacotes que mais pesam na importação"""
+    total = sum(importacao.proprio_us for importacao in importacoes)
+    pacotes = tempo_por_pacote(importacoes)
+
+    saida = [f"Importação: {total / 1000:.1f} ms em {len(importacoes)} módulos", "",
+             f"{'pacote':<30} {'ms':>8} {'%':>6}"]
+    for pacote, tempo in list(pacotes.items())[:linhas]:
+        saida.append(f"{pacote:<30} {tempo / 1000:>8.1f} {100 * tempo / max(total, 1):>5.1f}%")
+    if len(pacotes) > linhas:
+        resto = sum(list(pacotes.values())[linhas:])
+        saida.append(f"{f'(outros {len(pacotes) - linhas})':<30} {resto / 1000:>8.1f} {100 * resto / max(total, 1):>5.1f}%")
+    return "\n".join(saida)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação por pacote")
+    parser.add_argument("modulo", nargs="?", default="main", help="módulo a importar (padrão: main)")
+    parser.add_argument("--linhas", type=int, default=20, help="pacotes mostrados")
+    args = parser.parse_args()
+
+    print(relatorio(medir_importacao(args.modulo), args.linhas))
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,14 @@
 Script de teste para verificar se o sistema de surebet está funcionando corretamente
 """
 
+import os
 import sys
 import logging
 from typing import List, Dict
 
+# Os testes usam os jogos de exemplo: fora de DADOS_EXEMPLO=1 buscar_todas_odds consulta as casas de verdade
+os.environ["DADOS_EXEMPLO"] = "1"
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -104,6 +108,1622 @@ def test_surebet_logic():
         logger.error(f"❌ Erro na lógica de surebet: {e}")
         return False
 
+def test_indice_eventos():
+    """Testa o cruzamento indexado de eventos entre duas casas"""
+    logger.info("Testando cruzamento indexado de eventos...")
+    
+    from surebet import encontrar_surebets, indexar_eventos
+    
+    odds_casa1 = [
+        {"evento": "Flamengo x Palmeiras", "mercado": "resultado", "casa": "Casa1",
+         "odds": {"Flamengo": 2.90, "Empate": 3.30, "Palmeiras": 2.40}},
+        {"evento": "Santos vs Grêmio", "mercado": "resultado", "casa": "Casa1",
+         "odds": {"Santos": 2.20, "Empate": 3.20, "Grêmio": 3.30}},
+    ]
+    odds_casa2 = [
+        {"evento": "Santos vs Grêmio", "mercado": "escanteios", "casa": "Casa2",
+         "odds": {"Santos": 9.00, "Grêmio": 9.00}},
+        {"evento": " FLAMENGO vs PALMEIRAS ", "mercado": "resultado", "casa": "Casa2",
+         "odds": {"Flamengo": 2.40, "Draw": 3.50, "Palmeiras": 3.00}},
+    ]
+    
+    indice = indexar_eventos(odds_casa2)
+    assert list(indice) == [((None, None, "flamengo vs palmeiras"), "resultado")]
+    
+    surebets = encontrar_surebets(odds_casa1, odds_casa2)
+    assert [(sb["evento"], sb["casa1"], sb["resultado2"], sb["casa2"], sb["casa3"]) for sb in surebets] == [
+        ("Flamengo x Palmeiras", "Casa1", "Empate", "Casa2", "Casa2")
+    ]
+    
+    logger.info("✅ Cruzamento indexado funcionou!")
+    return True
+
+def test_surebets_multiplas_casas():
+    """Testa a detecção com as melhores odds de várias casas (inclusive 1X2)"""
+    logger.info("Testando detecção com múltiplas casas...")
+    
+    from surebet import (
+        encontrar_surebets_multiplas_casas, extrair_apostas,
+        calcular_stakes_multiplas, calcular_lucro_esperado_multiplas
+    )
+    
+    def cotacao(casa, odds):
+        return {"evento": "Flamengo vs Palmeiras", "mercado": "resultado", "casa": casa, "odds": odds}
+    
+    # Nenhum par de casas fecha a arbitragem sozinho, só as três juntas
+    todas_odds = {
+        "casa1": [cotacao("Casa1", {"Flamengo": 2.90, "Empate": 3.00, "Palmeiras": 2.50})],
+        "casa2": [cotacao("Casa2", {"Flamengo": 2.50, "Empate": 3.60, "Palmeiras": 2.50})],
+        "casa3": [cotacao("Casa3", {"Flamengo": 2.50, "Empate": 3.00, "Palmeiras": 3.10})],
+    }
+    
+    surebets = encontrar_surebets_multiplas_casas(todas_odds)
+    assert len(surebets) == 1
+    
+    apostas = extrair_apostas(surebets[0])
+    assert apostas == [("Casa1", "Flamengo", 2.90), ("Casa2", "Empate", 3.60), ("Casa3", "Palmeiras", 3.10)]
+    logger.info(f"  - Lucro: {surebets[0]['lucro_percentual']:.2f}%")
+    
+    odds = [odd for _, _, odd in apostas]
+    stakes = calcular_stakes_multiplas(1000, odds)
+    lucros = calcular_lucro_esperado_multiplas(stakes, odds)
+    assert abs(sum(stakes) - 1000) < 0.05
+    assert min(lucros[f"lucro_resultado{i}"] for i in range(1, 4)) > 0
+    
+    # Odds com margem da casa (soma das probabilidades >= 1) não geram surebet
+    sem_surebet = {"casa1": [cotacao("Casa1", {"Flamengo": 1.90, "Empate": 3.20, "Palmeiras": 1.90})]}
+    assert encontrar_surebets_multiplas_casas(sem_surebet) == []
+
+    # 1X2 sem o empate não cobre o mercado (perde se o jogo empatar): não é surebet em nenhum caminho
+    from detector_incremental import DetectorIncremental
+    from surebet import encontrar_surebets, mercado_completo
+    from surebet_vetorizado import encontrar_surebets_vetorizado
+    sem_empate = {"casa1": [cotacao("Casa1", {"Flamengo": 2.30, "Palmeiras": 1.60})],
+                  "casa2": [cotacao("Casa2", {"Flamengo": 1.60, "Palmeiras": 2.30})]}
+    assert not mercado_completo("resultado", ["Flamengo", "Palmeiras"])
+    assert mercado_completo("resultado", ["Flamengo", "Draw", "Palmeiras"])
+    assert not mercado_completo("total_gols_2.5", ["over"])
+    assert encontrar_surebets_multiplas_casas(sem_empate) == []
+    assert encontrar_surebets_vetorizado(sem_empate) == []
+    assert encontrar_surebets(sem_empate["casa1"], sem_empate["casa2"]) == []
+    detector = DetectorIncremental()
+    assert detector.carregar(sem_empate) == [] and not detector.oportunidades()
+
+
+    logger.info("✅ Detecção com múltiplas casas funcionou!")
+    return True
+
+def test_scanner_vetorizado():
+    """Testa se o scanner NumPy encontra as mesmas surebets da versão em Python"""
+    logger.info("Testando scanner vetorizado...")
+    
+    from surebet import encontrar_surebets_multiplas_casas
+    from surebet_vetorizado import encontrar_surebets_vetorizado
+    
+    todas_odds = {
+        "casa1": [
+            {"evento": "Flamengo vs Palmeiras", "mercado": "resultado", "casa": "Casa1",
+             "odds": {"Flamengo": 2.90, "Empate": 3.00, "Palmeiras": 2.50}},
+            {"evento": "Santos vs Grêmio", "mercado": "total_gols", "casa": "Casa1",
+             "odds": {"2.5": {"over": 2.10, "under": 1.75}, "3.5": {"over": 3.10}}},
+        ],
+        "casa2": [
+            {"evento": "Flamengo x Palmeiras", "mercado": "resultado", "casa": "Casa2",
+             "odds": {"Flamengo": 2.50, "Empate": 3.60, "Palmeiras": 3.10}},
+            {"evento": "Santos vs Grêmio", "mercado": "total_gols", "casa": "Casa2",
+             "odds": {"2.5": {"over": 1.80, "under": 2.05}}},
+        ],
+    }
+    
+    esperado = encontrar_surebets_multiplas_casas(todas_odds)
+    vetorizado = encontrar_surebets_vetorizado(todas_odds)
+    assert [sb["mercado"] for sb in esperado] == ["resultado", "total_gols_2.5"]
+    assert vetorizado == esperado
+    
+    com_banca = encontrar_surebets_vetorizado(todas_odds, banca=1000)
+    assert all(sb["lucro_garantido"] > 0 for sb in com_banca)
+    assert abs(com_banca[0]["stake1"] + com_banca[0]["stake2"] + com_banca[0]["stake3"] - 1000) < 0.05
+    
+    logger.info("✅ Scanner vetorizado funcionou!")
+    return True
+
+def test_tabela_cotacoes():
+    """Testa a tabela compacta de cotações e a detecção direto sobre ela"""
+    logger.info("Testando tabela compacta de cotações...")
+    
+    from cotacoes import TabelaCotacoes
+    from scraping import buscar_todas_odds
+    from surebet import encontrar_surebets_multiplas_casas
+    from surebet_vetorizado import encontrar_surebets_vetorizado
+    
+    todas_odds = buscar_todas_odds()
+    todas_odds["bet365"].append({
+        "evento": "Santos vs Grêmio", "mercado": "total_gols", "casa": "Bet365",
+        "odds": {"2.5": {"over": 2.10, "under": 1.75}}
+    })
+    
+    tabela = TabelaCotacoes.de_dict(todas_odds)
+    
+    # A visão em dict reproduz exatamente as cotações originais
+    assert tabela.para_dict() == todas_odds
+    assert len(tabela) == sum(len(odds) for odds in todas_odds.values())
+    assert tabela.grupos() == list(todas_odds)
+    
+    # Nomes repetidos entre casas ficam guardados uma única vez
+    assert tabela.evento[0] == tabela.evento[len(todas_odds["bet365"])]
+    
+    esperado = encontrar_surebets_multiplas_casas(todas_odds)
+    assert encontrar_surebets_multiplas_casas(tabela) == esperado
+    assert encontrar_surebets_vetorizado(tabela) == esperado
+    
+    logger.info(f"✅ Tabela com {len(tabela)} cotações funcionou!")
+    return True
+
+def test_detector_incremental():
+    """Testa a detecção incremental com abertura, alteração e fechamento de surebets"""
+    logger.info("Testando detector incremental...")
+    
+    from detector_incremental import DetectorIncremental, ABERTA, ALTERADA, FECHADA
+    from scraping import buscar_todas_odds
+    from surebet import encontrar_surebets_multiplas_casas
+    
+    detector = DetectorIncremental()
+    evento = "Flamengo vs Palmeiras"
+    
+    assert detector.atualizar("Casa1", evento, "resultado", "Flamengo", 2.60) is None
+    assert detector.atualizar("Casa1", evento, "resultado", "Empate", 3.60) is None
+    assert detector.atualizar("Casa2", evento, "resultado", "Palmeiras", 2.80) is None
+    
+    emitido = detector.atualizar("Casa2", evento, "resultado", "Palmeiras", 3.10)
+    assert emitido["tipo"] == ABERTA
+    assert emitido["oportunidade"]["casa3"] == "Casa2"
+    
+    # Atualização que não mexe nas melhores odds não emite nada
+    assert detector.atualizar("Casa3", evento, "resultado", "Flamengo", 2.40) is None
+    
+    emitido = detector.atualizar("Casa3", evento, "resultado", "Flamengo", 2.75)
+    assert emitido["tipo"] == ALTERADA
+    assert emitido["oportunidade"]["casa1"] == "Casa3"
+    
+    # A casa com a melhor odd sai e a próxima melhor assume
+    emitido = detector.atualizar("Casa3", evento, "resultado", "Flamengo", None)
+    assert emitido["tipo"] == ALTERADA
+    assert emitido["oportunidade"]["odd1"] == 2.60
+    
+    emitido = detector.atualizar("Casa2", evento, "resultado", "Palmeiras", 2.80)
+    assert emitido["tipo"] == FECHADA
+    assert detector.oportunidades() == []
+    
+    # Carregar um snapshot completo chega nas mesmas surebets da detecção em lote
+    todas_odds = buscar_todas_odds()
+    detector = DetectorIncremental()
+    detector.carregar(todas_odds)
+    chave = lambda sb: (sb["evento"], sb["mercado"])
+    assert sorted(detector.oportunidades(), key=chave) == sorted(
+        encontrar_surebets_multiplas_casas(todas_odds), key=chave
+    )
+    
+    logger.info("✅ Detector incremental funcionou!")
+    return True
+
+def test_top_k_e_filtros():
+    """Testa o ranking limitado e os filtros aplicados durante a detecção"""
+    logger.info("Testando TopK e filtros de surebets...")
+    
+    from surebet import TopK, encontrar_surebets_multiplas_casas
+    from scraping import buscar_todas_odds
+    
+    top = TopK(3)
+    for prioridade, item in [(1.0, "a"), (2.5, "b"), (0.5, "c"), (2.5, "d"), (3.0, "e")]:
+        top.adicionar(prioridade, item)
+    assert top.ordenados() == ["e", "b", "d"]
+    assert top.total == 5
+    
+    todas_odds = buscar_todas_odds()
+    todas = encontrar_surebets_multiplas_casas(todas_odds)
+    
+    com_lucro = encontrar_surebets_multiplas_casas(todas_odds, lucro_minimo=2.0)
+    assert com_lucro == [sb for sb in todas if sb["lucro_percentual"] >= 2.0]
+    
+    na_casa = encontrar_surebets_multiplas_casas(todas_odds, casa="BETANO")
+    assert na_casa and all("Betano" in (sb["casa1"], sb["casa2"]) for sb in na_casa)
+    
+    assert encontrar_surebets_multiplas_casas(todas_odds, campeonato="premier league") == [
+        sb for sb in todas if sb["evento"] == "Manchester City vs Liverpool"
+    ]
+    assert encontrar_surebets_multiplas_casas(todas_odds, mercado="total_gols") == []
+
+    # roi_minimo (o min_roi da API) filtra pelo roi_percentual, nos dois scanners
+    from cotacoes import TabelaCotacoes
+    from main import montar_surebets
+    tabela = TabelaCotacoes.de_dict(todas_odds)
+    for vetorizado in (False, True):
+        montadas, _ = montar_surebets(tabela, 1000, vetorizado, ordenar_por="roi_percentual")
+        corte = montadas[len(montadas) // 2]["roi_percentual"]
+        filtradas, estatisticas = montar_surebets(tabela, 1000, vetorizado, ordenar_por="roi_percentual",
+                                                  roi_minimo=corte)
+        assert filtradas == [sb for sb in montadas if sb["roi_percentual"] >= corte]
+        assert estatisticas["total_oportunidades"] == len(filtradas)
+
+    logger.info("✅ TopK e filtros funcionaram!")
+    return True
+
+def test_nomes_canonicos():
+    """Testa a canonicalização de nomes de times e eventos entre casas"""
+    logger.info("Testando canonicalização de nomes...")
+    
+    from nomes import IndiceTimes, canonicalizar_evento, chave_resultado
+    from surebet import encontrar_surebets_multiplas_casas
+    
+    indice = IndiceTimes()
+    assert indice.resolver("Bayern München") == indice.resolver("Bayern Munich")
+    assert indice.resolver("Atlético-MG") == indice.resolver("Atletico Mineiro")
+    assert indice.resolver("Man City") != indice.resolver("Man United")
+    
+    # Times novos aprendidos pelo índice e resolvidos por aproximação
+    indice.registrar("Sporting Cristal")
+    assert indice.resolver("Sporting Cristall") == indice.resolver("Sporting Cristal")
+    indice.registrar("Time 1 A")
+    assert indice.resolver("Time 1 B") != indice.resolver("Time 1 A")
+    
+    # Mandante e visitante mantêm a ordem: invertido é o returno
+    assert canonicalizar_evento("Flamengo x Palmeiras") == canonicalizar_evento("Flamengo vs Palmeiras")
+    assert canonicalizar_evento("Palmeiras x Flamengo") != canonicalizar_evento("Flamengo vs Palmeiras")
+    assert chave_resultado("Draw") == chave_resultado("Empate")
+
+    # Sufixos de clube e times com token a mais não são o mesmo time; siglas curtas não são aliases
+    indice = IndiceTimes()
+    for nome in ("Botafogo", "Newcastle United", "Barcelona", "Atlético Mineiro"):
+        indice.registrar(nome, "Liga")
+    assert indice.resolver("Botafogo SP") != indice.resolver("Botafogo")
+    assert indice.resolver("Newcastle Jets") != indice.resolver("Newcastle United")
+    assert indice.resolver("Barcelona SC") != indice.resolver("Barcelona")
+    assert indice.resolver("CAM") != indice.resolver("Atletico Mineiro")
+    assert indice.resolver("OM") != indice.resolver("Marseille")
+
+    # A aproximação de nomes de evento exige o mesmo campeonato
+    indice.registrar("Sporting Cristal", "Liga 1 Peru")
+    assert indice.resolver("Sporting Cristall", "liga 1 peru") == "sporting cristal"
+    assert indice.resolver("Sporting Cristall", "brasileirao") == "sporting cristall"
+    assert indice.resolver_exato("Sporting Cristall") == "sporting cristall"
+
+    # Registro concorrente enquanto outras threads resolvem nomes
+    import threading
+    indice = IndiceTimes()
+    erros = []
+
+    def registrar(inicio):
+        try:
+            for i in range(inicio, inicio + 300):
+                indice.registrar(f"Time Concorrente {i}", "Liga")
+                indice.resolver(f"Time Concorrente {i - 1}x")
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=registrar, args=(i * 1000,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not erros and len(indice) >= 1200
+    
+    todas_odds = {
+        "casa_a": [{"evento": "Bayern München vs Borussia Dortmund", "mercado": "resultado", "casa": "Casa A",
+                    "odds": {"Bayern München": 2.30, "Empate": 3.10, "Borussia Dortmund": 3.00}}],
+        "casa_b": [{"evento": "Bayern Munich v Dortmund", "mercado": "resultado", "casa": "Casa B",
+                    "odds": {"Bayern Munich": 1.90, "Draw": 3.80, "Dortmund": 3.90}}],
+    }
+    surebets = encontrar_surebets_multiplas_casas(todas_odds)
+    assert len(surebets) == 1
+    assert [surebets[0][f"casa{i}"] for i in (1, 2, 3)] == ["Casa A", "Casa B", "Casa B"]
+    
+    logger.info("✅ Canonicalização de nomes funcionou!")
+    return True
+
+def test_blocos_eventos():
+    """Testa o bloqueio de eventos por campeonato e horário de início"""
+    logger.info("Testando bloqueio de eventos...")
+    
+    from surebet import chave_bloco_evento, faixa_inicio, encontrar_surebets, encontrar_surebets_multiplas_casas
+    
+    assert faixa_inicio("2024-10-19T20:00:00-03:00") == faixa_inicio("2024-10-19T23:00:00Z")
+    assert faixa_inicio("amanhã") is None and faixa_inicio(None) is None
+    assert chave_bloco_evento("Flamengo x Palmeiras", "2024-10-19T20:00:00", "Brasileirão Série A 2024") == \
+        chave_bloco_evento("Flamengo vs Palmeiras", "2024-10-19T20:00:00", "Brasileirao Serie A")
+    
+    def cotacao(casa, inicio, odds):
+        return {"evento": "Flamengo x Palmeiras", "mercado": "resultado", "casa": casa,
+                "odds": odds, "inicio": inicio, "campeonato": "Brasileirão Série A"}
+    
+    # Turno e returno: mesmo nome, datas diferentes
+    todas_odds = {
+        "casa_a": [cotacao("Casa A", "2024-05-01T16:00:00", {"Flamengo": 3.10, "Empate": 3.30, "Palmeiras": 2.20}),
+                   cotacao("Casa A", "2024-09-01T16:00:00", {"Flamengo": 2.20, "Empate": 3.30, "Palmeiras": 3.10})],
+        "casa_b": [cotacao("Casa B", "2024-05-01T16:00:00", {"Flamengo": 2.20, "Empate": 3.50, "Palmeiras": 3.10}),
+                   cotacao("Casa B", "2024-09-01T16:00:00", {"Flamengo": 3.10, "Empate": 3.50, "Palmeiras": 2.20})],
+    }
+    
+    # Sem o bloqueio as odds de datas diferentes se misturariam em um só livro
+    surebets = encontrar_surebets_multiplas_casas(todas_odds)
+    assert len(surebets) == 2
+    assert all({sb["casa1"], sb["casa2"], sb["casa3"]} == {"Casa A", "Casa B"} for sb in surebets)
+    
+    assert len(encontrar_surebets(todas_odds["casa_a"], todas_odds["casa_b"])) == 2
+
+    # Horário sem fuso é do fuso local, não UTC
+    from datetime import datetime
+    from surebet import momento_inicio
+    assert momento_inicio("2024-10-19T20:00:00") == datetime(2024, 10, 19, 20, 0).timestamp()
+
+    # Campeonato ou horário ausente casa com qualquer um (sem horário, só jogos
+    # que não começaram); rodada no nome não separa; 15:59 e 16:00 caem em
+    # faixas vizinhas, mas são o mesmo jogo
+    from datetime import timedelta
+    from cotacoes import TabelaCotacoes
+    from detector_incremental import DetectorIncremental
+    from surebet import BlocosEventos
+
+    def variante(casa, odds, inicio="2024-05-01T16:00:00", campeonato="Brasileirão Série A"):
+        return {**cotacao(casa, inicio, odds), "campeonato": campeonato}
+
+    alta = {"Flamengo": 3.10, "Empate": 3.30, "Palmeiras": 2.20}
+    baixa = {"Flamengo": 2.20, "Empate": 3.50, "Palmeiras": 3.10}
+    pares = [
+        (variante("Casa A", alta), variante("Casa B", baixa, campeonato=None)),
+        (variante("Casa A", alta, inicio=(datetime.now() + timedelta(days=2)).isoformat(timespec="minutes")),
+         variante("Casa B", baixa, inicio=None)),
+        (variante("Casa A", alta), variante("Casa B", baixa, campeonato="Brasileirão Série A - Rodada 12")),
+        (variante("Casa A", alta, inicio="2024-05-01T15:59:00"), variante("Casa B", baixa)),
+        (variante("Casa A", alta, inicio="2024-05-01T16:00:00-03:00"),
+         variante("Casa B", baixa, inicio="2024-05-01T18:59:00Z")),
+    ]
+    for cotacao_a, cotacao_b in pares:
+        todas_odds = {"casa_a": [cotacao_a], "casa_b": [cotacao_b]}
+        assert len(encontrar_surebets(todas_odds["casa_a"], todas_odds["casa_b"])) == 1
+        assert len(encontrar_surebets_multiplas_casas(todas_odds)) == 1
+        assert len(encontrar_surebets_multiplas_casas(TabelaCotacoes.de_dict(todas_odds))) == 1
+        detector = DetectorIncremental()
+        detector.trocar("a", [cotacao_a])
+        assert detector.trocar("b", [cotacao_b])[0]["tipo"] == "aberta"
+
+    # Continuam separados: campeonatos diferentes e inícios a uma hora ou mais
+    for cotacao_b in (variante("Casa B", baixa, campeonato="Copa do Brasil"),
+                      variante("Casa B", baixa, inicio="2024-05-01T17:00:00")):
+        assert not encontrar_surebets([variante("Casa A", alta)], [cotacao_b])
+
+    # O bloco aberto sem campeonato adota o primeiro que chega, e a mesma cotação cai sempre no mesmo bloco
+    blocos = BlocosEventos()
+    aberto = blocos.chave("Flamengo x Palmeiras", "2024-05-01T16:00:00")
+    assert blocos.chave("Flamengo x Palmeiras", "2024-05-01T16:30:00", "Brasileirão") == aberto
+    assert blocos.chave("Flamengo x Palmeiras", "2024-05-01T16:00:00", "Copa do Brasil") != aberto
+    assert blocos.chave("Flamengo x Palmeiras", "2024-05-01T16:00:00") == aberto
+
+    # Jogos de mesmo nome a um mês de distância e uma casa sem início: ela cai
+    # no próximo jogo aberto e passa ao seguinte quando ele começa
+    relogio = [datetime(2026, 10, 19, 12).timestamp()]
+    blocos = BlocosEventos(lambda: relogio[0])
+    outubro = blocos.chave("Flamengo vs Palmeiras", "2026-10-20T16:00:00")
+    novembro = blocos.chave("Flamengo vs Palmeiras", "2026-11-20T16:00:00")
+    assert outubro != novembro
+    assert blocos.chave("Flamengo vs Palmeiras") == outubro
+    relogio[0] = datetime(2026, 10, 20, 17).timestamp()
+    assert blocos.chave("Flamengo vs Palmeiras") == novembro
+    assert blocos.expirar() == 1 and len(blocos) == 1
+    assert blocos.chave("Flamengo vs Palmeiras", "2026-11-20T16:00:00") == novembro
+
+    # No detector (que vive o processo todo) a cotação sem início troca de
+    # jogo a cada snapshot, e o bloco do jogo que acabou sai com os livros dele
+    relogio[0] = datetime(2026, 10, 19, 12).timestamp()
+    detector = DetectorIncremental(BlocosEventos(lambda: relogio[0]))
+    detector.trocar(("Casa A", "outubro"), [variante("Casa A", alta, inicio="2026-10-20T16:00:00")])
+    detector.trocar(("Casa A", "novembro"), [variante("Casa A", alta, inicio="2026-11-20T16:00:00")])
+    assert [emitido["tipo"] for emitido in detector.trocar(("Casa B", "sem início"),
+                                                           [variante("Casa B", baixa, inicio=None)])] == ["aberta"]
+    assert [chave[0][1] for chave in detector.abertas] == [outubro[1]]
+    assert detector.expirar() == []
+    relogio[0] = datetime(2026, 10, 20, 17).timestamp()
+    tipos = [emitido["tipo"] for emitido in detector.expirar()]
+    assert tipos[0] == "aberta" and tipos[-1] == "fechada"
+    assert [chave[0][1] for chave in detector.abertas] == [novembro[1]]
+    assert len(detector.blocos) == 2
+    detector.trocar(("Casa A", "outubro"), [])
+    assert len(detector.blocos) == 1
+    detector.trocar(("Casa A", "novembro"), [])
+    detector.trocar(("Casa B", "sem início"), [])
+    assert len(detector.blocos) == 0 and not detector.livros
+
+    logger.info("✅ Bloqueio de eventos funcionou!")
+    return True
+
+def test_stakes_lote():
+    """Testa o cálculo de stakes em lote e o endpoint /calcular-stakes/batch"""
+    logger.info("Testando stakes em lote...")
+    
+    import numpy as np
+    from fastapi.testclient import TestClient
+    from main import app
+    from surebet import calcular_stakes_multiplas, calcular_lucro_esperado_multiplas
+    from surebet_vetorizado import calcular_stakes_lote
+    
+    cenarios = [[2.10, 2.05], [2.30, 3.80, 3.90], [1.50, 2.40]]
+    bancas = [100.0, 1000.0, 250.0]
+    
+    odds = np.full((3, 3), np.nan)
+    for i, linha in enumerate(cenarios):
+        odds[i, :len(linha)] = linha
+    lote = calcular_stakes_lote(odds, bancas)
+    
+    assert lote.surebets.tolist() == [True, True, False]
+    for i, (linha, banca) in enumerate(zip(cenarios, bancas)):
+        stakes = calcular_stakes_multiplas(banca, linha)
+        assert lote.stakes[i, :len(linha)].tolist() == stakes
+        assert lote.lucros_garantidos[i] == calcular_lucro_esperado_multiplas(stakes, linha)["lucro_medio"]
+    
+    cliente = TestClient(app)
+    resposta = cliente.post("/calcular-stakes/batch", json={"odds": cenarios, "bancas": bancas})
+    assert resposta.status_code == 200
+    dados = resposta.json()
+    assert dados["total_cenarios"] == 3 and dados["total_surebets"] == 2
+    assert [len(stakes) for stakes in dados["stakes"]] == [2, 3, 2]
+    assert dados["lucro_garantido"] == lote.lucros_garantidos.tolist()
+    
+    assert cliente.post("/calcular-stakes/batch", json={"odds": [[1.0, 2.0]], "bancas": 100}).status_code == 400
+    assert cliente.post("/calcular-stakes/batch", json={"odds": cenarios, "bancas": [100]}).status_code == 400
+    
+    logger.info("✅ Stakes em lote funcionaram!")
+    return True
+
+def test_over_under_linhas():
+    """Testa o mercado de total de gols indexado por linha, com linhas asiáticas"""
+    logger.info("Testando over/under por linha...")
+    
+    from surebet import (normalizar_linha, verificar_surebet_over_under, calcular_stakes,
+                         encontrar_surebets_multiplas_casas)
+    
+    assert normalizar_linha("2,5") == normalizar_linha("2.50") == "2.5"
+    assert normalizar_linha("2/2.5") == normalizar_linha("2.0-2.5") == normalizar_linha(2.25) == "2.25"
+    assert normalizar_linha("2") == "2.0"
+    assert normalizar_linha("2.3") == "2.3"
+    
+    evento1 = {"evento": "Santos vs Grêmio", "casa": "Casa1",
+               "odds": {"1,5": {"over": 1.30, "under": 3.40}, "2.5": {"Over": 2.15, "Under": 1.70},
+                        "2/2.5": {"over": 1.95, "under": 1.85}}}
+    evento2 = {"evento": "Santos vs Grêmio", "casa": "Casa2",
+               "odds": {"2.50": {"over": 1.72, "under": 2.05}, "2.25": {"over": 1.80, "under": 2.12}}}
+    
+    oportunidades = verificar_surebet_over_under(evento1, evento2)
+    assert [(op["mercado"], op["resultado1"], op["resultado2"]) for op in oportunidades] == [
+        ("total_gols_2.5", "Over", "under"), ("total_gols_2.25", "over", "under")
+    ]
+    
+    # Mesmo formato do mercado de resultado: dá para calcular os stakes direto
+    op = oportunidades[0]
+    stake1, stake2 = calcular_stakes(1000, op["odd1"], op["odd2"])
+    assert stake1 > 0 and stake2 > 0
+    
+    todas_odds = {
+        "casa1": [dict(evento1, mercado="total_gols")],
+        "casa2": [dict(evento2, mercado="total_gols")],
+        "casa3": [{"evento": "Santos x Grêmio", "mercado": "total_gols", "casa": "Casa3",
+                   "odds": {"2.5": {"Mais de": 2.20, "Menos de": 1.60}}}],
+    }
+    multiplas = {sb["mercado"]: sb for sb in encontrar_surebets_multiplas_casas(todas_odds)}
+    assert set(multiplas) == {"total_gols_2.5", "total_gols_2.25"}
+    assert (multiplas["total_gols_2.5"]["casa1"], multiplas["total_gols_2.5"]["odd1"]) == ("Casa3", 2.20)
+    
+    logger.info("✅ Over/under por linha funcionou!")
+    return True
+
+def test_coleta_concorrente():
+    """Testa a coleta concorrente com limite de tempo por casa"""
+    logger.info("Testando coleta concorrente...")
+    
+    import asyncio
+    import time
+    from coleta import coletar_odds_sincrono, iterar_coleta
+    
+    def casa_lenta(atraso, odds):
+        def adaptador():
+            time.sleep(atraso)
+            return odds
+        return adaptador
+    
+    def casa_com_erro():
+        raise ConnectionError("sem conexão")
+    
+    async def casa_async():
+        await asyncio.sleep(0.05)
+        return [{"evento": "A vs B"}]
+    
+    adaptadores = {
+        "rapida": casa_lenta(0.05, [{"evento": "A vs B"}]),
+        "lenta": casa_lenta(0.3, [{"evento": "C vs D"}]),
+        "travada": casa_lenta(1.0, []),
+        "quebrada": casa_com_erro,
+        "async": casa_async,
+    }
+    
+    inicio = time.perf_counter()
+    resultados = coletar_odds_sincrono(adaptadores, timeouts={"travada": 0.4}, timeout=0.6)
+    duracao = time.perf_counter() - inicio
+    
+    # Latência da casa mais lenta, não a soma
+    assert duracao < 0.9, duracao
+    assert list(resultados) == list(adaptadores)
+    assert resultados["lenta"].odds == [{"evento": "C vs D"}] and resultados["async"].erro is None
+    assert resultados["travada"].erro.startswith("timeout")
+    assert "sem conexão" in resultados["quebrada"].erro
+    
+    async def ordem_de_chegada():
+        return [r.casa async for r in iterar_coleta({"lenta": casa_lenta(0.2, []), "rapida": casa_lenta(0.0, [])})]
+    assert asyncio.run(ordem_de_chegada()) == ["rapida", "lenta"]
+    
+    logger.info("✅ Coleta concorrente funcionou!")
+    return True
+
+def test_pool_navegadores():
+    """Testa o empréstimo, a reciclagem e o teste de saúde do pool de navegadores"""
+    logger.info("Testando pool de navegadores...")
+    
+    from navegadores import PoolNavegadores
+    
+    class DriverFalso:
+        def __init__(self):
+            self.vivo = True
+            self.fechado = False
+        def execute_script(self, script):
+            if not self.vivo:
+                raise ConnectionError("navegador caiu")
+            return 1
+        def quit(self):
+            self.fechado = True
+    
+    criados = []
+    def fabrica():
+        criados.append(DriverFalso())
+        return criados[-1]
+    
+    pool = PoolNavegadores(fabrica, tamanho=2, max_paginas=3)
+    pool.aquecer(em_segundo_plano=False)
+    assert len(criados) == 2
+    
+    # Reuso: o mesmo driver quente volta a ser emprestado
+    with pool.usar() as driver:
+        primeiro = driver
+    with pool.usar() as driver:
+        assert driver is primeiro
+    
+    # Terceira página: reciclado e reposto
+    with pool.usar() as driver:
+        assert driver is primeiro
+    assert primeiro.fechado and pool.estatisticas()["reciclados"] == 1
+    
+    # Driver que caiu não é emprestado
+    a, b = pool.obter(), pool.obter()
+    a.vivo = False
+    pool.devolver(a)
+    pool.devolver(b)
+    for _ in range(3):
+        with pool.usar() as driver:
+            assert driver.vivo
+    
+    try:
+        with pool.usar() as driver:
+            driver.vivo = False
+            raise RuntimeError("página travou")
+    except RuntimeError:
+        pass
+    assert driver.fechado
+    
+    c, d = pool.obter(), pool.obter()
+    try:
+        pool.obter(timeout=0.05)
+        assert False, "pool cheio deveria esgotar o tempo"
+    except TimeoutError:
+        pass
+    pool.devolver(c)
+    pool.devolver(d)
+    
+    pool.encerrar()
+    assert all(driver.fechado for driver in criados if driver.vivo)
+    
+    logger.info("✅ Pool de navegadores funcionou!")
+    return True
+
+def test_extracao_bet365_em_lote():
+    """Testa a extração em lote da Bet365 com rolagem da lista virtual"""
+    logger.info("Testando extração em lote da Bet365...")
+    
+    from scraping import extrair_odds_bet365, SCRIPT_EXTRAIR_JOGOS
+    
+    class DriverFalso:
+        """Página com 3 telas de jogos; cada tela repete o último jogo da anterior"""
+        def __init__(self):
+            self.telas = [
+                [[["Flamengo", "Palmeiras"], ["2.10", "1.85"]], [["Santos", "Grêmio"], ["2,20", "1.70"]]],
+                [[["Santos", "Grêmio"], ["2,20", "1.70"]], [["Bahia", "Vitória"], ["1.95", "-"]]],
+                [[["Inter", "Cruzeiro"], ["2.05", "1.90"]]],
+            ]
+            self.chamadas = 0
+            self.rolagens = 0
+        def get(self, url):
+            pass
+        def set_script_timeout(self, segundos):
+            pass
+        def execute_script(self, script, *argumentos):
+            self.chamadas += 1
+            return self.telas[0] if script == SCRIPT_EXTRAIR_JOGOS else True
+        def execute_async_script(self, script, *argumentos):
+            self.chamadas += 1
+            self.rolagens += 1
+            tela = min(self.rolagens, len(self.telas) - 1)
+            return {"jogos": self.telas[tela], "fim": tela == len(self.telas) - 1}
+    
+    driver = DriverFalso()
+    odds = extrair_odds_bet365(driver)
+    
+    assert [o["evento"] for o in odds] == ["Flamengo vs Palmeiras", "Santos vs Grêmio", "Inter vs Cruzeiro"]
+    assert odds[1]["odds"] == {"Santos": 2.20, "Grêmio": 1.70}
+    # Uma chamada por leitura da página, não uma por elemento
+    assert driver.chamadas <= 6
+    
+    logger.info("✅ Extração em lote funcionou!")
+    return True
+
+def test_captura_rede():
+    """Testa a captura de payloads JSON (XHR e WebSocket) e a conversão em cotações"""
+    logger.info("Testando captura de rede...")
+    
+    import json
+    from scraping import capturar_payloads_json, capturar_cotacoes_rede, extrair_cotacoes_payload
+    
+    feed = {"events": [{"homeTeam": "Flamengo", "awayTeam": "Palmeiras", "markets": [
+        {"key": "h2h", "outcomes": [{"name": "Flamengo", "price": 2.10}, {"name": "Empate", "price": 3.30},
+                                    {"name": "Palmeiras", "price": "1.85"}]},
+        {"key": "totals", "outcomes": [{"name": "Over", "price": 1.90, "point": 2.5},
+                                       {"name": "Under", "price": 1.90, "point": 2.5}]},
+    ]}]}
+    quadro = {"data": {"home": "Santos", "away": "Grêmio",
+                       "selections": [{"name": "Santos", "odds": 2.20}, {"name": "Grêmio", "odds": 1.70}]}}
+    
+    def log(metodo, **params):
+        return {"message": json.dumps({"message": {"method": metodo, "params": params}})}
+    
+    class DriverFalso:
+        def __init__(self):
+            self.logs = [
+                log("Network.responseReceived", requestId="1", type="XHR",
+                    response={"url": "https://casa/api/eventos", "mimeType": "application/json"}),
+                log("Network.responseReceived", requestId="2", type="Image",
+                    response={"url": "https://casa/logo.png", "mimeType": "image/png"}),
+                log("Network.loadingFinished", requestId="1"),
+                log("Network.loadingFinished", requestId="2"),
+                log("Network.webSocketCreated", requestId="9", url="wss://casa/ao-vivo"),
+                log("Network.webSocketFrameReceived", requestId="9", response={"payloadData": json.dumps(quadro)}),
+                log("Network.webSocketFrameReceived", requestId="9", response={"payloadData": "F|binario"}),
+            ]
+        def get_log(self, tipo):
+            logs, self.logs = self.logs, []
+            return logs
+        def execute_cdp_cmd(self, comando, params):
+            assert comando == "Network.getResponseBody" and params["requestId"] == "1"
+            return {"body": json.dumps(feed), "base64Encoded": False}
+    
+    payloads = capturar_payloads_json(DriverFalso())
+    assert [url for url, _ in payloads] == ["https://casa/api/eventos", "wss://casa/ao-vivo"]
+    
+    cotacoes = extrair_cotacoes_payload(feed, "Casa")
+    assert cotacoes == [{"evento": "Flamengo vs Palmeiras", "mercado": "resultado", "casa": "Casa",
+                         "odds": {"Flamengo": 2.10, "Empate": 3.30, "Palmeiras": 1.85}}]
+    
+    eventos = [c["evento"] for c in capturar_cotacoes_rede(DriverFalso(), "Casa", timeout=0.5)]
+    assert eventos == ["Flamengo vs Palmeiras", "Santos vs Grêmio"]
+    
+    # responseReceived e loadingFinished em leituras diferentes; o quadro do WebSocket
+    # chega depois da primeira cotação e ainda entra, porque a captura espera a rede ficar quieta
+    class DriverEmLeituras(DriverFalso):
+        def get_log(self, tipo):
+            return [self.logs.pop(0)] if self.logs else []
+    
+    driver = DriverEmLeituras()
+    assert capturar_payloads_json(driver) == []
+    assert [url for url, _ in capturar_payloads_json(driver)] == []
+    assert [url for url, _ in capturar_payloads_json(driver)] == ["https://casa/api/eventos"]
+    
+    eventos = [c["evento"] for c in capturar_cotacoes_rede(DriverEmLeituras(), "Casa", timeout=3, silencio=0.3)]
+    assert eventos == ["Flamengo vs Palmeiras", "Santos vs Grêmio"]
+    
+    logger.info("✅ Captura de rede funcionou!")
+    return True
+
+def test_sessao_http():
+    """Testa a sessão HTTP compartilhada: keep-alive, novas tentativas e ETag"""
+    logger.info("Testando sessão HTTP...")
+    
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from sessoes_http import ClienteHttp
+    
+    chamadas = {"/feed": 0, "/instavel": 0}
+    conexoes = set()
+    
+    class Servidor(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *args):
+            pass
+        def do_GET(self):
+            chamadas[self.path] += 1
+            conexoes.add(self.client_address)
+            if self.path == "/instavel" and chamadas[self.path] == 1:
+                status, corpo, extras = 503, b"", {}
+            elif self.path == "/feed" and self.headers.get("If-None-Match") == '"v1"':
+                status, corpo, extras = 304, b"", {"ETag": '"v1"'}
+            else:
+                status, corpo, extras = 200, b'{"jogos": [1, 2, 3]}', {"ETag": '"v1"'}
+            self.send_response(status)
+            for nome, valor in extras.items():
+                self.send_header(nome, valor)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+    
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    
+    try:
+        cliente = ClienteHttp()
+        
+        primeira = cliente.obter(f"{base}/feed")
+        segunda = cliente.obter(f"{base}/feed")
+        assert not primeira.nao_modificada and segunda.nao_modificada
+        assert segunda.status_code == 200 and segunda.json() == {"jogos": [1, 2, 3]}
+        assert cliente.estatisticas()["nao_modificadas"] == 1
+        
+        # Keep-alive: as duas requisições usaram a mesma conexão
+        assert len(conexoes) == 1
+        
+        # 503 transitório é repetido pela própria sessão
+        assert cliente.obter(f"{base}/instavel").status_code == 200
+        assert chamadas["/instavel"] == 2
+    finally:
+        servidor.shutdown()
+    
+    logger.info("✅ Sessão HTTP funcionou!")
+    return True
+
+def test_cache_odds():
+    """Testa o cache de odds: TTL por casa, stale-while-revalidate e busca única"""
+    logger.info("Testando cache de odds...")
+    
+    import threading
+    import time
+    from cache_odds import CacheOdds
+    
+    agora = [0.0]
+    chamadas = []
+    liberar = threading.Event()
+    
+    def buscar(casas):
+        chamadas.append(casas)
+        liberar.wait(5)
+        odd = 2.0 + len(chamadas) / 100
+        todas = {
+            "bet365": [{"evento": "Flamengo vs Palmeiras", "mercado": "resultado", "casa": "Bet365",
+                        "odds": {"Flamengo": odd, "Palmeiras": 1.85}}],
+            "betano": [{"evento": "Flamengo vs Palmeiras", "mercado": "resultado", "casa": "Betano",
+                        "odds": {"Flamengo": 1.90, "Palmeiras": odd}}],
+        }
+        return {casa: odds for casa, odds in todas.items() if casas is None or casa in casas}
+    
+    cache = CacheOdds(buscar, ttl=30, ttls_por_casa={"betano": 10}, janela_obsoleta=60,
+                      relogio=lambda: agora[0])
+    
+    # Dez leituras simultâneas sem snapshot: uma busca só, todos recebem a mesma versão
+    snapshots = []
+    leitores = [threading.Thread(target=lambda: snapshots.append(cache.obter())) for _ in range(10)]
+    for leitor in leitores:
+        leitor.start()
+    time.sleep(0.1)
+    liberar.set()
+    for leitor in leitores:
+        leitor.join(5)
+    
+    assert len(chamadas) == 1 and chamadas[0] is None
+    assert len(snapshots) == 10 and {s.versao for s in snapshots} == {1}
+    assert len(snapshots[0].tabela) == 2
+    
+    # Dentro do TTL é leitura pura
+    agora[0] = 5
+    assert cache.obter().versao == 1 and len(chamadas) == 1
+    assert cache.obter().metadados()["idade_segundos"] == 5
+    
+    # betano venceu (TTL 10): serve a versão antiga e atualiza só ela em segundo plano
+    agora[0] = 15
+    assert cache.obter().versao == 1
+    for _ in range(100):
+        if cache.estatisticas()["versao"] == 2:
+            break
+        time.sleep(0.01)
+    assert chamadas[1] == ["betano"]
+    
+    snapshot = cache.obter()
+    assert snapshot.versao == 2
+    assert snapshot.odds["betano"][0]["odds"]["Palmeiras"] == 2.02
+    assert snapshot.odds["bet365"][0]["odds"]["Flamengo"] == 2.01    # casa dentro do TTL não foi buscada
+    assert snapshot.idade("betano") == 0 and snapshot.idade("bet365") == 15
+    
+    # Vencido além da janela: espera a busca
+    agora[0] = 200
+    assert cache.obter().versao == 3
+    assert sorted(chamadas[2]) == ["bet365", "betano"]
+    
+    # Busca falhou: mantém o snapshot anterior
+    def falhar(casas):
+        raise RuntimeError("casa fora do ar")
+    cache.buscar = falhar
+    agora[0] = 500
+    assert cache.obter().versao == 3
+    
+    logger.info("✅ Cache de odds funcionou!")
+    return True
+
+def test_agendador_coleta():
+    """Testa o agendador: intervalo pelo início dos jogos, calmaria, falhas e orçamento por casa"""
+    logger.info("Testando agendador de coleta...")
+    
+    from datetime import datetime, timedelta, timezone
+    from agendador import AgendadorColeta, intervalo_por_inicio, INTERVALO_DISTANTE
+    from cache_odds import CacheOdds
+    
+    base = datetime(2024, 10, 19, 20, 0, tzinfo=timezone.utc)
+    
+    def jogo(casa, falta, odd=2.0):
+        return {"evento": f"Jogo {casa}", "mercado": "resultado", "casa": casa,
+                "inicio": (base + falta).isoformat(), "odds": {"Casa": odd, "Fora": 2.0}}
+    
+    agora = base.timestamp()
+    assert intervalo_por_inicio([jogo("x", timedelta(minutes=10))], agora) == 15
+    assert intervalo_por_inicio([jogo("x", timedelta(hours=1)), jogo("x", timedelta(days=3))], agora) == 60
+    assert intervalo_por_inicio([jogo("x", timedelta(hours=10))], agora) == 300
+    assert intervalo_por_inicio([jogo("x", timedelta(days=3))], agora) == INTERVALO_DISTANTE
+    assert intervalo_por_inicio([jogo("x", timedelta(hours=-4))], agora) == INTERVALO_DISTANTE
+    assert intervalo_por_inicio([{"evento": "Sem horário", "odds": {}}], agora) == INTERVALO_DISTANTE
+    
+    relogio = [0.0]
+    chamadas = {"perto": 0, "longe": 0, "movimentada": 0, "fora": 0}
+    
+    def perto():
+        chamadas["perto"] += 1
+        return [jogo("perto", timedelta(minutes=10))]
+    
+    def longe():
+        chamadas["longe"] += 1
+        return [jogo("longe", timedelta(days=3))]
+    
+    def movimentada():
+        chamadas["movimentada"] += 1
+        return [jogo("movimentada", timedelta(minutes=5), odd=2.0 + chamadas["movimentada"] / 100)]
+    
+    def fora():
+        chamadas["fora"] += 1
+        raise ConnectionError("casa fora do ar")
+    
+    cache = CacheOdds(lambda casas: {}, relogio=lambda: relogio[0])
+    agendador = AgendadorColeta(
+        {"perto": perto, "longe": longe, "movimentada": movimentada, "fora": fora},
+        cache.publicar, requisicoes_por_hora={"movimentada": 60},
+        relogio=lambda: relogio[0], relogio_parede=lambda: agora + relogio[0],
+    )
+    
+    assert sorted(agendador.executar_pendentes()) == ["fora", "longe", "movimentada", "perto"]
+    assert cache.obter().versao == 1 and sorted(cache.obter().odds) == ["longe", "movimentada", "perto"]
+    estatisticas = agendador.estatisticas()
+    assert estatisticas["perto"]["intervalo"] == 15 and estatisticas["longe"]["intervalo"] == INTERVALO_DISTANTE
+    assert estatisticas["fora"]["falhas"] == 1
+    
+    # Aos 15s: perto volta igual (calmaria dobra o intervalo); movimentada ficou sem orçamento (1/min)
+    relogio[0] = 15
+    assert agendador.executar_pendentes() == ["perto"]
+    estatisticas = agendador.estatisticas()
+    assert estatisticas["perto"]["intervalo"] == 30 and estatisticas["perto"]["sem_mudanca"] == 1
+    assert estatisticas["movimentada"]["adiadas"] == 1 and estatisticas["movimentada"]["proxima_em"] == 45
+    assert cache.obter().versao == 1          # nada mudou, nenhuma versão nova
+    assert cache.obter().idade("perto") == 0   # mas a casa foi renovada
+    
+    # Aos 60s: movimentada tem ficha de novo e muda as odds; fora falha de novo e recua 15s x 2²
+    relogio[0] = 60
+    assert sorted(agendador.executar_pendentes()) == ["fora", "movimentada", "perto"]
+    assert cache.obter().versao == 2
+    assert agendador.estatisticas()["fora"]["falhas"] == 2
+    assert agendador.estatisticas()["fora"]["proxima_em"] == 60
+    assert chamadas == {"perto": 3, "longe": 1, "movimentada": 2, "fora": 2}
+    
+    logger.info("✅ Agendador de coleta funcionou!")
+    return True
+
+def test_cliente_odds_api():
+    """Testa o cliente da The Odds API: uma chamada por esporte, cota, cache e tabela em lote"""
+    logger.info("Testando cliente da The Odds API...")
+    
+    import json
+    from odds_api import ClienteOddsApi
+    
+    jogo = {
+        "home_team": "Flamengo", "away_team": "Palmeiras", "commence_time": "2024-10-19T20:00:00Z",
+        "bookmakers": [
+            {"key": "pinnacle", "title": "Pinnacle", "markets": [
+                {"key": "h2h", "outcomes": [{"name": "Flamengo", "price": 2.1}, {"name": "Draw", "price": 3.4},
+                                            {"name": "Palmeiras", "price": 3.6}]},
+                {"key": "totals", "outcomes": [{"name": "Over", "price": 1.9, "point": 2.5},
+                                               {"name": "Under", "price": 1.95, "point": 2.5}]},
+            ]},
+            {"key": "betfair", "title": "Betfair", "markets": [
+                {"key": "h2h", "outcomes": [{"name": "Flamengo", "price": 2.2}, {"name": "Draw", "price": 3.3},
+                                            {"name": "Palmeiras", "price": 3.5}]},
+            ]},
+        ],
+    }
+    
+    class Resposta:
+        def __init__(self, dados, cabecalhos=None):
+            self.status_code, self.dados, self.headers = 200, dados, cabecalhos or {}
+        
+        def json(self):
+            return self.dados
+        
+        def iter_content(self, tamanho):
+            corpo = json.dumps(self.dados).encode()
+            return (corpo[i:i + 100] for i in range(0, len(corpo), 100))
+        
+        def close(self):
+            pass
+    
+    class ClienteFalso:
+        def __init__(self):
+            self.pedidos = []
+            self.restantes = 100
+        
+        def obter(self, url, params=None, timeout=10, **kwargs):
+            self.pedidos.append((url, params))
+            if url.endswith("/sports/"):
+                return Resposta([{"key": "soccer_brazil_campeonato", "active": True},
+                                 {"key": "soccer_epl", "active": True},
+                                 {"key": "soccer_fifa_world_cup", "active": False}])
+            self.restantes -= 4
+            return Resposta([jogo], {"x-requests-remaining": str(self.restantes), "x-requests-used": "12"})
+    
+    relogio = [0.0]
+    falso = ClienteFalso()
+    api = ClienteOddsApi("chave", regioes=("eu", "uk"), ttl=60, reserva_minima=10, periodo_cota=3600,
+                         cliente=falso, relogio=lambda: relogio[0])
+    
+    esportes = ["soccer_brazil_campeonato", "soccer_epl", "soccer_fifa_world_cup", "soccer_epl"]
+    tabela = api.buscar(esportes)
+    
+    # Esporte fora de temporada e repetido não geram chamadas; mercados e regiões vão juntos
+    chamadas_odds = [params for url, params in falso.pedidos if "/odds/" in url]
+    assert len(chamadas_odds) == 2
+    assert chamadas_odds[0]["markets"] == "h2h,totals" and chamadas_odds[0]["regions"] == "eu,uk"
+    assert api.custo_chamada == 4 and api.restantes == 92 and api.usadas == 12
+    
+    # Tabela em lote: 3 cotações por esporte (Pinnacle 1X2 e total, Betfair 1X2)
+    assert len(tabela) == 6
+    assert sorted(tabela.grupos()) == ["betfair", "pinnacle"]
+    total = next(tabela.cotacao(i) for i in range(len(tabela)) if tabela.cotacao(i)["mercado"] == "total_gols")
+    assert total == {"evento": "Flamengo vs Palmeiras", "mercado": "total_gols", "casa": "Pinnacle",
+                     "odds": {"2.5": {"over": 1.9, "under": 1.95}}, "inicio": "2024-10-19T20:00:00Z"}
+    
+    # Cota restante (92 - reserva 10) dá para ~10 rodadas de 2 esportes na hora: intervalo de ~6 min
+    assert 350 < api.intervalo_minimo(2) < 360
+    relogio[0] = 120
+    api.buscar(esportes)
+    assert len([url for url, _ in falso.pedidos if "/odds/" in url]) == 2
+    assert api.estatisticas()["reaproveitadas"] == 2
+    
+    # Vencido o intervalo, busca de novo; na reserva mínima, só serve o que já tem
+    relogio[0] = 400
+    api.buscar(esportes)
+    assert api.restantes == 84
+    api.restantes = 12
+    relogio[0] = 10_000
+    assert len(api.buscar(esportes)) == 6
+    assert len([url for url, _ in falso.pedidos if "/odds/" in url]) == 4
+    
+    logger.info("✅ Cliente da The Odds API funcionou!")
+    return True
+
+def test_fluxo_json():
+    """Testa a leitura em fluxo de feeds JSON e a detecção antes do fim do corpo"""
+    logger.info("Testando leitura de JSON em fluxo...")
+    
+    import json
+    from fluxo_json import iterar_array_json
+    from odds_api import iterar_cotacoes
+    from detector_incremental import DetectorIncremental, ABERTA
+    
+    elementos = [{"jogo": i, "nome": "São Paulo" * i, "odds": [1.5, None, True]} for i in range(50)]
+    elementos += [12345, "x", None, 3.25, -1e-5, False]
+    corpo = json.dumps(elementos, ensure_ascii=False).encode()
+    
+    # Qualquer corte dos pedaços (inclusive no meio de um caractere UTF-8 ou de um número) dá o mesmo resultado
+    for tamanho in (1, 3, 7, 64, len(corpo)):
+        pedacos = [corpo[i:i + tamanho] for i in range(0, len(corpo), tamanho)]
+        assert list(iterar_array_json(pedacos)) == elementos
+    
+    assert list(iterar_array_json([b" [ ] "])) == []
+    for invalido in ([b'{"a": 1}'], [b'[{"a": 1}'], [b'[1, 2'], [b'[{"a": }]'], [b'[1 2]'], [b'']):
+        try:
+            list(iterar_array_json(invalido))
+            assert False, f"deveria falhar: {invalido}"
+        except ValueError:
+            pass
+    
+    # Surebet no primeiro jogo: aparece antes de o corpo terminar de chegar
+    def jogo(i, odd_casa, odd_fora):
+        return {"home_team": f"Time {i}", "away_team": f"Rival {i}", "commence_time": "2024-10-19T20:00:00Z",
+                "bookmakers": [
+                    {"key": "a", "title": "Casa A", "markets": [{"key": "h2h", "outcomes": [
+                        {"name": f"Time {i}", "price": odd_casa}, {"name": "Draw", "price": 3.5},
+                        {"name": f"Rival {i}", "price": 1.5}]}]},
+                    {"key": "b", "title": "Casa B", "markets": [{"key": "h2h", "outcomes": [
+                        {"name": f"Time {i}", "price": 1.5}, {"name": "Draw", "price": 3.5},
+                        {"name": f"Rival {i}", "price": odd_fora}]}]},
+                ]}
+    
+    corpo = json.dumps([jogo(0, 3.1, 3.1)] + [jogo(i, 2.4, 2.4) for i in range(1, 200)]).encode()
+    lidos = []
+    
+    def pedacos():
+        for i in range(0, len(corpo), 1024):
+            lidos.append(i)
+            yield corpo[i:i + 1024]
+    
+    detector = DetectorIncremental()
+    cotacoes = (cotacao for _, cotacao in iterar_cotacoes(iterar_array_json(pedacos())))
+    primeiro = next(detector.consumir(cotacoes))
+    
+    assert primeiro["tipo"] == ABERTA and primeiro["oportunidade"]["evento"] == "Time 0 vs Rival 0"
+    assert len(lidos) < len(corpo) // 1024 / 10
+
+    # Caminho de produção: a transmissão da The Odds API publica no cache jogo a jogo
+    from cache_odds import CacheOdds
+    from odds_api import ClienteOddsApi, TransmissorOddsApi
+
+    class Resposta:
+        status_code, headers = 200, {}
+
+        def __init__(self, corpo):
+            self.corpo = corpo
+
+        def iter_content(self, tamanho):
+            return pedacos_de(self.corpo)
+
+        def close(self):
+            pass
+
+    def pedacos_de(corpo):
+        for i in range(0, len(corpo), 1024):
+            lidos.append(i)
+            yield corpo[i:i + 1024]
+
+    jogos = [jogo(0, 3.1, 3.1)] + [jogo(i, 2.4, 2.4) for i in range(1, 200)]
+
+    class ClienteFalso:
+        def obter(self, url, params=None, timeout=10, **kwargs):
+            if url.endswith("/sports/"):
+                raise ConnectionError("sem lista de esportes")
+            return Resposta(json.dumps(jogos).encode())
+
+    buscas = []
+    cache = CacheOdds(lambda casas: buscas.append(casas) or {})
+    api = ClienteOddsApi("chave", cliente=ClienteFalso())
+    transmissor = TransmissorOddsApi(api, ["soccer_epl"], cache.publicar_fluxo)
+
+    lidos.clear()
+    assert transmissor.executar()
+    snapshot = cache.obter()
+    assert snapshot.versao == 1 and sorted(snapshot.odds) == ["a", "b"] and len(snapshot.odds["a"]) == 200
+    assert [surebet[0] for surebet in snapshot.surebets] == ["Time 0 vs Rival 0"]
+    assert api.estatisticas()["esportes_guardados"] == 0    # a resposta não fica guardada no cliente
+    assert not buscas                                       # obter() não busca as casas do fluxo
+
+    # Rodada igual não gera versão; o jogo 0 sumindo fecha a surebet
+    transmissor.executar()
+    assert cache.obter().versao == 1
+    jogos.pop(0)
+    transmissor.executar()
+    snapshot = cache.obter()
+    assert snapshot.versao == 2 and not snapshot.surebets and len(snapshot.odds["a"]) == 199
+
+    # Início ajustado no mesmo jogo: a chave antiga sai sem apagar a odd nova
+    jogos[0] = jogo(1, 3.1, 3.1)
+    jogos[0]["commence_time"] = "2024-10-19T20:30:00Z"
+    transmissor.executar()
+    snapshot = cache.obter()
+    assert [surebet[0] for surebet in snapshot.surebets] == ["Time 1 vs Rival 1"]
+    assert cache.estatisticas()["mudancas"]["coletas"] == 8
+
+    logger.info("✅ Leitura de JSON em fluxo funcionou!")
+    return True
+
+def test_parser_html():
+    """Testa os backends de extração HTML e o scraping da Superbet sobre a página gravada"""
+    logger.info("Testando parser HTML...")
+    
+    import os
+    import parser_html
+    from scraping import extrair_odds_superbet, SELETORES_SUPERBET
+    
+    # O leitor em fluxo só entende seletores simples e só é usado quando pedido (ou sem bs4)
+    assert parser_html.seletor_simples("div.event-row[data-id='3']") is not None
+    assert parser_html.seletor_simples(".lista .jogo") is None
+    assert parser_html.seletor_simples("a:hover") is None
+    assert parser_html.escolher_backend([".jogo", ".odd"]) in ("selectolax", "lxml", "bs4")
+    assert parser_html.escolher_backend([".jogo", ".odd"], "simples") == "simples"
+    assert parser_html.escolher_backend([".jogo", ".odds > span"]) in ("selectolax", "lxml", "bs4")
+    
+    # Fechamentos implícitos (li, tr, td sem tag de fechamento): um jogo por item, como no navegador
+    lista = '<ul><li class="jogo"><b class="time">A</b><b class="time">B</b><li class="jogo"><b class="time">C</b></ul>'
+    tabela = ('<table><tr class="jogo"><td class="odd">1.5<td class="odd">2.5'
+              '<tr class="jogo"><td class="odd">1.8<td class="odd">2.0</table>')
+    assert parser_html.extrair(lista, ".jogo", [".time"], "simples") == [[["A", "B"]], [["C"]]]
+    assert parser_html.extrair(tabela, ".jogo", [".odd"], "simples") == [[["1.5", "2.5"]], [["1.8", "2.0"]]]
+    for backend in set(parser_html.backends_disponiveis()) & {"selectolax", "lxml"}:
+        assert parser_html.extrair(lista, ".jogo", [".time"], backend) == [[["A", "B"]], [["C"]]], backend
+        assert parser_html.extrair(tabela, ".jogo", [".odd"], backend) == [[["1.5", "2.5"]], [["1.8", "2.0"]]], backend
+    
+    # Jogos e campos aninhados, com tags fechadas: o mesmo resultado do BeautifulSoup
+    aninhado = ('<div class="jogo"><span class="time">A<span class="time">B</span></span>'
+                '<div class="jogo"><span class="time">C</span></div></div>')
+    assert (parser_html.extrair(aninhado, ".jogo", [".time"], "simples")
+            == parser_html.extrair(aninhado, ".jogo", [".time"], "bs4")
+            == [[["AB", "B", "C"]], [["C"]]])
+    
+    # HTML malformado (tags sem fechar, entidades) dá o mesmo resultado nos dois backends
+    html = (b'<div class="lista"><div class="jogo"><span class="time">S&atilde;o Paulo</span>'
+            b'<span class="time">Santos</span><p><b class="odd"> 1,90 </b><br><b class="odd">2.05</b></div>'
+            b'<div class="jogo outro"><span class="time">Gr\xc3\xaamio</span><span class="time">Bahia</span>'
+            b'<b class="odd">2.4</b><b class="odd">3.1</b><b class="odd">2.9</b>')
+    esperado = [[["São Paulo", "Santos"], ["1,90", "2.05"]], [["Grêmio", "Bahia"], ["2.4", "3.1", "2.9"]]]
+    for backend in ("simples", "bs4"):
+        assert parser_html.extrair(html, ".jogo", [".time", ".odd"], backend) == esperado, backend
+    
+    # Página gravada da Superbet: 72 jogos 1X2, iguais em todos os backends
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "superbet_futebol.html")
+    with open(caminho, "rb") as arquivo:
+        pagina = arquivo.read()
+    
+    odds = extrair_odds_superbet(pagina)
+    assert len(odds) == 72
+    assert all(list(cotacao["odds"])[1] == "Empate" and len(cotacao["odds"]) == 3 for cotacao in odds)
+    assert odds == extrair_odds_superbet(pagina, backend="bs4")
+    
+    # Sem jogos na página, nem chega a parsear
+    assert extrair_odds_superbet(b"<html><body><div id='app'></div></body></html>") == []
+    
+    logger.info("✅ Parser HTML funcionou!")
+    return True
+
+def test_inicializacao_api():
+    """Testa que importar a API não carrega Selenium/requests/bs4 e o relatório de importação"""
+    logger.info("Testando inicialização da API...")
+
+    from tempo_importacao import medir_importacao, ler_importtime, tempo_por_pacote, relatorio
+
+    # Importar main em um processo novo: os pacotes pesados só entram quando alguém coleta
+    importacoes = medir_importacao("main")
+    modulos = {importacao.modulo for importacao in importacoes}
+    assert "main" in modulos and "scraping" in modulos
+    for pesado in ("selenium", "webdriver_manager", "requests", "bs4", "numpy"):
+        assert pesado not in modulos, pesado
+
+    # Leitura da saída do -X importtime e soma por pacote de topo
+    saida = ("import time: self [us] | cumulative | imported package\n"
+             "import time:       100 |        100 |     pacote.a\n"
+             "import time:        50 |        150 |   pacote\n"
+             "import time:       300 |        450 | main\n"
+             "Traceback qualquer\n")
+    lidas = ler_importtime(saida)
+    assert [(i.modulo, i.nivel) for i in lidas] == [("pacote.a", 2), ("pacote", 1), ("main", 0)]
+    assert tempo_por_pacote(lidas) == {"main": 300, "pacote": 150}
+    assert "0.5 ms em 3 módulos" in relatorio(lidas)
+
+    # Chrome só abre na subida se alguma coleta vai usar navegador (ou se forçado)
+    import os
+    import main
+    original = (os.environ.pop("AQUECER_CHROME", None), main.USAR_AGENDADOR, main.COLETA_CONCORRENTE)
+    try:
+        main.USAR_AGENDADOR = main.COLETA_CONCORRENTE = False
+        assert not main.aquecer_chrome()
+        main.COLETA_CONCORRENTE = True
+        assert main.aquecer_chrome()
+        os.environ["AQUECER_CHROME"] = "0"
+        assert not main.aquecer_chrome()
+    finally:
+        os.environ.pop("AQUECER_CHROME", None)
+        if original[0] is not None:
+            os.environ["AQUECER_CHROME"] = original[0]
+        main.USAR_AGENDADOR, main.COLETA_CONCORRENTE = original[1:]
+
+    logger.info("✅ Inicialização da API funcionou!")
+    return True
+
+def test_registro_casas():
+    """Testa o registro de adaptadores, a descoberta por entry points e o uso dos metadados no agendador"""
+    logger.info("Testando registro de casas...")
+
+    import asyncio
+    from importlib.metadata import EntryPoint
+    from agendador import AgendadorColeta
+    from casas import AdaptadorCasa, RegistroCasas
+    from coleta import buscar_casa
+    from scraping import ADAPTADORES_CASAS
+
+    # Casas embutidas, com metadados
+    assert {"bet365", "superbet", "betano"} <= set(ADAPTADORES_CASAS)
+    assert ADAPTADORES_CASAS["bet365"].transporte == "navegador"
+    assert ADAPTADORES_CASAS.metadados()["superbet"]["mercados"] == ["resultado"]
+
+    try:
+        AdaptadorCasa("x", list, transporte="pombo")
+        assert False, "transporte inválido aceito"
+    except ValueError:
+        pass
+
+    registro = RegistroCasas(grupo=None)
+
+    @registro.casa("rapida", mercados=("resultado", "total_gols"))
+    def rapida():
+        return [{"evento": "A vs B", "mercado": "resultado", "casa": "Rápida", "odds": {"A": 2.0, "B": 2.0}}]
+
+    try:
+        registro.registrar(AdaptadorCasa("rapida", rapida))
+        assert False, "casa repetida aceita"
+    except ValueError:
+        pass
+
+    # Entry points: função vira adaptador com metadados padrão; os que falham são ignorados
+    novas = registro.carregar([
+        EntryPoint("betano_plugin", "scraping:buscar_odds_betano", "surebet.casas"),
+        EntryPoint("quebrada", "modulo_que_nao_existe:buscar", "surebet.casas"),
+    ])
+    assert novas == ["betano_plugin"] and list(registro) == ["rapida", "betano_plugin"]
+    assert registro["betano_plugin"].transporte == "http" and registro["betano_plugin"].custo == 1.0
+    assert registro.adaptadores(["rapida", "nenhuma"]) == {"rapida": registro["rapida"]}
+
+    # Adaptador assíncrono continua sendo aguardado direto pela coleta
+    async def assincrona():
+        return rapida()
+    resultado = asyncio.run(buscar_casa("assincrona", AdaptadorCasa("assincrona", assincrona), 1.0))
+    assert resultado.erro is None and len(resultado.odds) == 1
+
+    # Agendador: no máximo 1 navegador por vez (o mais atrasado primeiro); custo 3 gasta 3 fichas
+    relogio = [0.0]
+    navegadores = RegistroCasas(grupo=None)
+    for nome in ("chrome_a", "chrome_b"):
+        navegadores.registrar(AdaptadorCasa(nome, rapida, transporte="navegador"))
+    navegadores.registrar(AdaptadorCasa("api_cara", rapida, transporte="api", custo=3, requisicoes_por_hora=180,
+                                        timeout=5.0))
+    agendador = AgendadorColeta(navegadores, lambda novas: None, concorrencia={"navegador": 1},
+                                relogio=lambda: relogio[0])
+    assert agendador.timeouts == {"api_cara": 5.0}
+    assert sorted(agendador.executar_pendentes()) == ["api_cara", "chrome_a"]
+    assert agendador.executar_pendentes() == ["chrome_b"]
+
+    # 180/h com rajada de 3 fichas: a segunda coleta da API só daqui a 60s (3 fichas a 1 por 20s)
+    orcamento = agendador.casas["api_cara"].orcamento
+    assert orcamento.capacidade == 3 and orcamento.espera() == 60
+    assert agendador.estatisticas()["api_cara"]["custo"] == 3
+
+    logger.info("✅ Registro de casas funcionou!")
+    return True
+
+def test_disjuntores():
+    """Testa os disjuntores por casa, o orçamento de latência da coleta e o último snapshot bom no cache"""
+    logger.info("Testando disjuntores...")
+
+    import time
+    from cache_odds import CacheOdds
+    from coleta import ERRO_CIRCUITO_ABERTO, coletar_odds_sincrono
+    from disjuntores import ABERTO, FECHADO, MEIO_ABERTO, Disjuntor, Disjuntores
+
+    relogio = [0.0]
+    disjuntor = Disjuntor("lenta", latencia_lenta=2.0, relogio=lambda: relogio[0])
+
+    # Erros demais na janela abrem o disjuntor
+    for sucesso in (True, False, False, True, False):
+        assert disjuntor.permitir()
+        disjuntor.registrar(sucesso, 0.5)
+    assert disjuntor.estado == ABERTO and not disjuntor.permitir()
+    assert disjuntor.espera() == 30
+
+    # Meio aberto: só uma coleta de teste; falhou, reabre pelo dobro do tempo
+    relogio[0] = 30
+    assert disjuntor.permitir() and disjuntor.estado == MEIO_ABERTO
+    assert not disjuntor.permitir()
+    disjuntor.registrar(False, 0.1)
+    assert disjuntor.estado == ABERTO and disjuntor.espera() == 60
+
+    # Teste bem-sucedido e rápido fecha
+    relogio[0] = 90
+    assert disjuntor.permitir()
+    disjuntor.registrar(True, 0.1)
+    assert disjuntor.estado == FECHADO and disjuntor.estatisticas()["aberturas"] == 2
+
+    # Coletas que dão certo mas lentas também abrem
+    for _ in range(5):
+        disjuntor.registrar(True, 3.0)
+    assert disjuntor.estado == ABERTO
+
+    # Orçamento de latência: a casa lenta não segura a coleta; casa com disjuntor aberto nem é chamada
+    chamadas = []
+
+    def rapida():
+        chamadas.append("rapida")
+        return [{"evento": "A vs B", "mercado": "resultado", "casa": "Rápida", "odds": {"A": 2.0, "B": 2.0}}]
+
+    def lenta():
+        time.sleep(1.0)
+        return []
+
+    def bloqueada():
+        chamadas.append("bloqueada")
+        return []
+
+    disjuntores = Disjuntores(relogio=lambda: relogio[0])
+    for _ in range(5):
+        disjuntores["bloqueada"].registrar(False, 0.0)
+
+    inicio = time.perf_counter()
+    resultados = coletar_odds_sincrono({"rapida": rapida, "lenta": lenta, "bloqueada": bloqueada},
+                                       orcamento=0.2, disjuntores=disjuntores)
+    assert time.perf_counter() - inicio < 0.8
+    assert resultados["rapida"].erro is None and resultados["lenta"].erro.startswith("timeout")
+    assert resultados["bloqueada"].erro == ERRO_CIRCUITO_ABERTO and chamadas == ["rapida"]
+    assert disjuntores.estatisticas()["lenta"]["erros"] == 1
+
+    # Cache: a casa que não voltou continua com o último snapshot bom e só é pedida de novo após um TTL
+    pedidos = []
+
+    def buscar(casas):
+        pedidos.append(sorted(casas) if casas else None)
+        if casas is None:
+            return {"rapida": rapida(), "lenta": rapida()}
+        return {"rapida": rapida()}
+
+    relogio[0] = 0.0
+    cache = CacheOdds(buscar, ttl=10, janela_obsoleta=0, relogio=lambda: relogio[0])
+    cache.obter()
+    relogio[0] = 11
+    snapshot = cache.obter()
+    assert pedidos == [None, ["lenta", "rapida"]]
+    assert snapshot.idade("lenta") == 11 and snapshot.idade("rapida") == 0
+    assert cache.obter() is snapshot and len(pedidos) == 2
+    assert cache.estatisticas()["casas_sem_resposta"] == 1
+    relogio[0] = 22
+    cache.obter()
+    assert pedidos[-1] == ["lenta", "rapida"]
+
+    # Adaptador que falha levanta o erro (o disjuntor conta) em vez de inventar odds
+    import scraping
+
+    class RespostaFalsa:
+        status_code = 503
+        content = b""
+
+    obter_original, exemplo_original = scraping.cliente_http.obter, scraping.DADOS_EXEMPLO
+    scraping.cliente_http.obter = lambda *args, **kwargs: RespostaFalsa()
+    try:
+        scraping.DADOS_EXEMPLO = False
+        disjuntores = Disjuntores(relogio=lambda: relogio[0])
+        for _ in range(5):
+            resultado = coletar_odds_sincrono({"superbet": scraping.buscar_odds_superbet},
+                                              disjuntores=disjuntores)["superbet"]
+            assert resultado.erro == "Superbet respondeu 503" and resultado.odds == []
+        assert disjuntores["superbet"].estado == ABERTO
+
+        # Fora de demonstração buscar_todas_odds só passa pelos adaptadores das casas pedidas
+        assert scraping.buscar_todas_odds(casas=["superbet"]) == {}
+
+        scraping.DADOS_EXEMPLO = True
+        assert scraping.buscar_odds_superbet() == scraping.gerar_odds_exemplo_superbet()
+        assert list(scraping.buscar_todas_odds(casas=["betano"])) == ["betano"]
+    finally:
+        scraping.cliente_http.obter, scraping.DADOS_EXEMPLO = obter_original, exemplo_original
+
+    logger.info("✅ Disjuntores funcionaram!")
+    return True
+
+def test_impressoes_mudancas():
+    """Testa as impressões por evento: só eventos alterados vão para a detecção, com taxa de acerto"""
+    logger.info("Testando impressões de eventos...")
+
+    from benchmark_surebet import gerar_cotacoes_sinteticas
+    from cache_odds import CacheOdds
+    from detector_incremental import DetectorIncremental
+    from impressoes import DetectorMudancas
+    from surebet import iterar_surebets
+
+    def cotacao(casa, evento, odd_casa, odd_fora, status=None):
+        cotacao = {"evento": evento, "mercado": "resultado", "casa": casa,
+                   "odds": {evento.split(" vs ")[0]: odd_casa, "Empate": 3.5, evento.split(" vs ")[1]: odd_fora}}
+        if status:
+            cotacao["status"] = status
+        return cotacao
+
+    mudancas = DetectorMudancas()
+    primeira = mudancas.comparar("bet365", [cotacao("Bet365", "A vs B", 2.0, 1.8),
+                                            cotacao("Bet365", "C vs D", 1.5, 2.5)])
+    assert len(primeira.alterados) == 2 and primeira.inalterados == 0
+
+    # Mesmo conteúdo em dicts novos: nada alterado; odd ou status mudado: só aquele evento
+    assert not mudancas.comparar("bet365", [cotacao("Bet365", "A vs B", 2.0, 1.8),
+                                            cotacao("Bet365", "C vs D", 1.5, 2.5)]).alterados
+    segunda = mudancas.comparar("bet365", [cotacao("Bet365", "A vs B", 2.1, 1.8),
+                                           cotacao("Bet365", "C vs D", 1.5, 2.5, "suspenso")])
+    assert set(segunda.alterados) == {("A vs B", None, None), ("C vs D", None, None)}
+
+    # Evento que sumiu volta como (antes, [])
+    terceira = mudancas.comparar("bet365", [cotacao("Bet365", "A vs B", 2.1, 1.8)])
+    antes, agora = terceira.alterados[("C vs D", None, None)]
+    assert antes and agora == [] and terceira.inalterados == 1
+    estatisticas = mudancas.estatisticas()
+    assert estatisticas["eventos"] == 7 and estatisticas["eventos_inalterados"] == 3
+    assert estatisticas["coletas_inalteradas"] == 1 and abs(mudancas.taxa_acerto - 3 / 7) < 1e-9
+
+    # trocar retira do detector as odds que sumiram da origem
+    detector = DetectorIncremental()
+    detector.trocar(("a", "Ceará vs Fortaleza"), [cotacao("A", "Ceará vs Fortaleza", 3.1, 1.5)])
+    detector.trocar(("b", "Ceará vs Fortaleza"), [cotacao("B", "Ceará vs Fortaleza", 1.5, 3.1)])
+    assert len(list(detector.surebets())) == 1
+    detector.trocar(("b", "Ceará vs Fortaleza"), [])
+    assert not list(detector.surebets())
+
+    # Cache: casa sem evento alterado não gera versão; surebets incrementais = detecção em lote
+    casas = ["bet365", "betano", "superbet", "sportingbet"]
+    odds = gerar_cotacoes_sinteticas(2000, casas)
+    cache = CacheOdds(lambda casas: odds)
+    snapshot = cache.obter()
+
+    def resumo(surebets):
+        return sorted((evento, mercado, round(margem, 9)) for evento, mercado, _, margem in surebets)
+
+    assert snapshot.surebets and resumo(snapshot.surebets) == resumo(iterar_surebets(odds))
+    copia = {casa: [dict(cotacao) for cotacao in cotacoes] for casa, cotacoes in odds.items()}
+    assert cache.publicar(copia).versao == snapshot.versao
+
+    # Uma surebet some quando a casa que tinha a melhor odd piora; a detecção acompanha
+    evento, mercado, melhores, _ = snapshot.surebets[0]
+    _, casa_melhor = next(iter(melhores.values()))
+    alteradas = []
+    for cotacao_casa in copia[casa_melhor.lower()]:
+        if cotacao_casa["evento"] == evento and cotacao_casa["mercado"] == mercado:
+            cotacao_casa = {**cotacao_casa, "odds": {resultado: 1.01 for resultado in cotacao_casa["odds"]}}
+        alteradas.append(cotacao_casa)
+    copia[casa_melhor.lower()] = alteradas
+    novo = cache.publicar(copia)
+    assert novo.versao == snapshot.versao + 1
+    assert resumo(novo.surebets) == resumo(iterar_surebets(copia))
+    assert cache.estatisticas()["mudancas"]["eventos_inalterados"] > 0
+
+    # Início ajustado dentro da mesma hora: a chave do evento muda, mas a surebet continua
+    def coleta(inicio_betano):
+        return {
+            "bet365": [{**cotacao("Bet365", "Ceará vs Fortaleza", 3.1, 1.5), "inicio": "2024-07-22T16:00"}],
+            "betano": [{**cotacao("Betano", "Ceará vs Fortaleza", 1.5, 3.1), "inicio": inicio_betano}],
+        }
+
+    cache = CacheOdds(lambda casas: coleta("2024-07-22T16:00"))
+    assert len(cache.obter().surebets) == 1
+    ajustado = cache.publicar(coleta("2024-07-22T16:10"))
+    assert len(ajustado.surebets) == 1 and resumo(ajustado.surebets) == resumo(iterar_surebets(ajustado.odds))
+
+    # Agendador -> cache: uma impressão por evento e por coleta; a assinatura da casa
+    # e os times a registrar saem dela
+    import impressoes
+    from agendador import AgendadorColeta
+
+    impressoes_calculadas = []
+    impressao_original = impressoes.impressao_evento
+    impressoes.impressao_evento = lambda cotacoes: impressoes_calculadas.append(1) or impressao_original(cotacoes)
+    try:
+        odds_casa = [cotacao("Casa", f"T{i} vs R{i}", 2.0, 1.8) for i in range(10)]
+        registradas = []
+        cache = CacheOdds(lambda casas: {}, registrar=registradas.extend)
+        relogio = [0.0]
+        agendador = AgendadorColeta({"casa": lambda: odds_casa}, cache.publicar, relogio=lambda: relogio[0])
+
+        agendador.executar_pendentes()
+        assert len(impressoes_calculadas) == 10 and len(registradas) == 10
+
+        odds_casa = odds_casa[:9] + [cotacao("Casa", "T9 vs R9", 2.5, 1.8)]
+        relogio[0] += 10_000
+        agendador.executar_pendentes()
+        assert len(impressoes_calculadas) == 20 and len(registradas) == 11
+        assert agendador.estatisticas()["casa"]["sem_mudanca"] == 0
+
+        relogio[0] += 10_000
+        agendador.executar_pendentes()
+        assert len(impressoes_calculadas) == 30 and len(registradas) == 11
+        assert agendador.estatisticas()["casa"]["sem_mudanca"] == 1
+    finally:
+        impressoes.impressao_evento = impressao_original
+
+    logger.info("✅ Impressões de eventos funcionaram!")
+    return True
+
+def test_historico_odds():
+    """Testa o histórico de odds: segmentos colunares por dia, leitura por mmap e segmento cortado"""
+    logger.info("Testando histórico de odds...")
+
+    import os
+    import tempfile
+    from datetime import datetime, timezone
+    from historico_odds import HistoricoOdds, ler_segmentos
+
+    def coleta(odd_flamengo):
+        return {
+            "bet365": [{"evento": "Flamengo vs Palmeiras", "mercado": "resultado", "casa": "Bet365",
+                        "odds": {"Flamengo": odd_flamengo, "Empate": 3.2, "Palmeiras": 3.5}}],
+            "betano": [{"evento": "Flamengo vs Palmeiras", "mercado": "total_gols", "casa": "Betano",
+                        "odds": {"2,5": {"over": 1.9, "under": 1.95}}}],
+        }
+
+    meia_noite = datetime(2024, 7, 22, tzinfo=timezone.utc).timestamp()
+    with tempfile.TemporaryDirectory() as diretorio:
+        historico = HistoricoOdds(diretorio)
+        assert historico.gravar(coleta(2.0), meia_noite + 60) == 5
+        assert historico.gravar(coleta(2.1), meia_noite + 120) == 5
+        assert historico.gravar({"bet365": []}, meia_noite + 180) == 0
+        historico.enfileirar(coleta(2.2), meia_noite + 86400 + 60)   # dia seguinte, outro arquivo
+        historico.encerrar()
+        assert historico.dias() == ["odds-2024-07-22.seg", "odds-2024-07-23.seg"]
+
+        # Filtros por casa e mercado; o mercado de gols sai com a linha normalizada
+        flamengo = [(registro.momento, registro.odd) for registro in historico.iterar(casa="Bet365")
+                    if registro.resultado == "Flamengo"]
+        assert flamengo == [(meia_noite + 60, 2.0), (meia_noite + 120, 2.1), (meia_noite + 86460, 2.2)]
+        gols = list(historico.iterar(mercado="total_gols_2.5"))
+        assert len(gols) == 6 and {registro.resultado for registro in gols} == {"over", "under"}
+        assert not list(historico.iterar(casa="Superbet"))
+
+        # Intervalo: só o primeiro dia, e só a segunda coleta
+        assert len(list(historico.iterar(meia_noite, meia_noite + 86400))) == 10
+        assert {registro.momento for registro in historico.iterar(meia_noite + 100, meia_noite + 86400)} == {meia_noite + 120}
+
+        # As colunas são visões sobre o arquivo mapeado, sem cópia
+        caminho = historico.caminho(datetime(2024, 7, 22))
+        segmentos = ler_segmentos(caminho)
+        segmento = next(segmentos)
+        assert isinstance(segmento.odd, memoryview) and segmento.odd.readonly and segmento.odd[0] == 2.0
+        segmentos.close()
+
+        # Escrita interrompida no meio do último segmento: os anteriores continuam legíveis
+        with open(caminho, "ab") as arquivo:
+            arquivo.write(open(caminho, "rb").read()[:40])
+        assert sum(len(segmento) for segmento in ler_segmentos(caminho)) == 10
+        assert historico.estatisticas()["linhas_gravadas"] == 15
+
+        # Depois de reiniciar, a primeira gravação descarta o pedaço e os segmentos novos são lidos
+        reiniciado = HistoricoOdds(diretorio)
+        reiniciado.gravar(coleta(2.3), meia_noite + 240)
+        reiniciado.gravar(coleta(2.4), meia_noite + 300)
+        assert [registro.odd for registro in reiniciado.iterar(meia_noite, meia_noite + 86400, casa="Bet365")
+                if registro.resultado == "Flamengo"] == [2.0, 2.1, 2.3, 2.4]
+
+        # Um byte trocado no corpo invalida o segmento pelo crc32: a leitura para antes dele
+        with open(caminho, "r+b") as arquivo:
+            arquivo.seek(os.path.getsize(caminho) - 20)
+            byte = arquivo.read(1)
+            arquivo.seek(-1, 1)
+            arquivo.write(bytes([byte[0] ^ 0xFF]))
+        assert sum(len(segmento) for segmento in ler_segmentos(caminho)) == 15
+
+    logger.info("✅ Histórico de odds funcionou!")
+    return True
+
 def test_api_endpoints():
     """Testa os endpoints da API"""
     try:
@@ -123,6 +1743,7 @@ def test_api_endpoints():
             logger.info("  - GET /odds/{casa}")
             logger.info("  - GET /surebets") 
             logger.info("  - POST /calcular-stakes")
+            logger.info("  - POST /calcular-stakes/batch")
             logger.info("  - GET /projecao")
             logger.info("  - GET /relatorio-completo")
             return True
@@ -170,6 +1791,31 @@ def run_all_tests():
         ("Importações", test_imports),
         ("Scraping", test_scraping),
         ("Lógica de Surebet", test_surebet_logic),
+        ("Índice de Eventos", test_indice_eventos),
+        ("Surebets Múltiplas Casas", test_surebets_multiplas_casas),
+        ("Scanner Vetorizado", test_scanner_vetorizado),
+        ("Tabela de Cotações", test_tabela_cotacoes),
+        ("Detector Incremental", test_detector_incremental),
+        ("TopK e Filtros", test_top_k_e_filtros),
+        ("Nomes Canônicos", test_nomes_canonicos),
+        ("Blocos de Eventos", test_blocos_eventos),
+        ("Stakes em Lote", test_stakes_lote),
+        ("Over/Under por Linha", test_over_under_linhas),
+        ("Coleta Concorrente", test_coleta_concorrente),
+        ("Pool de Navegadores", test_pool_navegadores),
+        ("Extração em Lote Bet365", test_extracao_bet365_em_lote),
+        ("Captura de Rede", test_captura_rede),
+        ("Sessão HTTP", test_sessao_http),
+        ("Cache de odds", test_cache_odds),
+        ("Agendador de coleta", test_agendador_coleta),
+        ("Cliente The Odds API", test_cliente_odds_api),
+        ("JSON em fluxo", test_fluxo_json),
+        ("Parser HTML", test_parser_html),
+        ("Inicialização da API", test_inicializacao_api),
+        ("Registro de casas", test_registro_casas),
+        ("Disjuntores", test_disjuntores),
+        ("Impressões de eventos", test_impressoes_mudancas),
+        ("Histórico de odds", test_historico_odds),
         ("Endpoints da API", test_api_endpoints),
         ("Projeções", test_projections),
     ]